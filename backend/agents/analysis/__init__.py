@@ -0,0 +1 @@
+# Analysis Agent package
@@ -0,0 +1,227 @@
+"""Analysis Agent - Fused extraction, summarization and categorization in one LLM call"""
+from agents.base_agent import BaseAgent
+from agents.summarization.agent import get_summary_context
+from agents.categorization.agent import get_user_preferences, simple_categorize
+from services.agent_registry import register_agent
+from services.prompt_loader import load_prompt, format_prompt, prompt_version
+from services.llm_cache import cached_chat_completion
+from services.openai_client import get_openai_client
+from services.contact_groups import upsert_contact_entry
+from pymongo import ReturnDocument
+from datetime import datetime
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+class AnalysisAgent(BaseAgent):
+    """Extracts, summarizes and categorizes a meeting with a single structured response"""
+    
+    def __init__(self):
+        super().__init__(
+            agent_id="analysis_agent",
+            agent_type="analysis",
+            skills=["entity_extraction", "text_summarization", "scoring", "priority_assignment"],
+            capabilities={
+                "input_types": ["text", "conversation"],
+                "output_types": ["person_profile", "summary", "priority_group", "score"]
+            }
+        )
+        register_agent(
+            self.agent_id,
+            self.agent_type,
+            self.skills,
+            self.capabilities
+        )
+        self.client = get_openai_client()
+        # Load prompts from YAML (few-shot examples are shared with the categorization agent)
+        self.prompt_config = load_prompt("analysis.yaml")
+        self.few_shot_examples = load_prompt("categorization.yaml")["few_shot_examples"]
+        self.prompt_version = prompt_version("analysis.yaml") + prompt_version("categorization.yaml")
+    
+    def analyze(self, text, person_id, meeting_id, user_id="default"):
+        """Extract, summarize and categorize a meeting, writing the same fields as the staged agents"""
+        self.update_status("busy")
+        
+        try:
+            if self.client:
+                result = self._ai_analyze(text, user_id)
+            else:
+                logger.warning("[ANALYSIS] OpenAI not available, using fallback analysis")
+                result = self._simple_analyze(text)
+        except Exception as e:
+            logger.error(f"[ANALYSIS] Error in AI analysis: {e}", exc_info=True)
+            result = self._simple_analyze(text)
+        
+        now = datetime.now()
+        
+        # Same fields the extraction and categorization agents write
+        self.db.people.update_one(
+            {"person_id": person_id},
+            {
+                "$set": {
+                    "name": result["name"],
+                    "company": result["company"],
+                    "job_title": result["job_title"],
+                    "extracted_data": {
+                        "contact_info": result["contact_info"],
+                        "extracted_at": now
+                    },
+                    "categorization": {
+                        "score": result["score"],
+                        "priority_group": result["priority_group"],
+                        "reasons": result["reasons"],
+                        "persona": result["persona"],
+                        "urgency_level": result["urgency_level"],
+                        "intent_match_score": result["intent_match_score"],
+                        "categorized_at": now
+                    }
+                }
+            }
+        )
+        
+        # Same fields the summarization and categorization agents write
+        meeting = self.db.meetings.find_one_and_update(
+            {"meeting_id": meeting_id},
+            {
+                "$set": {
+                    "summary": {
+                        "text": result["summary"],
+                        "key_points": [],
+                        "created_at": now
+                    },
+                    "priority_group": result["priority_group"],
+                    "status": "completed"
+                }
+            },
+            return_document=ReturnDocument.AFTER
+        )
+        
+        # Keep the grouped contact list (GET /groups) in step
+        if meeting:
+            upsert_contact_entry(
+                self.db,
+                {
+                    "person_id": person_id,
+                    "name": result["name"],
+                    "company": result["company"],
+                    "job_title": result["job_title"],
+                    "categorization": {"score": result["score"]}
+                },
+                meeting
+            )
+        
+        self.update_status("idle")
+        return result
+    
+    def _ai_analyze(self, text, user_id):
+        """Run the fused prompt and normalize its JSON response"""
+        user_prefs = get_user_preferences(self.db, user_id)
+        context = get_summary_context(self.db, user_id)
+        
+        extracted_note = ""
+        if context.get("extracted_preferences", {}).get("value_indicators"):
+            indicators = context["extracted_preferences"]["value_indicators"][:2]
+            extracted_note = f"Pay special attention to: {', '.join(indicators)}. "
+        
+        user_prompt = format_prompt(
+            self.prompt_config["user_prompt_template"],
+            few_shot_examples=self.few_shot_examples,
+            use_case_note=f"User's goal: {context['use_case']}. " if context.get("use_case") else "",
+            extracted_note=extracted_note,
+            focus_areas_str=", ".join(context["focus_areas"]),
+            use_case=user_prefs.get("use_case", "networking"),
+            user_intent=user_prefs.get("intent", ""),
+            user_goals=user_prefs.get("goals", ""),
+            industries=", ".join(user_prefs.get("industries", [])) or "Not specified",
+            company_sizes=", ".join(user_prefs.get("company_sizes", [])) or "Not specified",
+            job_titles=", ".join(user_prefs.get("job_titles", [])) or "Not specified",
+            custom_criteria=", ".join(user_prefs.get("custom_criteria", [])) or "None",
+            value_indicators=", ".join(user_prefs.get("value_indicators", [])) or "None",
+            text=text
+        )
+        
+        result_text = cached_chat_completion(
+            self.client,
+            agent=self.agent_type,
+            prompt_version=self.prompt_version,
+            model=self.prompt_config["model"],
+            messages=[
+                {"role": "system", "content": self.prompt_config["system_message"]},
+                {"role": "user", "content": user_prompt}
+            ],
+            temperature=self.prompt_config["temperature"],
+            response_format={"type": "json_object"}
+        )
+        result = json.loads(result_text)
+        
+        # Validate and normalize result
+        priority_group = result.get("priority_group", "P2")
+        if priority_group not in ["P0", "P1", "P2"]:
+            priority_group = "P2"
+        
+        score = float(result.get("score", 0.5))
+        score = max(0.0, min(1.0, score))  # Clamp between 0 and 1
+        
+        # Same placeholder as the extraction agent when a field is missing
+        return {
+            "name": result.get("name") or "Unknown",
+            "company": result.get("company") or "Unknown",
+            "job_title": result.get("job_title") or "Unknown",
+            "contact_info": result.get("contact_info") or {},
+            "summary": result.get("summary") or "",
+            "priority_group": priority_group,
+            "score": score,
+            "reasons": result.get("reasons", []),
+            "persona": result.get("persona", ""),
+            "urgency_level": result.get("urgency_level", ""),
+            "intent_match_score": float(result.get("intent_match_score", 0.0))
+        }
+    
+    def _simple_analyze(self, text):
+        """Simple fallback matching the staged agents' fallbacks"""
+        person = {"name": "Unknown", "company": "Unknown", "job_title": "Unknown"}
+        categorization = simple_categorize(person, {})
+        
+        return {
+            **person,
+            "contact_info": {},
+            "summary": text[:200] + "..." if len(text) > 200 else text,
+            **categorization
+        }
+    
+    def process_task(self, task_id):
+        """Process a task from the queue"""
+        task = self.load_task(task_id)
+        if not task:
+            raise Exception(f"Task {task_id} not found")
+        
+        self.update_status("busy", task_id)
+        
+        try:
+            input_data = task.get("input_data", {})
+            text = input_data.get("text") or ""
+            person_id = input_data.get("person_id")
+            meeting_id = input_data.get("meeting_id")
+            user_id = input_data.get("user_id", "default")
+            
+            if not person_id or not meeting_id:
+                raise Exception("person_id or meeting_id not found in task input")
+            
+            result = self.analyze(text, person_id, meeting_id, user_id)
+            
+            # Update task with results
+            self.update_task(task_id, "completed", {
+                "person_id": person_id,
+                "meeting_id": meeting_id,
+                "priority_group": result["priority_group"]
+            })
+            
+            self.update_status("idle")
+            return {"priority_group": result["priority_group"], "person_id": person_id, "meeting_id": meeting_id}
+        
+        except Exception as e:
+            logger.error(f"[ANALYSIS] Error processing task {task_id}: {e}")
+            self.update_task(task_id, "failed", {"error": str(e)})
+            self.update_status("idle")
+            raise e
@@ -1,9 +1,18 @@
 """Base agent class with common functionality"""
 from database.connection import get_database
 from services.agent_registry import update_agent_status
+from services.task_events import notify_task
+from services.task_leases import LeaseHeartbeat, lease_expiry, fail_dependents
+from pymongo import ReturnDocument
 from datetime import datetime
+import logging
 import uuid
 
+logger = logging.getLogger(__name__)
+
+# Highest priority first, then oldest first (served by the runnable-task index)
+RUNNABLE_TASK_SORT = [("priority", -1), ("created_at", 1)]
+
 class BaseAgent:
     """Base class for all agents"""
     
@@ -13,6 +22,9 @@ class BaseAgent:
         self.skills = skills
         self.capabilities = capabilities
         self._db = None  # Lazy initialization
+        # Lease token of each task this instance has claimed, so writes made
+        # after the lease was lost (and the task reclaimed) can be dropped
+        self._lease_tokens = {}
     
     @property
     def db(self):
@@ -33,24 +45,94 @@ class BaseAgent:
         })
         return task
     
+    def load_task(self, task_id):
+        """Get a task with input_refs filled in from its upstream outputs"""
+        task = self.db.tasks.find_one({"task_id": task_id})
+        if not task or not task.get("input_refs"):
+            return task
+        
+        refs = task["input_refs"]
+        upstream = {
+            dep["task_id"]: dep.get("output_data", {})
+            for dep in self.db.tasks.find(
+                {"task_id": {"$in": list({ref["task_id"] for ref in refs.values()})}},
+                {"task_id": 1, "output_data": 1}
+            )
+        }
+        
+        input_data = dict(task.get("input_data", {}))
+        for key, ref in refs.items():
+            input_data[key] = upstream.get(ref["task_id"], {}).get(ref["field"])
+        task["input_data"] = input_data
+        return task
+    
     def update_task(self, task_id, status, output_data=None):
-        """Update task status and output"""
+        """
+        Update task status and output
+        
+        For a task claimed by this agent the write only applies while the
+        claim's lease token still matches; if the lease expired and the task
+        was handed to someone else, the write is dropped.
+        
+        Returns:
+            bool: Whether the update was applied
+        """
+        terminal = status in ("completed", "failed")
         update = {
             "status": status,
             "updated_at": datetime.now()
         }
         
+        if terminal:
+            update["lease_until"] = None
+            update["lease_token"] = None
+        
         if output_data:
             update["output_data"] = output_data
         
-        self.db.tasks.update_one(
-            {"task_id": task_id},
-            {"$set": update}
+        query = {"task_id": task_id}
+        lease_token = self._lease_tokens.get(task_id)
+        if lease_token:
+            query.update({"lease_token": lease_token, "status": "assigned"})
+        if terminal:
+            self._lease_tokens.pop(task_id, None)
+        
+        result = self.db.tasks.update_one(query, {"$set": update})
+        if lease_token and result.matched_count == 0:
+            logger.warning(f"[TASK] Dropping {status} result for task {task_id}: lease was lost to another worker")
+            return False
+        
+        if status == "completed":
+            self._release_dependents(task_id)
+        elif status == "failed":
+            fail_dependents(self.db, [task_id])
+        
+        # Wake up anything in this process waiting on the task
+        notify_task(task_id, status, output_data)
+        return True
+    
+    def _release_dependents(self, task_id, dependent_ids=None):
+        """Decrement the unmet-dependency counter of tasks waiting on task_id"""
+        query = {
+            "depends_on": task_id,
+            # Guard makes the decrement idempotent per dependency
+            "satisfied_deps": {"$ne": task_id}
+        }
+        if dependent_ids is not None:
+            query["task_id"] = {"$in": dependent_ids}
+        
+        self.db.tasks.update_many(
+            query,
+            {
+                "$inc": {"pending_deps": -1},
+                "$addToSet": {"satisfied_deps": task_id}
+            }
         )
     
     def create_task(self, task_type, input_data, context_refs=None, depends_on=None, priority=0):
         """Create a new task"""
         task_id = str(uuid.uuid4())
+        depends_on = depends_on or []
         
         task = {
             "task_id": task_id,
@@ -60,63 +142,93 @@ class BaseAgent:
             "input_data": input_data,
             "output_data": {},
             "context_refs": context_refs or [],
-            "depends_on": depends_on or [],  # List of task_ids this task depends on
+            "depends_on": depends_on,  # List of task_ids this task depends on
+            "pending_deps": len(depends_on),  # Dependencies not completed yet
+            "satisfied_deps": [],
+            "lease_until": None,
+            "lease_token": None,
+            "attempts": 0,
             "priority": priority,
             "created_at": datetime.now(),
             "updated_at": datetime.now()
         }
         
         self.db.tasks.insert_one(task)
+        
+        # Dependencies that completed before this task existed never released it
+        if depends_on:
+            completed = self.db.tasks.find(
+                {"task_id": {"$in": depends_on}, "status": "completed"},
+                {"task_id": 1}
+            )
+            for dependency in completed:
+                self._release_dependents(dependency["task_id"], [task_id])
+        
         return task_id
     
-    def get_available_task(self, task_type=None):
-        """Get next available task that this agent can handle"""
+    def _runnable_query(self, task_type=None):
+        """Query matching pending tasks whose dependencies have all completed"""
         query = {
             "status": "pending",
-            "assigned_agent_id": None
+            "assigned_agent_id": None,
+            "pending_deps": 0
         }
         
         if task_type:
             query["task_type"] = task_type
         
-        # Check if task dependencies are met
-        # Get all pending tasks
-        all_tasks = list(self.db.tasks.find(query).sort("priority", -1).sort("created_at", 1))
-        
-        for task in all_tasks:
-            # Check if dependencies are completed
-            if task.get("depends_on"):
-                dependencies = task["depends_on"]
-                completed = self.db.tasks.count_documents({
-                    "task_id": {"$in": dependencies},
-                    "status": "completed"
-                })
-                if completed < len(dependencies):
-                    continue  # Dependencies not met, skip this task
-            
-            # Check if agent has required skills for this task
-            if task_type is None:
-                # Try to match task type to agent skills
-                task_type = task.get("task_type")
-            
-            return task
-        
-        return None
+        return query
+    
+    def get_available_task(self, task_type=None):
+        """Get next available task that this agent can handle"""
+        return self.db.tasks.find_one(self._runnable_query(task_type), sort=RUNNABLE_TASK_SORT)
+    
+    def _claim_update(self, lease_token):
+        return {
+            "$set": {
+                "assigned_agent_id": self.agent_id,
+                "status": "assigned",
+                "lease_until": lease_expiry(),
+                "lease_token": lease_token,
+                "updated_at": datetime.now()
+            }
+        }
     
     def claim_task(self, task_id):
         """Claim a task for processing"""
+        lease_token = str(uuid.uuid4())
         result = self.db.tasks.update_one(
             {
                 "task_id": task_id,
                 "status": "pending",
                 "assigned_agent_id": None
             },
-            {
-                "$set": {
-                    "assigned_agent_id": self.agent_id,
-                    "status": "assigned",
-                    "updated_at": datetime.now()
-                }
-            }
+            self._claim_update(lease_token)
         )
-        return result.modified_count > 0
+        if result.modified_count == 0:
+            return False
+        self._lease_tokens[task_id] = lease_token
+        return True
+    
+    def claim_next_task(self, task_type=None):
+        """Atomically claim the next runnable task, returning it or None"""
+        lease_token = str(uuid.uuid4())
+        # find_one_and_update guarantees only one worker wins the claim
+        task = self.db.tasks.find_one_and_update(
+            self._runnable_query(task_type),
+            self._claim_update(lease_token),
+            sort=RUNNABLE_TASK_SORT,
+            return_document=ReturnDocument.AFTER
+        )
+        if task:
+            self._lease_tokens[task["task_id"]] = lease_token
+        return task
+    
+    def run_task(self, task_id, *args, **kwargs):
+        """Process a claimed task while heartbeating its lease"""
+        try:
+            with LeaseHeartbeat(task_id, self._lease_tokens.get(task_id)):
+                return self.process_task(task_id, *args, **kwargs)
+        finally:
+            # process_task normally finishes the task; don't leak the token if it didn't
+            self._lease_tokens.pop(task_id, None)
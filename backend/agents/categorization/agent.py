@@ -1,15 +1,87 @@
 """Categorization Agent - Groups contacts into P0, P1, P2"""
 from agents.base_agent import BaseAgent
 from services.agent_registry import register_agent
-from services.prompt_loader import load_prompt, format_prompt
-from config.settings import OPENAI_API_KEY
-from openai import OpenAI
+from services.prompt_loader import load_prompt, format_prompt, prompt_version
+from services.llm_cache import cached_chat_completion
+from services.openai_client import get_openai_client
+from services.contact_groups import upsert_contact_entry
 from datetime import datetime
 import json
 import logging
 
 logger = logging.getLogger(__name__)
 
+def get_user_preferences(db, user_id):
+    """Get user preferences from onboarding form"""
+    try:
+        user_prefs = db.user_preferences.find_one({"user_id": user_id})
+        if not user_prefs:
+            return {
+                "use_case": "networking",
+                "intent": "",
+                "goals": "",
+                "industries": [],
+                "company_sizes": [],
+                "job_titles": [],
+                "custom_criteria": [],
+                "value_indicators": []
+            }
+
+        extracted = user_prefs.get("extracted_preferences", {})
+        priorities = user_prefs.get("priorities", {})
+
+        return {
+            "use_case": user_prefs.get("use_case", "networking"),
+            "intent": user_prefs.get("intent", ""),
+            "goals": user_prefs.get("goals", ""),
+            "industries": priorities.get("industries", []),
+            "company_sizes": priorities.get("company_sizes", []),
+            "job_titles": priorities.get("job_titles", []),
+            "custom_criteria": extracted.get("custom_criteria", []),
+            "value_indicators": extracted.get("value_indicators", [])
+        }
+    except Exception as e:
+        logger.error(f"[CATEGORIZATION] Error getting user preferences: {e}")
+        return {
+            "use_case": "networking",
+            "intent": "",
+            "goals": "",
+            "industries": [],
+            "company_sizes": [],
+            "job_titles": [],
+            "custom_criteria": [],
+            "value_indicators": []
+        }
+
+def simple_categorize(person, meeting):
+    """Simple fallback categorization"""
+    score = 0.5  # Base score
+
+    # Boost score if we have more information
+    if person.get("name") and person["name"] != "Unknown":
+        score += 0.1
+    if person.get("company") and person["company"] != "Unknown":
+        score += 0.1
+    if person.get("job_title") and person["job_title"] != "Unknown":
+        score += 0.1
+
+    # Assign priority group
+    if score >= 0.7:
+        priority_group = "P0"
+    elif score >= 0.4:
+        priority_group = "P1"
+    else:
+        priority_group = "P2"
+
+    return {
+        "priority_group": priority_group,
+        "score": score,
+        "reasons": [f"Fallback score: {score:.2f}"],
+        "persona": "",
+        "urgency_level": "",
+        "intent_match_score": 0.0
+    }
+
 class CategorizationAgent(BaseAgent):
     """Categorizes contacts by priority (P0, P1, P2)"""
     
@@ -29,7 +101,7 @@ class CategorizationAgent(BaseAgent):
             self.skills,
             self.capabilities
         )
-        self.client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
+        self.client = get_openai_client()
         # Load prompts from YAML
         self.prompt_config = load_prompt("categorization.yaml")
     
@@ -95,6 +167,13 @@ class CategorizationAgent(BaseAgent):
                 }
             )
             
+            # Keep the grouped contact list (GET /groups) in step
+            upsert_contact_entry(
+                self.db,
+                {**person, "categorization": {"score": result["score"]}},
+                {**meeting, "priority_group": result["priority_group"], "status": "completed"}
+            )
+            
             self.update_status("idle")
             return result["priority_group"]
         
@@ -106,45 +185,7 @@ class CategorizationAgent(BaseAgent):
     
     def _get_user_preferences(self, user_id):
         """Get user preferences from onboarding form"""
-        try:
-            user_prefs = self.db.user_preferences.find_one({"user_id": user_id})
-            if not user_prefs:
-                return {
-                    "use_case": "networking",
-                    "intent": "",
-                    "goals": "",
-                    "industries": [],
-                    "company_sizes": [],
-                    "job_titles": [],
-                    "custom_criteria": [],
-                    "value_indicators": []
-                }
-            
-            extracted = user_prefs.get("extracted_preferences", {})
-            priorities = user_prefs.get("priorities", {})
-            
-            return {
-                "use_case": user_prefs.get("use_case", "networking"),
-                "intent": user_prefs.get("intent", ""),
-                "goals": user_prefs.get("goals", ""),
-                "industries": priorities.get("industries", []),
-                "company_sizes": priorities.get("company_sizes", []),
-                "job_titles": priorities.get("job_titles", []),
-                "custom_criteria": extracted.get("custom_criteria", []),
-                "value_indicators": extracted.get("value_indicators", [])
-            }
-        except Exception as e:
-            logger.error(f"[CATEGORIZATION] Error getting user preferences: {e}")
-            return {
-                "use_case": "networking",
-                "intent": "",
-                "goals": "",
-                "industries": [],
-                "company_sizes": [],
-                "job_titles": [],
-                "custom_criteria": [],
-                "value_indicators": []
-            }
+        return get_user_preferences(self.db, user_id)
     
     def _ai_categorize(self, person, meeting, conversation_text, summary, user_prefs):
         """Use AI to categorize contact based on conversation, profile, and user preferences"""
@@ -180,8 +221,11 @@ class CategorizationAgent(BaseAgent):
                 conversation_text=conversation_text[:2000] if conversation_text else "No conversation text available"  # Limit length
             )
             
-            # Call OpenAI API
-            response = self.client.chat.completions.create(
+            # Call OpenAI API (identical requests are served from the cache)
+            result_text = cached_chat_completion(
+                self.client,
+                agent=self.agent_type,
+                prompt_version=prompt_version("categorization.yaml"),
                 model=self.prompt_config["model"],
                 messages=[
                     {"role": "system", "content": self.prompt_config["system_message"]},
@@ -192,7 +236,6 @@ class CategorizationAgent(BaseAgent):
             )
             
             # Parse response
-            result_text = response.choices[0].message.content.strip()
             result = json.loads(result_text)
             
             # Validate and normalize result
@@ -219,36 +262,11 @@ class CategorizationAgent(BaseAgent):
     
     def _simple_categorize(self, person, meeting):
         """Simple fallback categorization"""
-        score = 0.5  # Base score
-        
-        # Boost score if we have more information
-        if person.get("name") and person["name"] != "Unknown":
-            score += 0.1
-        if person.get("company") and person["company"] != "Unknown":
-            score += 0.1
-        if person.get("job_title") and person["job_title"] != "Unknown":
-            score += 0.1
-        
-        # Assign priority group
-        if score >= 0.7:
-            priority_group = "P0"
-        elif score >= 0.4:
-            priority_group = "P1"
-        else:
-            priority_group = "P2"
-        
-        return {
-            "priority_group": priority_group,
-            "score": score,
-            "reasons": [f"Fallback score: {score:.2f}"],
-            "persona": "",
-            "urgency_level": "",
-            "intent_match_score": 0.0
-        }
+        return simple_categorize(person, meeting)
     
     def process_task(self, task_id):
         """Process a task from the queue"""
-        task = self.db.tasks.find_one({"task_id": task_id})
+        task = self.load_task(task_id)
         if not task:
             raise Exception(f"Task {task_id} not found")
         
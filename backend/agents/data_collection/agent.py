@@ -1,8 +1,10 @@
 """Data Collection Agent - Processes meeting input and creates initial records"""
 from agents.base_agent import BaseAgent
 from services.agent_registry import register_agent
-from services.transcription import transcribe_audio
-from services.ocr import extract_text_from_image
+from services.transcription import submit_transcription
+from services.ocr import extract_text_from_images
+from services.image_processing import dedupe_images
+from services.blob_store import load_media
 from datetime import datetime
 import uuid
 import logging
@@ -27,15 +29,28 @@ class DataCollectionAgent(BaseAgent):
             self.capabilities
         )
     
-    def process(self, meeting_text, location=None, audio_file=None, photo_files=None, user_id="default"):
+    def process(self, meeting_text, location=None, audio_file=None, photo_files=None, user_id="default",
+                person_id=None, meeting_id=None):
         """Process meeting input and create records"""
         self.update_status("busy")
         logger = logging.getLogger(__name__)
         
         try:
-            # Create person ID
-            person_id = str(uuid.uuid4())
-            meeting_id = str(uuid.uuid4())
+            # Use IDs assigned up front by the workflow, or create new ones
+            person_id = person_id or str(uuid.uuid4())
+            meeting_id = meeting_id or str(uuid.uuid4())
+            
+            # Transcription and OCR are independent, so Whisper runs in the
+            # background while the photos go through OCR
+            transcription = submit_transcription(audio_file) if audio_file else None
+            extracted_texts = []
+            duplicate_photos = {}
+            if photo_files:
+                logger.info(f"[DATA_COLLECTION] Processing {len(photo_files)} photo(s)")
+                # The same photo attached twice is only sent to OCR once
+                unique_photos, duplicate_photos = dedupe_images(photo_files)
+                # OCR runs in parallel; results come back in upload order
+                extracted_texts = iter(extract_text_from_images(unique_photos))
             
             # Process audio file if provided - transcribe it
             audio_data = None
@@ -43,7 +58,7 @@ class DataCollectionAgent(BaseAgent):
             if audio_file:
                 logger.info(f"[DATA_COLLECTION] Processing audio file: {audio_file.filename}")
                 
-                transcribed_text = transcribe_audio(audio_file)
+                transcribed_text = transcription.result()
                 
                 audio_data = {
                     "filename": audio_file.filename,
@@ -67,11 +82,17 @@ class DataCollectionAgent(BaseAgent):
             photo_data = []
             photo_texts = []
             if photo_files:
-                logger.info(f"[DATA_COLLECTION] Processing {len(photo_files)} photo(s)")
-                for photo in photo_files:
-                    logger.info(f"[DATA_COLLECTION] Extracting text from: {photo.filename}")
-                    extracted_text = extract_text_from_image(photo)
+                for index, photo in enumerate(photo_files):
+                    if index in duplicate_photos:
+                        photo_data.append({
+                            "filename": photo.filename,
+                            "content_type": photo.content_type,
+                            "size": photo.size if hasattr(photo, 'size') else None,
+                            "duplicate_of": duplicate_photos[index]
+                        })
+                        continue
                     
+                    extracted_text = next(extracted_texts)
                     photo_info = {
                         "filename": photo.filename,
                         "content_type": photo.content_type,
@@ -150,21 +171,38 @@ class DataCollectionAgent(BaseAgent):
             raise e
     
     def process_task(self, task_id, audio_file=None, photo_files=None):
-        """Process a task from the queue"""
-        task = self.db.tasks.find_one({"task_id": task_id})
+        """
+        Process a task from the queue
+        
+        Media passed in by the caller is used as-is; otherwise it is loaded
+        from the blob store refs in the task's input_data.
+        """
+        task = self.load_task(task_id)
         if not task:
             raise Exception(f"Task {task_id} not found")
         
         self.update_status("busy", task_id)
         
+        loaded = []
         try:
             input_data = task.get("input_data", {})
             meeting_text = input_data.get("meeting_text", "")
             location = input_data.get("location")
             user_id = input_data.get("user_id", "default")
             
+            if audio_file is None and input_data.get("audio"):
+                audio_file = load_media(input_data["audio"])
+                loaded.append(audio_file)
+            if not photo_files and input_data.get("photos"):
+                photo_files = [load_media(ref) for ref in input_data["photos"]]
+                loaded.extend(photo_files)
+            
             # Process the meeting
-            result = self.process(meeting_text, location, audio_file, photo_files, user_id)
+            result = self.process(
+                meeting_text, location, audio_file, photo_files, user_id,
+                person_id=input_data.get("person_id"),
+                meeting_id=input_data.get("meeting_id")
+            )
             
             # Update task with results
             self.update_task(task_id, "completed", {
@@ -180,4 +218,7 @@ class DataCollectionAgent(BaseAgent):
         except Exception as e:
             self.update_task(task_id, "failed", {"error": str(e)})
             self.update_status("idle")
-            raise e
\ No newline at end of file
+            raise e
+        finally:
+            for media in loaded:
+                media.close()
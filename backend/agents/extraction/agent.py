@@ -1,9 +1,9 @@
 """Information Extraction Agent - Extracts structured data from text"""
 from agents.base_agent import BaseAgent
 from services.agent_registry import register_agent
-from services.prompt_loader import load_prompt, format_prompt
-from config.settings import OPENAI_API_KEY
-from openai import OpenAI
+from services.prompt_loader import load_prompt, format_prompt, prompt_version
+from services.llm_cache import cached_chat_completion
+from services.openai_client import get_openai_client
 from datetime import datetime
 import json
 
@@ -26,7 +26,7 @@ class ExtractionAgent(BaseAgent):
             self.skills,
             self.capabilities
         )
-        self.client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
+        self.client = get_openai_client()
         # Load prompts from YAML
         self.prompt_config = load_prompt("extraction.yaml")
     
@@ -46,7 +46,10 @@ class ExtractionAgent(BaseAgent):
                 text=text
             )
 
-            response = self.client.chat.completions.create(
+            result_text = cached_chat_completion(
+                self.client,
+                agent=self.agent_type,
+                prompt_version=prompt_version("extraction.yaml"),
                 model=self.prompt_config["model"],
                 messages=[
                     {"role": "system", "content": self.prompt_config["system_message"]},
@@ -55,8 +58,6 @@ class ExtractionAgent(BaseAgent):
                 temperature=self.prompt_config["temperature"]
             )
             
-            result_text = response.choices[0].message.content.strip()
-            
             # Parse JSON response
             try:
                 extracted = json.loads(result_text)
@@ -120,7 +121,7 @@ class ExtractionAgent(BaseAgent):
     
     def process_task(self, task_id):
         """Process a task from the queue"""
-        task = self.db.tasks.find_one({"task_id": task_id})
+        task = self.load_task(task_id)
         if not task:
             raise Exception(f"Task {task_id} not found")
         
@@ -1,17 +1,38 @@
 """Orchestrator Agent - Coordinates multi-agent workflows"""
 from agents.base_agent import BaseAgent
 from services.agent_registry import register_agent, get_agents_by_skills
+from services.workflow_executor import execute_dag
+from services.workflow_builder import WorkflowBuilder, insert_workflows
+from services.task_events import expect_task, wait_for_tasks
+from services.blob_store import store_media
+from config.settings import WORKFLOW_MODE, PIPELINE_MODE, MEETING_PIPELINE_CONCURRENCY, STAGE_WAIT_SECONDS
 from agents.data_collection.agent import DataCollectionAgent
 from agents.extraction.agent import ExtractionAgent
 from agents.summarization.agent import SummarizationAgent
 from agents.categorization.agent import CategorizationAgent
+from agents.analysis.agent import AnalysisAgent
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import functools
 import logging
 import asyncio
 import uuid
 
 logger = logging.getLogger(__name__)
 
+# Task types that assign the priority group and finish a workflow
+FINAL_TASK_TYPES = ["categorization", "analysis"]
+
+# Meeting pipelines awaited from the API run here, off the event loop
+_pipeline_executor = ThreadPoolExecutor(
+    max_workers=MEETING_PIPELINE_CONCURRENCY,
+    thread_name_prefix="pipeline"
+)
+
+class StageHandedOff(Exception):
+    """A stage claimed by another worker didn't finish within STAGE_WAIT_SECONDS"""
+
+
 class OrchestratorAgent(BaseAgent):
     """Coordinates task assignment and agent workflows"""
     
@@ -37,34 +58,36 @@ class OrchestratorAgent(BaseAgent):
         self.extraction = ExtractionAgent()
         self.summarization = SummarizationAgent()
         self.categorization = CategorizationAgent()
+        self.analysis = AnalysisAgent() if PIPELINE_MODE == "fused" else None
     
-    def process_meeting(self, meeting_text, location=None, audio_file=None, photo_files=None, user_id="default"):
-        """Process a new meeting through the multi-agent workflow using task queue"""
+    def process_meeting(self, meeting_text, location=None, audio_file=None, photo_files=None, user_id="default",
+                        audio_ref=None, photo_refs=None):
+        """
+        Process a new meeting through the multi-agent workflow using task queue
+        
+        Media can be passed as spooled files (audio_file, photo_files) or as
+        blob store refs of finalized resumable uploads (audio_ref, photo_refs).
+        """
         self.update_status("busy")
         
         try:
-            # Create workflow ID to track all tasks
-            workflow_id = str(uuid.uuid4())
-            logger.info(f"[ORCHESTRATOR] Starting workflow {workflow_id}")
+            # Media goes to the blob store so any worker can run data collection;
+            # tasks only carry references to it
+            if audio_file:
+                audio_ref = store_media(audio_file)
+            photo_refs = [store_media(photo) for photo in photo_files or []] + list(photo_refs or [])
+            if len(photo_refs) != len(photo_files or []):
+                # Some photos are only in the blob store, so load them all from there
+                photo_files = None
             
-            # Step 1: Create Data Collection task (highest priority, no dependencies)
-            data_collection_task_id = self.create_task(
-                task_type="data_collection",
-                input_data={
-                    "meeting_text": meeting_text,
-                    "location": location,
-                    "audio_file": None,  # Will be handled separately due to file upload
-                    "photo_files": None,  # Will be handled separately due to file upload
-                    "user_id": user_id,
-                    "workflow_id": workflow_id
-                },
-                priority=10  # Highest priority
-            )
-            logger.info(f"[ORCHESTRATOR] Created data_collection task: {data_collection_task_id}")
+            # Create every task of the workflow in a single insert
+            workflow = self.build_meeting_workflow(meeting_text, location, user_id, audio_ref, photo_refs)
+            insert_workflows([workflow])
+            logger.info(f"[ORCHESTRATOR] Starting workflow {workflow.workflow_id} with {len(workflow.tasks)} tasks")
             
-            # Files are passed directly to the workflow execution
-            # (In a fully distributed system, files would be stored in object storage)
-            result = self._execute_workflow(workflow_id, data_collection_task_id, audio_file, photo_files)
+            # The spooled files are still passed along so inline execution
+            # doesn't have to read them back from the blob store
+            result = self._execute_workflow(workflow, audio_file, photo_files)
             
             self.update_status("idle")
             return result
@@ -74,97 +97,186 @@ class OrchestratorAgent(BaseAgent):
             logger.error(f"[ORCHESTRATOR] Error in workflow: {e}")
             raise e
     
-    def _execute_workflow(self, workflow_id, data_collection_task_id, audio_file=None, photo_files=None):
+    async def process_meeting_async(self, *args, **kwargs):
+        """
+        Await process_meeting from async code without blocking the event loop
+        
+        The agents use the synchronous MongoDB and OpenAI clients, so the
+        pipeline runs on a bounded thread pool (MEETING_PIPELINE_CONCURRENCY)
+        while the event loop keeps serving other requests.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _pipeline_executor,
+            functools.partial(self.process_meeting, *args, **kwargs)
+        )
+    
+    def build_meeting_workflow(self, meeting_text, location=None, user_id="default", audio_ref=None, photo_refs=None):
+        """
+        Build the task DAG for one meeting without touching the database
+        
+        Person and meeting IDs are assigned up front so every downstream task
+        can be created before data collection runs. Pass several builders to
+        insert_workflows to create many meetings' DAGs in one round trip.
+        Media is referenced by the blob store refs from store_media.
+        """
+        workflow = WorkflowBuilder()
+        person_id = str(uuid.uuid4())
+        meeting_id = str(uuid.uuid4())
+        
+        # Step 1: Data Collection (highest priority, no dependencies)
+        data_collection_task_id = workflow.add_task(
+            task_type="data_collection",
+            input_data={
+                "meeting_text": meeting_text,
+                "location": location,
+                "audio": audio_ref,
+                "photos": photo_refs or [],
+                "user_id": user_id,
+                "person_id": person_id,
+                "meeting_id": meeting_id
+            },
+            priority=10
+        )
+        
+        if PIPELINE_MODE == "fused":
+            # Step 2: One analysis call covers extraction, summarization and categorization
+            workflow.add_task(
+                task_type="analysis",
+                input_data={"person_id": person_id, "meeting_id": meeting_id, "user_id": user_id},
+                input_refs={"text": (data_collection_task_id, "unified_text")},
+                priority=9
+            )
+            return workflow
+        
+        # Step 2: Extraction (reads the unified text produced by data collection)
+        extraction_task_id = workflow.add_task(
+            task_type="extraction",
+            input_data={"person_id": person_id},
+            input_refs={"text": (data_collection_task_id, "unified_text")},
+            priority=9
+        )
+        
+        # Step 3: Summarization (also only depends on data collection)
+        summarization_task_id = workflow.add_task(
+            task_type="summarization",
+            input_data={"meeting_id": meeting_id, "user_id": user_id},
+            input_refs={"text": (data_collection_task_id, "unified_text")},
+            priority=8
+        )
+        
+        # Step 4: Categorization (depends on extraction and summarization)
+        workflow.add_task(
+            task_type="categorization",
+            input_data={"person_id": person_id, "meeting_id": meeting_id, "user_id": user_id},
+            depends_on=[extraction_task_id, summarization_task_id],
+            priority=7
+        )
+        
+        return workflow
+    
+    def _execute_workflow(self, workflow, audio_file=None, photo_files=None):
         """Execute workflow by having agents process tasks from queue"""
-        import time
-        
-        # Step 1: Data Collection Agent processes task
-        data_collection_task = self.db.tasks.find_one({"task_id": data_collection_task_id})
-        if data_collection_task:
-            # Claim and process
-            if self.data_collection.claim_task(data_collection_task_id):
-                logger.info("[ORCHESTRATOR] Data Collection Agent claimed task")
-                result = self.data_collection.process_task(data_collection_task_id, audio_file, photo_files)
-                person_id = result["person_id"]
-                meeting_id = result["meeting_id"]
-                unified_text = result.get("unified_text", "")
-                
-                # Step 2: Create Extraction task (depends on data collection)
-                extraction_task_id = self.create_task(
-                    task_type="extraction",
-                    input_data={
-                        "text": unified_text,
-                        "person_id": person_id,
-                        "workflow_id": workflow_id
-                    },
-                    depends_on=[data_collection_task_id],
-                    priority=9
-                )
-                logger.info(f"[ORCHESTRATOR] Created extraction task: {extraction_task_id}")
-                
-                # Step 3: Create Summarization task (depends on data collection)
-                summarization_task_id = self.create_task(
-                    task_type="summarization",
-                    input_data={
-                        "text": unified_text,
-                        "meeting_id": meeting_id,
-                        "user_id": result.get("user_id", "default"),
-                        "workflow_id": workflow_id
-                    },
-                    depends_on=[data_collection_task_id],
-                    priority=8
-                )
-                logger.info(f"[ORCHESTRATOR] Created summarization task: {summarization_task_id}")
-                
-                # Step 4: Create Categorization task (depends on extraction and summarization)
-                categorization_task_id = self.create_task(
-                    task_type="categorization",
-                    input_data={
-                        "person_id": person_id,
-                        "meeting_id": meeting_id,
-                        "user_id": result.get("user_id", "default"),
-                        "workflow_id": workflow_id
-                    },
-                    depends_on=[extraction_task_id, summarization_task_id],
-                    priority=7
-                )
-                logger.info(f"[ORCHESTRATOR] Created categorization task: {categorization_task_id}")
-                
-                # Process remaining tasks
-                # Extraction
-                if self.extraction.claim_task(extraction_task_id):
-                    logger.info("[ORCHESTRATOR] Extraction Agent claimed task")
-                    self.extraction.process_task(extraction_task_id)
-                
-                # Summarization
-                if self.summarization.claim_task(summarization_task_id):
-                    logger.info("[ORCHESTRATOR] Summarization Agent claimed task")
-                    self.summarization.process_task(summarization_task_id)
-                
-                # Wait for dependencies, then Categorization
-                max_wait = 30  # seconds
-                waited = 0
-                while waited < max_wait:
-                    extraction_done = self.db.tasks.find_one({"task_id": extraction_task_id, "status": "completed"})
-                    summarization_done = self.db.tasks.find_one({"task_id": summarization_task_id, "status": "completed"})
-                    if extraction_done and summarization_done:
-                        break
-                    time.sleep(0.5)
-                    waited += 0.5
-                
-                if self.categorization.claim_task(categorization_task_id):
-                    logger.info("[ORCHESTRATOR] Categorization Agent claimed task")
-                    result = self.categorization.process_task(categorization_task_id)
-                    priority_group = result.get("priority_group", "P2")
-                else:
-                    priority_group = "P2"
-                
-                return {
-                    "person_id": person_id,
-                    "meeting_id": meeting_id,
-                    "priority_group": priority_group,
-                    "status": "completed",
-                    "workflow_id": workflow_id
-                }
-        
-        raise Exception("Failed to process workflow")
+        tasks = {task["task_type"]: task for task in workflow.tasks}
+        data_collection_task = tasks["data_collection"]
+        person_id = data_collection_task["input_data"]["person_id"]
+        meeting_id = data_collection_task["input_data"]["meeting_id"]
+        
+        queued = {
+            "person_id": person_id,
+            "meeting_id": meeting_id,
+            "priority_group": None,
+            "status": "queued",
+            "workflow_id": workflow.workflow_id
+        }
+        
+        if WORKFLOW_MODE == "queue":
+            # Every stage, data collection included, is picked up by the
+            # standalone worker processes; media is read from the blob store
+            logger.info(f"[ORCHESTRATOR] Workflow {workflow.workflow_id} queued for workers")
+            return queued
+        
+        # Extraction and summarization only depend on data collection,
+        # so the DAG executor runs them concurrently before categorization
+        try:
+            results = execute_dag(workflow.tasks, {
+                "data_collection": lambda task_id: self._run_stage(self.data_collection, task_id, audio_file, photo_files),
+                "extraction": lambda task_id: self._run_stage(self.extraction, task_id),
+                "summarization": lambda task_id: self._run_stage(self.summarization, task_id),
+                "categorization": lambda task_id: self._run_stage(self.categorization, task_id),
+                "analysis": lambda task_id: self._run_stage(self.analysis, task_id)
+            })
+        except StageHandedOff as e:
+            # The workflow is still running; workers pick up the remaining stages
+            logger.info(f"[ORCHESTRATOR] Workflow {workflow.workflow_id} handed off to workers: {e}")
+            return queued
+        
+        # The final stage is categorization, or analysis in fused mode
+        final_task = tasks.get("categorization") or tasks["analysis"]
+        categorization_result = results.get(final_task["task_id"])
+        if categorization_result:
+            priority_group = categorization_result.get("priority_group", "P2")
+        else:
+            priority_group = "P2"
+        
+        return {
+            "person_id": person_id,
+            "meeting_id": meeting_id,
+            "priority_group": priority_group,
+            "status": "completed",
+            "workflow_id": workflow.workflow_id
+        }
+    
+    def _run_stage(self, agent, task_id, *args, timeout=None):
+        """
+        Claim a task for an agent and process it, or wait for whoever claimed it
+        
+        Raises StageHandedOff if the other owner takes longer than timeout
+        (STAGE_WAIT_SECONDS by default).
+        """
+        if agent.claim_task(task_id):
+            logger.info(f"[ORCHESTRATOR] {agent.agent_type} agent claimed task {task_id}")
+            expect_task(task_id)
+            return agent.run_task(task_id, *args)
+        
+        # Another worker owns the task - wait for its completion event
+        logger.info(f"[ORCHESTRATOR] Waiting for {agent.agent_type} task {task_id} claimed elsewhere")
+        try:
+            task = wait_for_tasks([task_id], timeout=timeout or STAGE_WAIT_SECONDS)[task_id]
+        except TimeoutError:
+            raise StageHandedOff(f"{agent.agent_type} task {task_id} still running elsewhere")
+        if task["status"] != "completed":
+            raise Exception(f"{agent.agent_type} task {task_id} failed: {task.get('output_data', {}).get('error')}")
+        return task.get("output_data", {})
+    
+    def get_workflow_status(self, workflow_id):
+        """Get the status of every task in a workflow"""
+        tasks = list(self.db.tasks.find(
+            {"input_data.workflow_id": workflow_id},
+            {"_id": 0, "task_id": 1, "task_type": 1, "status": 1, "output_data": 1}
+        ))
+        if not tasks:
+            return None
+        
+        statuses = [task["status"] for task in tasks]
+        if "failed" in statuses:
+            status = "failed"
+        elif all(s == "completed" for s in statuses) and any(t["task_type"] in FINAL_TASK_TYPES for t in tasks):
+            status = "completed"
+        else:
+            status = "processing"
+        
+        priority_group = None
+        for task in tasks:
+            if task["task_type"] in FINAL_TASK_TYPES and task["status"] == "completed":
+                priority_group = task.get("output_data", {}).get("priority_group")
+        
+        return {
+            "workflow_id": workflow_id,
+            "status": status,
+            "priority_group": priority_group,
+            "tasks": [
+                {"task_id": t["task_id"], "task_type": t["task_type"], "status": t["status"]}
+                for t in tasks
+            ]
+        }
@@ -1,11 +1,60 @@
 """Summarization Agent - Creates conversation summaries"""
 from agents.base_agent import BaseAgent
 from services.agent_registry import register_agent
-from services.prompt_loader import load_prompt, format_prompt
-from config.settings import OPENAI_API_KEY
-from openai import OpenAI
+from services.prompt_loader import load_prompt, format_prompt, prompt_version
+from services.llm_cache import cached_chat_completion
+from services.openai_client import get_openai_client
 from datetime import datetime
 
+def get_summary_context(db, user_id="default"):
+    """Get summary context from user preferences"""
+    try:
+        user_prefs = db.user_preferences.find_one({"user_id": user_id})
+
+        if not user_prefs:
+            # Default context if no preferences found
+            return {
+                "use_case": "networking",
+                "focus_areas": ["key discussion points", "mutual interests", "commitments"],
+                "extracted_preferences": {}
+            }
+
+        # Build context from user preferences
+        context = {
+            "use_case": user_prefs.get("use_case", "networking"),
+            "focus_areas": []
+        }
+
+        # Add use-case specific focus areas
+        use_case = user_prefs.get("use_case", "networking")
+        if use_case == "sales":
+            context["focus_areas"] = ["budget discussions", "pain points", "decision timeline", "buying signals"]
+        elif use_case == "job_hunting":
+            context["focus_areas"] = ["hiring needs", "role details", "team structure", "interview process"]
+        elif use_case == "lead_generation":
+            context["focus_areas"] = ["company needs", "decision makers", "buying signals", "company size"]
+        else:
+            context["focus_areas"] = ["key discussion points", "mutual interests", "commitments"]
+
+        # Add extracted preferences from comments
+        extracted = user_prefs.get("extracted_preferences", {})
+        context["extracted_preferences"] = extracted
+
+        # Add custom criteria to focus on
+        if extracted.get("custom_criteria"):
+            context["focus_areas"].extend([f"mentions of: {crit}" for crit in extracted["custom_criteria"][:3]])
+
+        return context
+
+    except Exception as e:
+        print(f"Error getting user preferences: {e}")
+        # Return default context
+        return {
+            "use_case": "networking",
+            "focus_areas": ["key discussion points", "mutual interests", "commitments"],
+            "extracted_preferences": {}
+        }
+
 class SummarizationAgent(BaseAgent):
     """Creates concise summaries of conversations"""
     
@@ -25,58 +74,13 @@ class SummarizationAgent(BaseAgent):
             self.skills,
             self.capabilities
         )
-        self.client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
+        self.client = get_openai_client()
         # Load prompts from YAML
         self.prompt_config = load_prompt("summarization.yaml")
     
     def _get_summary_context(self, user_id="default"):
         """Get summary context from user preferences"""
-        try:
-            user_prefs = self.db.user_preferences.find_one({"user_id": user_id})
-            
-            if not user_prefs:
-                # Default context if no preferences found
-                return {
-                    "use_case": "networking",
-                    "focus_areas": ["key discussion points", "mutual interests", "commitments"],
-                    "extracted_preferences": {}
-                }
-            
-            # Build context from user preferences
-            context = {
-                "use_case": user_prefs.get("use_case", "networking"),
-                "focus_areas": []
-            }
-            
-            # Add use-case specific focus areas
-            use_case = user_prefs.get("use_case", "networking")
-            if use_case == "sales":
-                context["focus_areas"] = ["budget discussions", "pain points", "decision timeline", "buying signals"]
-            elif use_case == "job_hunting":
-                context["focus_areas"] = ["hiring needs", "role details", "team structure", "interview process"]
-            elif use_case == "lead_generation":
-                context["focus_areas"] = ["company needs", "decision makers", "buying signals", "company size"]
-            else:
-                context["focus_areas"] = ["key discussion points", "mutual interests", "commitments"]
-            
-            # Add extracted preferences from comments
-            extracted = user_prefs.get("extracted_preferences", {})
-            context["extracted_preferences"] = extracted
-            
-            # Add custom criteria to focus on
-            if extracted.get("custom_criteria"):
-                context["focus_areas"].extend([f"mentions of: {crit}" for crit in extracted["custom_criteria"][:3]])
-            
-            return context
-        
-        except Exception as e:
-            print(f"Error getting user preferences: {e}")
-            # Return default context
-            return {
-                "use_case": "networking",
-                "focus_areas": ["key discussion points", "mutual interests", "commitments"],
-                "extracted_preferences": {}
-            }
+        return get_summary_context(self.db, user_id)
     
     def summarize(self, text, meeting_id, user_id="default"):
         """Create summary of conversation with context from user preferences"""
@@ -126,7 +130,10 @@ class SummarizationAgent(BaseAgent):
                 text=text
             )
 
-            response = self.client.chat.completions.create(
+            summary_text = cached_chat_completion(
+                self.client,
+                agent=self.agent_type,
+                prompt_version=prompt_version("summarization.yaml"),
                 model=self.prompt_config["model"],
                 messages=[
                     {"role": "system", "content": self.prompt_config["system_message"]},
@@ -135,8 +142,6 @@ class SummarizationAgent(BaseAgent):
                 temperature=self.prompt_config["temperature"]
             )
             
-            summary_text = response.choices[0].message.content.strip()
-            
             # Update meeting document
             self.db.meetings.update_one(
                 {"meeting_id": meeting_id},
@@ -180,7 +185,7 @@ class SummarizationAgent(BaseAgent):
     
     def process_task(self, task_id):
         """Process a task from the queue"""
-        task = self.db.tasks.find_one({"task_id": task_id})
+        task = self.load_task(task_id)
         if not task:
             raise Exception(f"Task {task_id} not found")
         
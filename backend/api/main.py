@@ -1,7 +1,7 @@
 """FastAPI application entry point"""
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from api.routes import meetings, groups, admin
+from api.routes import meetings, groups, admin, uploads
 import logging
 import os
 from datetime import datetime
@@ -123,6 +123,7 @@ if os.getenv('VERCEL'):
 app.include_router(meetings.router, prefix="/api", tags=["meetings"])
 app.include_router(groups.router, prefix="/api", tags=["groups"])
 app.include_router(admin.router, prefix="/api", tags=["admin"])
+app.include_router(uploads.router, prefix="/api", tags=["uploads"])
 
 # Import onboarding router
 from api.routes import onboarding
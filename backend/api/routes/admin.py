@@ -1,22 +1,50 @@
 """Admin API routes for database management"""
 from fastapi import APIRouter, HTTPException
-from database.connection import get_database
+from database.connection import get_async_database
+from services.openai_client import get_pool_metrics
+from services.llm_cache import get_cache_stats
+from services.media_cache import get_media_cache_stats
+from services.contact_groups import tombstone_update
+from services.response_cache import get_response_cache_stats
+from services.user_versions import bump_version_async, reserve_change_async, commit_change_async
 
 router = APIRouter()
 
+async def _tombstone_contact_groups(db):
+    """
+    Delete every contact entry, leaving tombstones so clients using
+    GET /groups/changes see the deletions
+
+    Returns:
+        int: Number of entries deleted
+    """
+    deleted = 0
+    for user_id in await db.contact_groups.distinct("user_id", {"deleted": {"$ne": True}}):
+        seq = await reserve_change_async(db, user_id, "groups")
+        try:
+            result = await db.contact_groups.update_many(
+                {"user_id": user_id, "deleted": {"$ne": True}},
+                tombstone_update(seq)
+            )
+            deleted += result.modified_count
+        finally:
+            await commit_change_async(db, user_id, "groups", seq)
+    return deleted
+
 @router.delete("/admin/clear-data")
 async def clear_all_data():
     """Clear all data from the database (people, meetings, tasks, contexts, etc.)"""
     try:
-        db = get_database()
+        db = get_async_database()
         
         # Clear all collections
         result = {
-            "people_deleted": db.people.delete_many({}).deleted_count,
-            "meetings_deleted": db.meetings.delete_many({}).deleted_count,
-            "tasks_deleted": db.tasks.delete_many({}).deleted_count,
-            "contexts_deleted": db.contexts.delete_many({}).deleted_count,
-            "agent_communications_deleted": db.agent_communications.delete_many({}).deleted_count,
+            "people_deleted": (await db.people.delete_many({})).deleted_count,
+            "meetings_deleted": (await db.meetings.delete_many({})).deleted_count,
+            "contact_groups_deleted": await _tombstone_contact_groups(db),
+            "tasks_deleted": (await db.tasks.delete_many({})).deleted_count,
+            "contexts_deleted": (await db.contexts.delete_many({})).deleted_count,
+            "agent_communications_deleted": (await db.agent_communications.delete_many({})).deleted_count,
         }
         
         # Note: We keep agents and user_preferences collections intact
@@ -33,8 +61,9 @@ async def clear_all_data():
 async def reset_onboarding(user_id: str):
     """Reset onboarding for a user (delete their preferences)"""
     try:
-        db = get_database()
-        result = db.user_preferences.delete_one({"user_id": user_id})
+        db = get_async_database()
+        result = await db.user_preferences.delete_one({"user_id": user_id})
+        await bump_version_async(db, user_id, "onboarding")
         
         return {
             "success": True,
@@ -43,3 +72,13 @@ async def reset_onboarding(user_id: str):
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/admin/metrics")
+async def get_metrics():
+    """Get runtime metrics for sizing shared resources"""
+    return {
+        "openai_pool": get_pool_metrics(),
+        "llm_cache": get_cache_stats(),
+        "media_cache": get_media_cache_stats(),
+        "response_cache": get_response_cache_stats()
+    }
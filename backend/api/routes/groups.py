@@ -1,75 +1,180 @@
 """Groups API routes"""
-from fastapi import APIRouter, Query
-from database.connection import get_database
-from bson import ObjectId
-from datetime import datetime
+from fastapi import APIRouter, HTTPException, Query, Request
+from typing import Optional
+from database.connection import get_async_database
+from services.response_cache import versioned_response
+from services.contact_groups import (
+    PRIORITY_GROUPS,
+    PAGE_SORTS,
+    MAX_PAGE_SIZE,
+    MAX_CHANGES,
+    CONTACT_FIELDS,
+    CONTACT_SORT,
+    group_contacts,
+    contact_projection,
+    encode_cursor,
+    page_query,
+    changes_query,
+    change_token,
+    sync_token
+)
+from services.json_response import BSONJSONResponse
+from services.user_versions import get_committed_change_async
+import asyncio
 
 router = APIRouter()
 
-def convert_objectid(obj):
-    """Convert ObjectId and datetime to JSON-serializable types"""
-    if isinstance(obj, ObjectId):
-        return str(obj)
-    elif isinstance(obj, datetime):
-        return obj.isoformat()
-    elif isinstance(obj, dict):
-        return {k: convert_objectid(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [convert_objectid(item) for item in obj]
-    return obj
+def _parse_fields(fields):
+    """Turn ?fields=name,company into a projection (400 on unknown fields)"""
+    names = [name.strip() for name in fields.split(",") if name.strip()] if fields else None
+    try:
+        return contact_projection(names)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def _fetch_page(db, user_id, priority, sort, cursor, limit, projection):
+    """Read one page of a priority group; returns (entries, next_cursor)"""
+    try:
+        query, order = page_query(user_id, priority, sort, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # The sort field is needed for the next cursor even if it wasn't requested
+    field, _ = PAGE_SORTS[sort]
+    entries = await db.contact_groups.find(query, {**projection, field: 1}) \
+        .sort(order).limit(limit + 1).to_list(length=limit + 1)
+
+    next_cursor = None
+    if len(entries) > limit:
+        entries = entries[:limit]
+        next_cursor = encode_cursor(sort, entries[-1])
+    if field not in projection:
+        for entry in entries:
+            entry.pop(field, None)
+    return entries, next_cursor
+
 
 @router.get("/groups")
-async def get_groups(user_id: str = Query("default")):
-    """Get all meetings grouped by priority (P0, P1, P2) for a specific user"""
-    db = get_database()
+async def get_groups(
+    request: Request,
+    user_id: str = Query("default"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    sort: str = Query("date", pattern="^(date|score)$"),
+    fields: Optional[str] = Query(None)
+):
+    """
+    Get all meetings grouped by priority (P0, P1, P2) for a specific user
+
+    With limit, only the top `limit` meetings of each group are returned
+    (newest or highest-scoring first, per sort), plus a next_cursors entry
+    per group for GET /groups/{priority} and a sync_token for
+    GET /groups/changes. fields=name,company,... limits the fields
+    returned for each meeting.
+
+    Responses carry an ETag; If-None-Match is answered with 304 until the
+    user's groups change.
+    """
+    projection = _parse_fields(fields)
     
-    # Aggregate meetings grouped by priority_group
-    pipeline = [
-        {
-            "$match": {
-                "user_id": user_id,
-                "priority_group": {"$in": ["P0", "P1", "P2"]},
-                "status": "completed"
-            }
-        },
-        {
-            "$lookup": {
-                "from": "people",
-                "localField": "person_id",
-                "foreignField": "person_id",
-                "as": "person"
-            }
-        },
-        {
-            "$unwind": "$person"
-        },
-        {
-            "$group": {
-                "_id": "$priority_group",
-                "meetings": {
-                    "$push": {
-                        "name": "$person.name",
-                        "company": "$person.company",
-                        "designation": "$person.job_title",
-                        "summary": "$summary.text",
-                        "meeting_date": "$date",
-                        "meeting_timestamp": "$created_at",
-                        "meeting_id": "$meeting_id"
-                    }
-                }
-            }
-        }
-    ]
+    async def build():
+        db = get_async_database()
+        # Taken before reading so no change made during the read is missed
+        token = sync_token(await get_committed_change_async(db, user_id, "groups"))
+        
+        if limit is None:
+            # One indexed read of the materialized contact list, maintained by the
+            # categorization and analysis agents
+            entries = await db.contact_groups.find(
+                {"user_id": user_id, "priority_group": {"$in": PRIORITY_GROUPS}},
+                {**projection, "priority_group": 1}
+            ).sort(CONTACT_SORT).to_list(length=None)
+            
+            return group_contacts(entries)
+        
+        pages = await asyncio.gather(*[
+            _fetch_page(db, user_id, priority, sort, None, limit, projection)
+            for priority in PRIORITY_GROUPS
+        ])
+        groups = {priority: entries for priority, (entries, _) in zip(PRIORITY_GROUPS, pages)}
+        groups["next_cursors"] = {priority: cursor for priority, (_, cursor) in zip(PRIORITY_GROUPS, pages)}
+        groups["sync_token"] = token
+        return groups
+    
+    return await versioned_response(request, user_id, "groups", build)
+
+
+@router.get("/groups/changes")
+async def get_group_changes(
+    user_id: str = Query("default"),
+    since: Optional[str] = Query(None),
+    limit: int = Query(MAX_CHANGES, ge=1, le=MAX_CHANGES)
+):
+    """
+    Get the meetings added, re-categorized or deleted since a token
+
+    Each change is a meeting entry with its priority_group, or
+    {"meeting_id", "deleted": true}. Pass the returned token as since on
+    the next call; has_more means another call will return more changes
+    right away. reset means the token was missing or too old and the
+    changes are the full list, replacing whatever the client had.
+    """
+    db = get_async_database()
+    committed = await get_committed_change_async(db, user_id, "groups")
+    try:
+        query, order, reset, caught_up_token = changes_query(user_id, since, committed)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    results = list(db.meetings.aggregate(pipeline))
+    entries = await db.contact_groups.find(
+        query,
+        {**CONTACT_FIELDS, "priority_group": 1, "seq": 1, "updated_at": 1, "deleted": 1}
+    ).sort(order).limit(limit + 1).to_list(length=limit + 1)
     
-    # Format response and convert ObjectIds
-    groups = {"P0": [], "P1": [], "P2": []}
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    token = change_token(entries[-1]) if has_more else caught_up_token
     
-    for result in results:
-        priority = result["_id"]
-        if priority in groups:
-            meetings = convert_objectid(result["meetings"])
-            groups[priority] = meetings
+    changes = []
+    for entry in entries:
+        if entry.get("deleted"):
+            changes.append({"meeting_id": entry["meeting_id"], "deleted": True})
+        else:
+            entry.pop("seq", None)
+            entry.pop("updated_at", None)
+            changes.append(entry)
+    
+    return BSONJSONResponse({
+        "changes": changes,
+        "token": token,
+        "has_more": has_more,
+        "reset": reset
+    })
+
+
+@router.get("/groups/{priority}")
+async def get_group_page(
+    request: Request,
+    priority: str,
+    user_id: str = Query("default"),
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    sort: str = Query("date", pattern="^(date|score)$"),
+    fields: Optional[str] = Query(None)
+):
+    """Get the next page of one priority group, starting after cursor"""
+    if priority not in PRIORITY_GROUPS:
+        raise HTTPException(status_code=404, detail=f"Unknown priority group: {priority}")
+    
+    projection = _parse_fields(fields)
+    
+    async def build():
+        db = get_async_database()
+        entries, next_cursor = await _fetch_page(db, user_id, priority, sort, cursor, limit, projection)
+        return {
+            "priority_group": priority,
+            "meetings": entries,
+            "next_cursor": next_cursor
+        }
     
-    return groups
+    return await versioned_response(request, user_id, "groups", build)
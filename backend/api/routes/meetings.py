@@ -1,8 +1,13 @@
 """Meeting API routes"""
 from fastapi import APIRouter, HTTPException, UploadFile, File, Form
+from fastapi.concurrency import run_in_threadpool
 from typing import Optional, List
 from agents.orchestrator.agent import OrchestratorAgent
 from services.ocr import extract_text_from_image
+from services.media_files import spool_upload
+from services.uploads import UploadError, get_upload_ref
+from database.connection import get_async_database
+from services.json_response import BSONJSONResponse
 import logging
 
 logger = logging.getLogger(__name__)
@@ -23,18 +28,25 @@ async def create_meeting(
     location: Optional[str] = Form(None),
     audio: Optional[UploadFile] = File(None),
     photos: List[UploadFile] = File([]),
-    user_id: Optional[str] = Form("default")
+    user_id: Optional[str] = Form("default"),
+    audio_upload_id: Optional[str] = Form(None),
+    photo_upload_ids: List[str] = Form([])
 ):
-    """Submit a new meeting for processing with text, audio, and/or photos"""
+    """
+    Submit a new meeting for processing with text, audio, and/or photos
+    
+    Audio and photos can be sent in the request or uploaded beforehand with
+    the resumable upload API (/uploads) and referenced by upload id.
+    """
     # Use print() for Vercel logs - these will appear in Vercel dashboard
     print("=" * 80)
     print("[MEETINGS] New meeting submission received")
     print(f"[MEETINGS] User ID: {user_id}")
     print(f"[MEETINGS] Has text: {bool(text)}, Length: {len(text) if text else 0}")
-    print(f"[MEETINGS] Has audio: {audio is not None}")
+    print(f"[MEETINGS] Has audio: {audio is not None}, Audio upload ID: {audio_upload_id}")
     if audio:
         print(f"[MEETINGS] Audio file: {audio.filename}, Size: {audio.size if hasattr(audio, 'size') else 'unknown'}")
-    print(f"[MEETINGS] Photo count: {len(photos)}")
+    print(f"[MEETINGS] Photo count: {len(photos)}, Photo upload IDs: {len(photo_upload_ids)}")
     if photos:
         for i, photo in enumerate(photos):
             print(f"[MEETINGS] Photo {i+1}: {photo.filename}, Size: {photo.size if hasattr(photo, 'size') else 'unknown'}")
@@ -45,11 +57,19 @@ async def create_meeting(
     logger.info("[MEETINGS] New meeting submission received")
     logger.info(f"[MEETINGS] User ID: {user_id}")
     
+    spooled = []
     try:
+        # Media uploaded beforehand must have been finalized by the same user
+        try:
+            audio_ref = await run_in_threadpool(get_upload_ref, audio_upload_id, user_id) if audio_upload_id and not audio else None
+            photo_refs = [await run_in_threadpool(get_upload_ref, upload_id, user_id) for upload_id in photo_upload_ids]
+        except UploadError as e:
+            raise HTTPException(status_code=e.status_code, detail=str(e))
+        
         # Process photos if provided (for metadata)
         photo_text = None
-        if photos:
-            photo_names = [photo.filename for photo in photos]
+        if photos or photo_refs:
+            photo_names = [photo.filename for photo in photos] + [ref["filename"] for ref in photo_refs]
             photo_text = f"[Photos uploaded: {', '.join(photo_names)}]"
         
         # Start with provided text
@@ -65,40 +85,38 @@ async def create_meeting(
             meeting_text = photo_text
         
         # At least one input must be provided
-        if not meeting_text and not audio and not photos:
+        if not meeting_text and not audio and not audio_ref and not photos and not photo_refs:
             print("[MEETINGS] ❌ Validation failed: No input provided")
             raise HTTPException(status_code=400, detail="Please provide text, audio, or photos")
         
+        # Copy uploads to temp files in fixed-size blocks; downstream code
+        # streams from these instead of reading whole files into memory
+        audio_media = await run_in_threadpool(spool_upload, audio) if audio else None
+        if audio_media:
+            spooled.append(audio_media)
+        photo_media = []
+        for photo in photos:
+            photo_media.append(await run_in_threadpool(spool_upload, photo))
+            spooled.append(photo_media[-1])
+        
         print("[MEETINGS] Starting orchestrator processing...")
-        orchestrator = get_orchestrator()
-        result = orchestrator.process_meeting(
+        orchestrator = await run_in_threadpool(get_orchestrator)
+        # The agents are synchronous; this runs them off the event loop
+        result = await orchestrator.process_meeting_async(
             meeting_text=meeting_text,
             location=location,
-            audio_file=audio,
-            photo_files=photos,
-            user_id=user_id
+            audio_file=audio_media,
+            photo_files=photo_media,
+            user_id=user_id,
+            audio_ref=audio_ref,
+            photo_refs=photo_refs
         )
         print(f"[MEETINGS] Orchestrator processing completed")
         
         # Get parsed inputs from the meeting record
-        from database.connection import get_database
-        from bson import ObjectId
-        from datetime import datetime
-        
-        def convert_objectid(obj):
-            if isinstance(obj, ObjectId):
-                return str(obj)
-            elif isinstance(obj, datetime):
-                return obj.isoformat()
-            elif isinstance(obj, dict):
-                return {k: convert_objectid(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [convert_objectid(item) for item in obj]
-            return obj
-        
-        db = get_database()
-        meeting = db.meetings.find_one({"meeting_id": result["meeting_id"]})
-        person = db.people.find_one({"person_id": result["person_id"]})
+        db = get_async_database()
+        meeting = await db.meetings.find_one({"meeting_id": result["meeting_id"]})
+        person = await db.people.find_one({"person_id": result["person_id"]})
         
         parsed_inputs = {
             "meeting_text": meeting_text,
@@ -111,7 +129,7 @@ async def create_meeting(
         if meeting and meeting.get("raw_data"):
             raw_data = meeting["raw_data"]
             parsed_inputs["transcription"] = raw_data.get("transcribed_text")
-            parsed_inputs["raw_data"] = convert_objectid(raw_data)
+            parsed_inputs["raw_data"] = raw_data
             
             # Extract OCR texts from photos
             if raw_data.get("photos"):
@@ -127,8 +145,10 @@ async def create_meeting(
         print(f"[MEETINGS] Priority Group: {result.get('priority_group', 'N/A')}")
         logger.info(f"[MEETINGS] Successfully processed meeting: {result['meeting_id']}")
         
-        return {
+        response = {
             "success": True,
+            "status": result["status"],
+            "workflow_id": result["workflow_id"],
             "meeting_id": result["meeting_id"],
             "person_id": result["person_id"],
             "priority_group": result["priority_group"],
@@ -140,6 +160,11 @@ async def create_meeting(
             } if person else None,
             "meeting_date": meeting.get("date").isoformat() if meeting and meeting.get("date") else None
         }
+        
+        # Remaining stages run on the worker processes when queued
+        return BSONJSONResponse(status_code=202 if result["status"] == "queued" else 200, content=response)
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         # Print error details for Vercel logs
@@ -152,12 +177,29 @@ async def create_meeting(
         
         logger.error(f"[MEETINGS] Error processing meeting: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        for media in spooled:
+            media.close()
+
+@router.get("/workflows/{workflow_id}")
+async def get_workflow_status(workflow_id: str):
+    """Get the progress of a queued meeting workflow"""
+    orchestrator = await run_in_threadpool(get_orchestrator)
+    status = await run_in_threadpool(orchestrator.get_workflow_status, workflow_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Workflow not found")
+    return status
 
 @router.post("/ocr/extract")
 async def extract_ocr_text(image: UploadFile = File(...)):
     """Extract text from an image using OCR"""
     try:
-        extracted_text = extract_text_from_image(image)
+        def extract(image):
+            with spool_upload(image) as media:
+                return extract_text_from_image(media)
+        
+        # Spooling and the Vision API call are blocking, keep them off the event loop
+        extracted_text = await run_in_threadpool(extract, image)
         
         if extracted_text is None:
             return {
@@ -1,11 +1,12 @@
 """Onboarding API routes"""
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from pydantic import BaseModel
 from typing import Optional, List
-from database.connection import get_database
-from services.preference_analysis import analyze_comments
+from database.connection import get_async_database
+from services.preference_analysis import analyze_comments_async
+from services.response_cache import versioned_response
+from services.user_versions import bump_version_async
 from datetime import datetime
-from bson import ObjectId
 
 router = APIRouter()
 
@@ -29,7 +30,7 @@ async def submit_onboarding(request: OnboardingRequest):
         print(f"[ONBOARDING] Received onboarding request for user: {user_id}")
         print(f"[ONBOARDING] Request data: use_case={request.use_case}, intent={request.intent[:50] if request.intent else None}...")
         
-        db = get_database()
+        db = get_async_database()
         print(f"[ONBOARDING] Database connection established")
         
         # Analyze comments if provided
@@ -37,7 +38,7 @@ async def submit_onboarding(request: OnboardingRequest):
         if request.comments:
             print(f"[ONBOARDING] Analyzing comments (length: {len(request.comments)})")
             try:
-                extracted_preferences = analyze_comments(request.comments)
+                extracted_preferences = await analyze_comments_async(request.comments)
                 print(f"[ONBOARDING] Comments analyzed successfully")
             except Exception as e:
                 print(f"[ONBOARDING] Error analyzing comments: {e}")
@@ -76,12 +77,13 @@ async def submit_onboarding(request: OnboardingRequest):
         
         print(f"[ONBOARDING] Saving user preferences to database")
         # Save or update user preferences
-        result = db.user_preferences.update_one(
+        result = await db.user_preferences.update_one(
             {"user_id": user_id},
             {"$set": user_prefs},
             upsert=True
         )
         print(f"[ONBOARDING] Preferences saved successfully. Upserted: {result.upserted_id}, Modified: {result.modified_count}")
+        await bump_version_async(db, user_id, "onboarding")
         
         return {
             "success": True,
@@ -96,33 +98,19 @@ async def submit_onboarding(request: OnboardingRequest):
         print(f"[ONBOARDING] Traceback: {error_trace}")
         raise HTTPException(status_code=500, detail=f"Error saving preferences: {str(e)}")
 
-def convert_objectid(obj):
-    """Convert ObjectId and datetime to JSON-serializable types"""
-    if isinstance(obj, ObjectId):
-        return str(obj)
-    elif isinstance(obj, datetime):
-        return obj.isoformat()
-    elif isinstance(obj, dict):
-        return {k: convert_objectid(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [convert_objectid(item) for item in obj]
-    return obj
-
 @router.get("/onboarding/{user_id}")
-async def get_onboarding_status(user_id: str):
-    """Check if user has completed onboarding"""
-    try:
-        db = get_database()
-        user_prefs = db.user_preferences.find_one({"user_id": user_id})
-        
-        # Convert ObjectId to string for JSON serialization
-        preferences = None
-        if user_prefs:
-            preferences = convert_objectid(user_prefs)
+async def get_onboarding_status(user_id: str, request: Request):
+    """Check if user has completed onboarding (ETag/304 until the preferences change)"""
+    async def build():
+        db = get_async_database()
+        user_prefs = await db.user_preferences.find_one({"user_id": user_id})
         
         return {
             "completed": user_prefs is not None,
-            "preferences": preferences
+            "preferences": user_prefs
         }
+    
+    try:
+        return await versioned_response(request, user_id, "onboarding", build)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
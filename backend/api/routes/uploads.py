@@ -0,0 +1,105 @@
+"""Resumable upload API routes (initiate / append chunk / finalize)"""
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel
+from typing import Optional
+from config.settings import UPLOAD_CHUNK_SIZE
+from services.uploads import (
+    UploadError,
+    create_upload,
+    get_upload,
+    append_chunk,
+    finalize_upload
+)
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+class UploadRequest(BaseModel):
+    filename: str
+    content_type: Optional[str] = None
+    size: Optional[int] = None
+    user_id: Optional[str] = "default"
+
+
+def _upload_response(upload):
+    return {
+        "upload_id": upload["upload_id"],
+        "filename": upload["filename"],
+        "status": upload["status"],
+        "received": upload["received"],
+        "size": upload["size"],
+        "chunk_size": UPLOAD_CHUNK_SIZE
+    }
+
+
+def _raise_http(error):
+    detail = {"message": str(error)}
+    if error.received is not None:
+        # Lets the client resume from the right place
+        detail["received"] = error.received
+    raise HTTPException(status_code=error.status_code, detail=detail)
+
+
+@router.post("/uploads")
+async def initiate_upload(request: UploadRequest):
+    """Start a resumable upload and get its upload_id"""
+    try:
+        upload = await run_in_threadpool(
+            create_upload, request.filename, request.content_type, request.size, request.user_id
+        )
+    except UploadError as e:
+        _raise_http(e)
+    return _upload_response(upload)
+
+
+@router.get("/uploads/{upload_id}")
+async def get_upload_status(upload_id: str, user_id: str = Query("default")):
+    """Get how many bytes of an upload have been received (where to resume)"""
+    try:
+        upload = await run_in_threadpool(get_upload, upload_id, user_id)
+    except UploadError as e:
+        _raise_http(e)
+    return _upload_response(upload)
+
+
+@router.put("/uploads/{upload_id}")
+async def upload_chunk(upload_id: str, offset: int, request: Request, user_id: str = Query("default")):
+    """Append a chunk (raw request body) at the given byte offset"""
+    content_length = request.headers.get("content-length")
+    if content_length:
+        try:
+            content_length = int(content_length)
+        except ValueError:
+            raise HTTPException(status_code=400, detail={"message": "Invalid Content-Length header"})
+    if content_length and content_length > UPLOAD_CHUNK_SIZE:
+        raise HTTPException(status_code=413, detail={"message": f"Chunks are limited to {UPLOAD_CHUNK_SIZE} bytes"})
+
+    # Read the body in pieces so an oversized chunk is rejected early
+    data = bytearray()
+    async for block in request.stream():
+        data.extend(block)
+        if len(data) > UPLOAD_CHUNK_SIZE:
+            raise HTTPException(status_code=413, detail={"message": f"Chunks are limited to {UPLOAD_CHUNK_SIZE} bytes"})
+
+    try:
+        upload = await run_in_threadpool(append_chunk, upload_id, offset, bytes(data), user_id)
+    except UploadError as e:
+        _raise_http(e)
+    return _upload_response(upload)
+
+
+@router.post("/uploads/{upload_id}/finalize")
+async def finalize(upload_id: str, user_id: str = Query("default")):
+    """Finish an upload; its upload_id can then be passed to POST /meetings"""
+    try:
+        upload = await run_in_threadpool(finalize_upload, upload_id, user_id)
+    except UploadError as e:
+        _raise_http(e)
+    except Exception as e:
+        logger.error(f"[UPLOADS] Error finalizing upload {upload_id}: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+    return _upload_response(upload)
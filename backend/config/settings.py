@@ -11,6 +11,83 @@ DATABASE_NAME = "networking_assistant"
 # OpenAI Configuration
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
+# Shared OpenAI HTTP connection pool (size for the number of concurrent stages)
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "20"))
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "10"))
+OPENAI_KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "60"))
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "60"))
+# Seconds a call waits for a free connection slot before failing with a pool timeout
+OPENAI_POOL_TIMEOUT = float(os.getenv("OPENAI_POOL_TIMEOUT", "30"))
+
+# Uploads are copied to temp files here (default: system temp dir) and read
+# back in blocks of MEDIA_CHUNK_SIZE bytes instead of being held in memory
+MEDIA_SPOOL_DIR = os.getenv("MEDIA_SPOOL_DIR") or None
+MEDIA_CHUNK_SIZE = int(os.getenv("MEDIA_CHUNK_SIZE", str(1024 * 1024)))
+
+# Where meeting media is kept so data collection can run on any worker:
+# "local" (a directory every API/worker process can reach) or "gridfs"
+BLOB_STORE = os.getenv("BLOB_STORE", "local")
+BLOB_STORE_DIR = os.getenv("BLOB_STORE_DIR", "data/blobs")
+
+# Workers delete blobs no pending task or upload refers to, at most every
+# BLOB_GC_INTERVAL seconds; blobs stored (or reused) within the grace period
+# are kept, since their task may not have been inserted yet
+BLOB_GC_INTERVAL = int(os.getenv("BLOB_GC_INTERVAL", "3600"))
+BLOB_GC_GRACE_SECONDS = int(os.getenv("BLOB_GC_GRACE_SECONDS", "3600"))
+
+# Resumable uploads (POST /api/uploads): largest chunk per request, largest
+# file, and how long an unfinished or unused upload is kept
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+UPLOAD_MAX_BYTES = int(os.getenv("UPLOAD_MAX_BYTES", str(500 * 1024 * 1024)))
+UPLOAD_EXPIRY_SECONDS = int(os.getenv("UPLOAD_EXPIRY_SECONDS", str(24 * 3600)))
+
+# Maximum Vision API calls in flight per process (keep within the OpenAI rate limit)
+OCR_MAX_CONCURRENCY = int(os.getenv("OCR_MAX_CONCURRENCY", "4"))
+
+# Photos are downscaled to this longest side and re-saved as JPEG before OCR
+# (needs the optional Pillow package)
+OCR_IMAGE_MAX_DIMENSION = int(os.getenv("OCR_IMAGE_MAX_DIMENSION", "1600"))
+OCR_IMAGE_JPEG_QUALITY = int(os.getenv("OCR_IMAGE_JPEG_QUALITY", "80"))
+
+# Maximum Whisper API calls in flight per process
+TRANSCRIPTION_MAX_CONCURRENCY = int(os.getenv("TRANSCRIPTION_MAX_CONCURRENCY", "4"))
+
+# Recordings longer than this are split (at silences where possible) and the
+# chunks transcribed concurrently; needs the optional pydub package and ffmpeg
+TRANSCRIPTION_CHUNK_SECONDS = int(os.getenv("TRANSCRIPTION_CHUNK_SECONDS", "120"))
+# Overlap of hard-cut chunks; kept below half a chunk so splitting always moves forward
+TRANSCRIPTION_CHUNK_OVERLAP_SECONDS = min(
+    float(os.getenv("TRANSCRIPTION_CHUNK_OVERLAP_SECONDS", "2")),
+    TRANSCRIPTION_CHUNK_SECONDS / 2
+)
+TRANSCRIPTION_CHUNK_RETRIES = int(os.getenv("TRANSCRIPTION_CHUNK_RETRIES", "2"))
+
+# After silence trimming, audio is re-encoded as mono 16 kHz in this format before upload
+TRANSCRIPTION_AUDIO_FORMAT = os.getenv("TRANSCRIPTION_AUDIO_FORMAT", "mp3")
+TRANSCRIPTION_AUDIO_BITRATE = os.getenv("TRANSCRIPTION_AUDIO_BITRATE", "32k")
+
+# Chat completion response cache (in-process LRU in front of the llm_cache collection)
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "1024"))
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_DOCUMENTS = int(os.getenv("LLM_CACHE_MAX_DOCUMENTS", "50000"))
+
+# OCR/transcription results keyed by the hash of the photo or audio bytes
+MEDIA_CACHE_ENABLED = os.getenv("MEDIA_CACHE_ENABLED", "true").lower() == "true"
+MEDIA_CACHE_MEMORY_ENTRIES = int(os.getenv("MEDIA_CACHE_MEMORY_ENTRIES", "512"))
+MEDIA_CACHE_TTL_SECONDS = int(os.getenv("MEDIA_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+MEDIA_CACHE_MAX_DOCUMENTS = int(os.getenv("MEDIA_CACHE_MAX_DOCUMENTS", "50000"))
+
+# How long deleted contacts are remembered for GET /groups/changes; clients
+# syncing from an older token get a full reset instead
+CONTACT_TOMBSTONE_TTL_SECONDS = int(os.getenv("CONTACT_TOMBSTONE_TTL_SECONDS", str(7 * 24 * 3600)))
+
+# Cached reads (GET /groups, GET /onboarding): how long a process trusts its
+# copy of a user's version counters before re-reading them (other processes,
+# e.g. workers, may have bumped them), and how many responses it keeps
+USER_VERSION_CACHE_SECONDS = float(os.getenv("USER_VERSION_CACHE_SECONDS", "1.0"))
+RESPONSE_CACHE_ENTRIES = int(os.getenv("RESPONSE_CACHE_ENTRIES", "1024"))
+
 # Google Custom Search API Configuration (not currently used - research agent removed)
 # Free tier: 100 queries/day
 # Get API key: https://developers.google.com/custom-search/v1/overview
@@ -18,6 +95,46 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 GOOGLE_CSE_ID = os.getenv("GOOGLE_CSE_ID")  # Custom Search Engine ID
 
+# Workflow Configuration
+# "inline" runs every stage inside the API request, "queue" stores the media
+# in the blob store and leaves every stage to `python -m workers`
+WORKFLOW_MODE = os.getenv("WORKFLOW_MODE", "inline")
+
+# "staged" runs extraction, summarization and categorization as separate LLM calls,
+# "fused" runs a single analysis call that produces all three (prompts/analysis.yaml)
+PIPELINE_MODE = os.getenv("PIPELINE_MODE", "staged")
+
+# Meeting submissions processed at once per API process (each runs on its own
+# thread, so the event loop stays free for other requests)
+MEETING_PIPELINE_CONCURRENCY = int(os.getenv("MEETING_PIPELINE_CONCURRENCY", "8"))
+
+# Most stages of one meeting workflow that are ready at once (extraction and
+# summarization both follow data collection)
+WORKFLOW_MAX_PARALLEL_STAGES = 2
+
+# Threads shared by the stages of every in-flight workflow. A stage can hold
+# its thread for up to STAGE_WAIT_SECONDS waiting on a worker, so the pool is
+# never smaller than every concurrent pipeline's widest step: otherwise a few
+# waiting pipelines would starve the ready stages of all the others
+WORKFLOW_STAGE_WORKERS = max(
+    int(os.getenv("WORKFLOW_STAGE_WORKERS", "0")),
+    MEETING_PIPELINE_CONCURRENCY * WORKFLOW_MAX_PARALLEL_STAGES
+)
+
+# Claimed tasks must be heartbeated within this window or they go back to pending
+TASK_LEASE_SECONDS = int(os.getenv("TASK_LEASE_SECONDS", "60"))
+TASK_MAX_ATTEMPTS = int(os.getenv("TASK_MAX_ATTEMPTS", "3"))
+TASK_REAPER_INTERVAL = int(os.getenv("TASK_REAPER_INTERVAL", "15"))
+
+# How long an inline request waits for a stage another worker has claimed
+# before answering 202 and leaving the rest of the workflow to the workers.
+# Defaults to two leases: long enough for the owner to finish or for the
+# reaper to notice it died and hand the task on.
+STAGE_WAIT_SECONDS = float(os.getenv("STAGE_WAIT_SECONDS", str(2 * TASK_LEASE_SECONDS)))
+
+# Agent status changes are buffered in memory and written to MongoDB this often
+AGENT_STATUS_FLUSH_INTERVAL = float(os.getenv("AGENT_STATUS_FLUSH_INTERVAL", "2"))
+
 # API Configuration
 API_HOST = "0.0.0.0"
 API_PORT = 8000
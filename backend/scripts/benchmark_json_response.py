@@ -0,0 +1,148 @@
+"""
+Benchmark JSON encoding of group payloads
+
+Builds GET /groups-style responses (P0/P1/P2 lists of contact entries with
+datetimes, plus the raw meeting documents with ObjectIds that
+POST /meetings returns) and times three ways of turning them into bytes:
+
+  legacy   convert_objectid copy + FastAPI's jsonable_encoder + json.dumps,
+           what the routes did before services/json_response.py
+  json     services.json_response.dumps with the json module fallback
+  orjson   services.json_response.dumps with orjson (if installed)
+
+All three must produce the same JSON; the script checks that first.
+No database is needed:
+
+    python scripts/benchmark_json_response.py --contacts 100 1000 5000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from services import json_response
+
+COMPANIES = ["Acme Corp", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises"]
+TITLES = ["CTO", "VP Engineering", "Head of Sales", "Founder", "Product Manager", "Data Scientist"]
+
+
+def convert_objectid(obj):
+    """The helper previously copied into groups.py, onboarding.py and create_meeting"""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    elif isinstance(obj, datetime):
+        return obj.isoformat()
+    elif isinstance(obj, dict):
+        return {k: convert_objectid(v) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [convert_objectid(item) for item in obj]
+    return obj
+
+
+def make_groups(contacts, rng):
+    """A GET /groups response for a user with this many contacts"""
+    start = datetime(2024, 6, 1, 9, 0)
+    groups = {"P0": [], "P1": [], "P2": []}
+    for i in range(contacts):
+        timestamp = start + timedelta(minutes=7 * i, microseconds=rng.randrange(1000000))
+        groups[rng.choice(list(groups))].append({
+            "meeting_id": str(ObjectId()),
+            "name": f"Contact {i}",
+            "company": rng.choice(COMPANIES),
+            "designation": rng.choice(TITLES),
+            "summary": " ".join(rng.choice(["Discussed", "pilot", "pricing", "follow-up", "integration",
+                                             "next quarter", "budget", "intro to", "the team", "demo"])
+                                for _ in range(rng.randrange(30, 80))),
+            "meeting_date": timestamp.date().isoformat(),
+            "meeting_timestamp": timestamp
+        })
+    return groups
+
+
+def make_meeting(rng):
+    """A meeting document as create_meeting returns it in parsed_inputs.raw_data"""
+    now = datetime(2024, 6, 1, 9, 0)
+    return {
+        "_id": ObjectId(),
+        "text": "Met at the booth. " * 40,
+        "transcribed_text": "Long transcript. " * 300,
+        "photos": [
+            {"_id": ObjectId(), "filename": f"card_{i}.jpg", "text_extracted": True,
+             "extracted_text": "Name Title Company email@example.com " * 5, "extracted_at": now}
+            for i in range(rng.randrange(1, 4))
+        ],
+        "created_at": now
+    }
+
+
+def encode_legacy(payload):
+    return json.dumps(
+        jsonable_encoder(convert_objectid(payload)),
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":")
+    ).encode("utf-8")
+
+
+def encode_json(payload):
+    orjson, json_response.orjson = json_response.orjson, None
+    try:
+        return json_response.dumps(payload)
+    finally:
+        json_response.orjson = orjson
+
+
+def encode_orjson(payload):
+    return json_response.dumps(payload)
+
+
+def timed(encode, payload, min_seconds):
+    """Mean seconds per call, repeating for at least min_seconds"""
+    encode(payload)
+    calls, start = 0, time.perf_counter()
+    while True:
+        encode(payload)
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return elapsed / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--contacts", type=int, nargs="+", default=[100, 1000, 5000], help="Contacts per payload")
+    parser.add_argument("--seconds", type=float, default=1.0, help="Minimum time per measurement")
+    args = parser.parse_args()
+
+    encoders = [("legacy", encode_legacy), ("json", encode_json)]
+    if json_response.orjson is not None:
+        encoders.append(("orjson", encode_orjson))
+    else:
+        print("orjson not installed, skipping it (pip install orjson)")
+
+    rng = random.Random(0)
+    payloads = [(f"groups x{n}", make_groups(n, rng)) for n in args.contacts]
+    payloads.append(("meeting", {"success": True, "parsed_inputs": {"raw_data": make_meeting(rng)}}))
+
+    print(f"{'payload':<16}{'size (KB)':>10}" + "".join(f"{name + ' (ms)':>14}" for name, _ in encoders) + f"{'speedup':>10}")
+    for label, payload in payloads:
+        outputs = [encode(payload) for _, encode in encoders]
+        expected = json.loads(outputs[0])
+        for (name, _), output in zip(encoders, outputs):
+            if json.loads(output) != expected:
+                raise SystemExit(f"{name} output differs from legacy for {label}")
+
+        times = [timed(encode, payload, args.seconds) for _, encode in encoders]
+        row = f"{label:<16}{len(outputs[0]) / 1024:>10.1f}" + "".join(f"{t * 1000:>14.3f}" for t in times)
+        print(row + f"{times[0] / times[-1]:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+"""
+Benchmark peak memory of the media upload path
+
+Sends a recording and photo through transcribe_audio and
+extract_text_from_image, the way create_meeting does, against a local HTTP
+transport that drains request bodies instead of calling OpenAI. Reports the
+peak resident set size (RSS) per run, for the old read-everything approach
+and for spooled uploads, then for several concurrent requests. Each run is
+measured in a fresh child process, since the RSS high-water mark never goes
+back down.
+
+The recording is a real 16 kHz mono WAV (tone with pauses), so with pydub
+installed it is decoded, split and silence-trimmed exactly like an uploaded
+recording. Decoding goes to a temp file and chunks are read back one at a
+time, so peak RSS should stay flat as --audio-mb grows. Without pydub the
+file is streamed as-is.
+
+No API key or database is needed:
+
+    python scripts/benchmark_upload_memory.py --audio-mb 50 --photo-mb 8 --concurrency 4
+"""
+import argparse
+import base64
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import wave
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings are read at import time: no real key, no caches (they need MongoDB)
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+os.environ["MEDIA_CACHE_ENABLED"] = "false"
+os.environ["LLM_CACHE_ENABLED"] = "false"
+
+import httpx
+from openai import OpenAI
+from services import ocr, transcription
+from services.media_files import spool_file
+
+MB = 1024 * 1024
+
+
+class DrainTransport(httpx.BaseTransport):
+    """Reads each request body block by block and answers like the OpenAI API"""
+
+    def handle_request(self, request):
+        received = 0
+        for block in request.stream:
+            received += len(block)
+        if request.url.path.endswith("/audio/transcriptions"):
+            body = {"text": f"received {received} bytes"}
+        else:
+            body = {
+                "id": "benchmark",
+                "object": "chat.completion",
+                "created": 0,
+                "model": "benchmark",
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": f"received {received} bytes"},
+                    "finish_reason": "stop"
+                }]
+            }
+        return httpx.Response(200, content=json.dumps(body).encode(), headers={"content-type": "application/json"})
+
+
+class Upload:
+    """Minimal stand-in for FastAPI's UploadFile"""
+
+    def __init__(self, filename, content_type, path):
+        self.filename = filename
+        self.content_type = content_type
+        self.file = open(path, "rb")
+        self.size = os.path.getsize(path)
+
+
+AUDIO_RATE = 16000
+
+
+def make_file(path, size_mb):
+    with open(path, "wb") as f:
+        for _ in range(size_mb):
+            f.write(os.urandom(MB))
+
+
+def make_recording(path, size_mb):
+    """Write a 16 kHz mono 16-bit WAV of about size_mb: 4 s of tone, 1 s pause"""
+    # 250 Hz divides the sample rate, so one period tiles the tone exactly
+    period = array("h", [8000 if i < 32 else -8000 for i in range(64)])
+    tone = period * (AUDIO_RATE * 4 // len(period))
+    pause = array("h", [0]) * AUDIO_RATE
+    block = (tone + pause).tobytes()
+    blocks = max(1, size_mb * MB // len(block))
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(AUDIO_RATE)
+        for _ in range(blocks):
+            f.writeframes(block)
+
+
+def make_photo(path, size_mb):
+    """Write a noisy JPEG of about size_mb (random bytes if Pillow is missing)"""
+    try:
+        from PIL import Image
+    except ImportError:
+        make_file(path, size_mb)
+        return
+    # Noise compresses to roughly one byte per pixel at this quality
+    width = int((size_mb * MB * 4 / 3) ** 0.5)
+    height = width * 3 // 4
+    Image.frombytes("RGB", (width, height), os.urandom(width * height * 3)).save(path, format="JPEG", quality=90)
+
+
+def legacy_request(client, audio, photo):
+    """What the upload path did before spooling: whole files in memory, copied"""
+    audio_content = audio.file.read()
+    audio.file.seek(0)
+    audio_file_obj = io.BytesIO(audio_content)
+    audio_file_obj.name = audio.filename
+    client.audio.transcriptions.create(model="whisper-1", file=audio_file_obj)
+
+    image_content = photo.file.read()
+    photo.file.seek(0)
+    base64_image = base64.b64encode(image_content).decode("utf-8")
+    client.chat.completions.create(
+        model="gpt-4o",
+        messages=[{"role": "user", "content": [
+            {"type": "image_url", "image_url": {"url": f"data:{photo.content_type};base64,{base64_image}"}}
+        ]}]
+    )
+
+
+def spooled_request(client, audio, photo):
+    """The current upload path"""
+    with spool_file(audio.file, audio.filename, audio.content_type) as audio_media, \
+            spool_file(photo.file, photo.filename, photo.content_type) as photo_media:
+        audio.file.seek(0)
+        photo.file.seek(0)
+        transcription.transcribe_audio(audio_media)
+        ocr.extract_text_from_image(photo_media)
+
+
+def peak_rss_mb():
+    """Peak RSS of this process so far (ru_maxrss is KB on Linux, bytes on macOS)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / MB if sys.platform == "darwin" else peak / 1024
+
+
+def run(name, count, audio_path, photo_path):
+    """Child process: run count concurrent requests and print baseline and peak RSS"""
+    client = OpenAI(api_key="benchmark", http_client=httpx.Client(transport=DrainTransport()))
+    transcription.get_openai_client = lambda: client
+    ocr.get_openai_client = lambda: client
+    func = {"legacy": legacy_request, "spooled": spooled_request}[name]
+
+    requests = [
+        (client, Upload("recording.wav", "audio/wav", audio_path), Upload("card.jpg", "image/jpeg", photo_path))
+        for _ in range(count)
+    ]
+    baseline = peak_rss_mb()
+    with ThreadPoolExecutor(max_workers=count) as executor:
+        list(executor.map(lambda args: func(*args), requests))
+    for _, audio, photo in requests:
+        audio.file.close()
+        photo.file.close()
+    print(json.dumps({"baseline": baseline, "peak": peak_rss_mb()}))
+
+
+def measure(name, count, audio_path, photo_path):
+    """Run one measurement in a fresh interpreter and return (baseline, peak) RSS in MB"""
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--run", name, str(count), audio_path, photo_path],
+        check=True, capture_output=True, text=True
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    return result["baseline"], result["peak"]
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--run":
+        name, count, audio_path, photo_path = sys.argv[2:6]
+        run(name, int(count), audio_path, photo_path)
+        return
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--audio-mb", type=int, default=50, help="Size of the WAV recording")
+    parser.add_argument("--photo-mb", type=int, default=8, help="Size of the fake photo")
+    parser.add_argument("--concurrency", type=int, default=4, help="Concurrent requests for the second run")
+    parser.add_argument("--dir", default=None, help="Where to write the media (default: temp dir)")
+    args = parser.parse_args()
+
+    workdir = args.dir or tempfile.mkdtemp(prefix="upload_benchmark_")
+    audio_path = os.path.join(workdir, "recording.wav")
+    photo_path = os.path.join(workdir, "card.jpg")
+    make_recording(audio_path, args.audio_mb)
+    make_photo(photo_path, args.photo_mb)
+
+    try:
+        import pydub  # noqa: F401
+        processing = "on (decoded to disk, read in chunks)"
+    except ImportError:
+        processing = "off (pydub not installed, streamed as-is)"
+
+    audio_mb = os.path.getsize(audio_path) / MB
+    photo_mb = os.path.getsize(photo_path) / MB
+    print(f"Media per request: {audio_mb:.1f} MB audio ({audio_mb * MB / (2 * AUDIO_RATE) / 60:.1f} min) + {photo_mb:.1f} MB photo")
+    print(f"Local audio processing: {processing}")
+    print(f"{'path':<10}{'requests':>10}{'peak RSS (MB)':>16}{'above baseline (MB)':>22}{'per request (MB)':>20}")
+    for name in ("legacy", "spooled"):
+        for count in (1, args.concurrency):
+            baseline, peak = measure(name, count, audio_path, photo_path)
+            growth = peak - baseline
+            print(f"{name:<10}{count:>10}{peak:>16.1f}{growth:>22.1f}{growth / count:>20.1f}")
+
+    for path in (audio_path, photo_path):
+        os.unlink(path)
+    if not args.dir:
+        os.rmdir(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,8 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database.connection import get_database
+from services.contact_groups import rebuild_contact_groups
+from config.settings import LLM_CACHE_TTL_SECONDS, MEDIA_CACHE_TTL_SECONDS, CONTACT_TOMBSTONE_TTL_SECONDS
 
 def setup_database():
     """Create collections and indexes"""
@@ -23,6 +25,31 @@ def setup_database():
     db.tasks.create_index("task_id", unique=True)
     db.tasks.create_index("status")
     db.tasks.create_index("assigned_agent_id")
+    db.tasks.create_index("input_data.workflow_id")
+    db.tasks.create_index("depends_on")
+    db.tasks.create_index([("status", 1), ("lease_until", 1)])
+    # Lets workers find their next runnable task with a single indexed query
+    db.tasks.create_index([
+        ("status", 1),
+        ("task_type", 1),
+        ("pending_deps", 1),
+        ("priority", -1),
+        ("created_at", 1)
+    ])
+    
+    # Backfill the unmet-dependency counter on tasks created before it existed
+    for task in db.tasks.find({"status": "pending", "pending_deps": {"$exists": False}}):
+        depends_on = task.get("depends_on", [])
+        satisfied = [
+            dep["task_id"] for dep in db.tasks.find(
+                {"task_id": {"$in": depends_on}, "status": "completed"},
+                {"task_id": 1}
+            )
+        ]
+        db.tasks.update_one(
+            {"_id": task["_id"]},
+            {"$set": {"pending_deps": len(depends_on) - len(satisfied), "satisfied_deps": satisfied}}
+        )
     
     # People collection
     db.people.create_index("person_id", unique=True)
@@ -34,6 +61,17 @@ def setup_database():
     db.meetings.create_index("priority_group")
     db.meetings.create_index("date")
     
+    # Materialized contact list behind GET /groups, written as meetings are
+    # categorized; backfilled here for meetings categorized before it existed
+    db.contact_groups.create_index("meeting_id", unique=True)
+    db.contact_groups.create_index([("user_id", 1), ("priority_group", 1), ("meeting_timestamp", 1), ("meeting_id", 1)])
+    db.contact_groups.create_index([("user_id", 1), ("priority_group", 1), ("score", 1), ("meeting_id", 1)])
+    # Delta sync (GET /groups/changes) and expiry of deleted entries
+    db.contact_groups.create_index([("user_id", 1), ("seq", 1), ("meeting_id", 1)])
+    db.contact_groups.create_index("deleted_at", expireAfterSeconds=CONTACT_TOMBSTONE_TTL_SECONDS)
+    # Also stamps entries written before change sequence numbers with one
+    rebuild_contact_groups(db)
+    
     # User preferences collection
     db.user_preferences.create_index("user_id", unique=True)
     
@@ -45,6 +83,23 @@ def setup_database():
     # Agent communications collection
     db.agent_communications.create_index("communication_id", unique=True)
     
+    # LLM response cache (documents are keyed by request hash in _id)
+    db.llm_cache.create_index("created_at", expireAfterSeconds=LLM_CACHE_TTL_SECONDS)
+    
+    # OCR/transcription results (documents are keyed by media content hash in _id)
+    db.media_cache.create_index("created_at", expireAfterSeconds=MEDIA_CACHE_TTL_SECONDS)
+    
+    # Resumable uploads: abandoned ones are purged by services/uploads.py
+    # (it also removes their partial data), finalized ones expire here
+    db.uploads.create_index("upload_id", unique=True)
+    db.uploads.create_index([("status", 1), ("expires_at", 1)])
+    db.uploads.create_index(
+        "expires_at",
+        expireAfterSeconds=0,
+        partialFilterExpression={"status": "complete"}
+    )
+    db["media.upload_parts"].create_index([("upload_id", 1), ("offset", 1)])
+    
     print("Database setup complete!")
 
 if __name__ == "__main__":
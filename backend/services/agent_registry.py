@@ -1,7 +1,12 @@
 """Agent registry service for managing agent registration and discovery"""
 from database.connection import get_database
+from config.settings import AGENT_STATUS_FLUSH_INTERVAL
+from pymongo import UpdateOne
 from datetime import datetime
+import threading
 import logging
+import atexit
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -37,30 +42,96 @@ def register_agent(agent_id, agent_type, skills, capabilities):
 
 
 def get_agents_by_skills(required_skills, status="idle"):
-    """Find agents with required skills"""
+    """
+    Find agents with required skills
+    
+    Status is matched against the agent's latest state, including
+    transitions still buffered in this process and not flushed yet.
+    """
     db = get_database()
     
-    agents = db.agents.find({
-        "skills": {"$in": required_skills},
-        "status": status
-    })
+    agents = []
+    for agent in db.agents.find({"skills": {"$in": required_skills}}):
+        agent.update(get_agent_status(agent["agent_id"]))
+        if status is None or agent.get("status") == status:
+            agents.append(agent)
     
-    return list(agents)
+    return agents
 
 
-def update_agent_status(agent_id, status, task_id=None):
-    """Update agent status"""
-    db = get_database()
+class AgentStatusTracker:
+    """In-memory agent status that is written back to MongoDB in batches"""
     
-    update = {
-        "status": status,
-        "last_heartbeat": datetime.now()
-    }
+    def __init__(self, flush_interval=AGENT_STATUS_FLUSH_INTERVAL):
+        self.flush_interval = flush_interval
+        self._pending = {}  # agent_id -> latest fields to $set
+        self._lock = threading.Lock()
+        self._thread = None
     
-    if task_id is not None:
-        update["current_task_id"] = task_id
+    def record(self, agent_id, status, task_id=None):
+        """Record a status transition; only the latest state per agent is flushed"""
+        update = {
+            "status": status,
+            "last_heartbeat": datetime.now()
+        }
+        
+        if task_id is not None:
+            update["current_task_id"] = task_id
+        
+        with self._lock:
+            self._pending.setdefault(agent_id, {}).update(update)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="agent-status-flush", daemon=True)
+                self._thread.start()
+    
+    def get(self, agent_id):
+        """Get the unflushed state for an agent, if any"""
+        with self._lock:
+            return dict(self._pending.get(agent_id, {}))
     
-    db.agents.update_one(
-        {"agent_id": agent_id},
-        {"$set": update}
-    )
+    def flush(self):
+        """Write the latest state of every changed agent with one bulk_write"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        
+        if not pending:
+            return 0
+        
+        try:
+            get_database().agents.bulk_write(
+                [UpdateOne({"agent_id": agent_id}, {"$set": update}) for agent_id, update in pending.items()],
+                ordered=False
+            )
+        except Exception as e:
+            logger.error(f"Failed to flush status for {len(pending)} agents: {e}")
+            # Put the states back unless a newer transition was recorded meanwhile
+            with self._lock:
+                for agent_id, update in pending.items():
+                    self._pending[agent_id] = {**update, **self._pending.get(agent_id, {})}
+            return 0
+        
+        return len(pending)
+    
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+
+_status_tracker = AgentStatusTracker()
+atexit.register(_status_tracker.flush)
+
+
+def update_agent_status(agent_id, status, task_id=None):
+    """Update agent status (buffered, flushed every AGENT_STATUS_FLUSH_INTERVAL seconds)"""
+    _status_tracker.record(agent_id, status, task_id)
+
+
+def get_agent_status(agent_id):
+    """Get an agent's buffered status fields not yet written to MongoDB (empty if none)"""
+    return _status_tracker.get(agent_id)
+
+
+def flush_agent_statuses():
+    """Immediately write any buffered agent status updates"""
+    return _status_tracker.flush()
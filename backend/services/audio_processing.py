@@ -0,0 +1,310 @@
+"""Local audio processing before transcription (requires the optional pydub + ffmpeg)"""
+from config.settings import MEDIA_SPOOL_DIR
+import io
+import logging
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import wave
+
+logger = logging.getLogger(__name__)
+
+
+# Bytes per sample of the decoded audio (16-bit PCM)
+SAMPLE_WIDTH = 2
+
+# Frames read per block when converting WAV files without ffmpeg
+WAV_BLOCK_FRAMES = 16000 * 10
+
+
+class DecodedAudio:
+    """
+    A recording decoded to raw mono 16-bit PCM in a temp file
+
+    Windows are read from disk on demand, so processing a long recording
+    only ever holds one window of samples in memory. Call close() (or use
+    it as a context manager) to delete the temp file.
+    """
+
+    def __init__(self, path, frame_rate):
+        self.path = path
+        self.frame_rate = frame_rate
+        self._bytes_per_ms = frame_rate * SAMPLE_WIDTH / 1000
+        self.file = open(path, "rb")
+
+    def __len__(self):
+        """Duration in milliseconds"""
+        return int(os.path.getsize(self.path) / self._bytes_per_ms)
+
+    def read(self, start_ms, length_ms):
+        """AudioSegment for [start_ms, start_ms + length_ms), shorter at the end"""
+        from pydub import AudioSegment
+
+        offset = int(start_ms * self._bytes_per_ms) // SAMPLE_WIDTH * SAMPLE_WIDTH
+        size = int(length_ms * self._bytes_per_ms) // SAMPLE_WIDTH * SAMPLE_WIDTH
+        self.file.seek(offset)
+        return AudioSegment(
+            data=self.file.read(size),
+            sample_width=SAMPLE_WIDTH,
+            frame_rate=self.frame_rate,
+            channels=1
+        )
+
+    def close(self):
+        self.file.close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _decode_with_ffmpeg(ffmpeg, path, out_path, frame_rate):
+    subprocess.run(
+        [ffmpeg, "-nostdin", "-v", "error", "-y", "-i", path,
+         "-vn", "-ac", "1", "-ar", str(frame_rate), "-f", "s16le", out_path],
+        check=True,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE
+    )
+
+
+def _decode_wav(path, out, frame_rate):
+    """Convert a PCM WAV block by block (no ffmpeg needed)"""
+    from pydub import AudioSegment
+
+    with wave.open(path, "rb") as wav:
+        sample_width, channels, rate = wav.getsampwidth(), wav.getnchannels(), wav.getframerate()
+        for data in iter(lambda: wav.readframes(WAV_BLOCK_FRAMES), b""):
+            block = AudioSegment(data=data, sample_width=sample_width, frame_rate=rate, channels=channels)
+            out.write(block.set_channels(1).set_frame_rate(frame_rate).set_sample_width(SAMPLE_WIDTH).raw_data)
+
+
+def decode_audio(path, filename=None, frame_rate=16000):
+    """
+    Decode a recording to mono PCM at frame_rate, streaming it to a temp file
+
+    ffmpeg decodes straight to disk and PCM WAV files are converted block by
+    block, so memory use doesn't grow with the length of the recording.
+
+    Args:
+        path: Path of the recording
+        filename: Original filename, used to recognize WAV files
+        frame_rate: Sample rate to decode to
+
+    Returns:
+        DecodedAudio or None if pydub is not installed or decoding fails
+    """
+    try:
+        from pydub import AudioSegment
+    except ImportError:
+        logger.warning("[AUDIO] pydub not installed. Install with: pip install pydub (also needs ffmpeg)")
+        return None
+
+    fd, out_path = tempfile.mkstemp(suffix=".pcm", prefix="decoded_", dir=MEDIA_SPOOL_DIR)
+    try:
+        ffmpeg = shutil.which(AudioSegment.converter)
+        if ffmpeg:
+            os.close(fd)
+            _decode_with_ffmpeg(ffmpeg, path, out_path, frame_rate)
+        else:
+            with os.fdopen(fd, "wb") as out:
+                _decode_wav(path, out, frame_rate)
+        return DecodedAudio(out_path, frame_rate)
+    except Exception as e:
+        stderr = getattr(e, "stderr", None)
+        detail = stderr.decode(errors="ignore").strip() if stderr else e
+        logger.warning(f"[AUDIO] Could not decode {filename}: {detail}")
+        try:
+            os.unlink(out_path)
+        except FileNotFoundError:
+            pass
+        return None
+
+
+def trim_silence(audio, min_silence_ms=700, keep_silence_ms=200):
+    """
+    Remove long silent stretches, keeping only the voiced parts
+
+    Voice activity is detected from loudness relative to the recording's
+    average level, so quiet and loud recordings are handled alike.
+
+    Args:
+        audio: pydub AudioSegment
+        min_silence_ms: Silences shorter than this are left alone
+        keep_silence_ms: Padding kept around each voiced segment
+
+    Returns:
+        AudioSegment: Audio with long silences removed
+    """
+    from pydub.silence import detect_nonsilent
+
+    if audio.dBFS == float("-inf"):
+        return audio
+
+    # 10 ms steps keep detection fast on long recordings
+    voiced = detect_nonsilent(audio, min_silence_len=min_silence_ms, silence_thresh=audio.dBFS - 16, seek_step=10)
+    if not voiced:
+        return audio
+
+    # Join the raw samples once; appending segment by segment copies the
+    # growing result every time
+    slices = [
+        audio[max(0, start - keep_silence_ms):min(len(audio), end + keep_silence_ms)]
+        for start, end in voiced
+    ]
+    return audio._spawn(b"".join(segment.raw_data for segment in slices))
+
+
+def iter_chunks(read, length_ms, chunk_seconds, overlap_seconds, silence_window_seconds=10):
+    """
+    Yield chunks of about chunk_seconds, reading one window at a time
+
+    Each cut is placed in the longest silence found in the last
+    silence_window_seconds before the target boundary. When no silence is
+    found the chunk is cut hard and the next one starts overlap_seconds
+    earlier, so no words are lost at the seam.
+
+    Args:
+        read: Function (start_ms, length_ms) -> AudioSegment
+        length_ms: Length of the whole recording
+        chunk_seconds: Target chunk length
+        overlap_seconds: Overlap used for hard cuts
+        silence_window_seconds: How far back to look for a silence to cut at
+
+    Yields:
+        tuple: (AudioSegment, overlaps_previous); the flag is True when the
+        chunk repeats the tail of the one before it
+
+    Raises:
+        ValueError: If the overlap is not shorter than a chunk (the split
+            would never move forward)
+    """
+    from pydub.silence import detect_silence
+
+    chunk_ms = int(chunk_seconds * 1000)
+    overlap_ms = int(overlap_seconds * 1000)
+    window_ms = int(silence_window_seconds * 1000)
+    if not 0 <= overlap_ms < chunk_ms:
+        raise ValueError(f"Chunk overlap ({overlap_seconds}s) must be shorter than a chunk ({chunk_seconds}s)")
+
+    start = 0
+    overlapped = False
+    while start < length_ms:
+        if start + chunk_ms >= length_ms:
+            yield read(start, length_ms - start), overlapped
+            return
+
+        chunk = read(start, chunk_ms)
+        # Treat anything 16 dB below the chunk's average loudness as silence
+        silence_thresh = chunk.dBFS - 16 if chunk.dBFS != float("-inf") else -50
+        window_start = max(0, chunk_ms - window_ms)
+        silences = detect_silence(
+            chunk[window_start:], min_silence_len=300, silence_thresh=silence_thresh, seek_step=10
+        )
+        if silences:
+            silence_start, silence_end = max(silences, key=lambda s: s[1] - s[0])
+            cut = window_start + (silence_start + silence_end) // 2
+            yield chunk[:cut], overlapped
+            start += cut
+            overlapped = False
+        else:
+            yield chunk, overlapped
+            start += chunk_ms - overlap_ms
+            overlapped = overlap_ms > 0
+
+
+def split_audio(audio, chunk_seconds, overlap_seconds, silence_window_seconds=10):
+    """
+    Split an in-memory AudioSegment into chunks (see iter_chunks)
+
+    Returns:
+        list: (AudioSegment, overlaps_previous) tuples in order
+    """
+    return list(iter_chunks(
+        lambda start, length: audio[start:start + length],
+        len(audio),
+        chunk_seconds,
+        overlap_seconds,
+        silence_window_seconds
+    ))
+
+
+def export_audio(audio, audio_format="wav", bitrate=None, name=None):
+    """
+    Encode an AudioSegment into an in-memory file
+
+    Falls back to WAV if the requested encoder is unavailable.
+
+    Returns:
+        BytesIO: Encoded audio with a .name matching its format
+    """
+    buffer = io.BytesIO()
+    try:
+        audio.export(buffer, format=audio_format, bitrate=bitrate)
+    except Exception as e:
+        if audio_format == "wav":
+            raise
+        logger.warning(f"[AUDIO] Could not encode {audio_format}, falling back to wav: {e}")
+        buffer = io.BytesIO()
+        audio.export(buffer, format="wav")
+        audio_format = "wav"
+    buffer.seek(0)
+    buffer.name = f"{name or 'audio'}.{audio_format}"
+    return buffer
+
+
+def _normalize_word(word):
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def stitch_transcripts(texts, overlaps=None, max_overlap_words=30, min_overlap_words=2):
+    """
+    Join chunk transcripts, dropping words repeated across chunk overlaps
+
+    Only seams where the audio really overlaps are de-duplicated; at a cut
+    made in silence a repeated phrase is genuine speech and is kept.
+
+    Args:
+        texts: Transcripts in chunk order
+        overlaps: Per text, whether its audio overlaps the previous chunk
+            (as returned by split_audio); defaults to no overlaps
+        max_overlap_words: Longest repeated run to look for at each seam
+        min_overlap_words: Shortest run treated as overlap (avoids dropping
+            a single legitimately repeated word)
+
+    Returns:
+        str: Combined transcript
+    """
+    if overlaps is None:
+        overlaps = [False] * len(texts)
+
+    words = []
+    for text, overlapped in zip(texts, overlaps):
+        next_words = text.split()
+        if not next_words:
+            continue
+        if not overlapped:
+            words.extend(next_words)
+            continue
+
+        # Find the longest suffix of what we have that the next chunk starts with
+        overlap = 0
+        limit = min(max_overlap_words, len(words), len(next_words))
+        for size in range(limit, min_overlap_words - 1, -1):
+            tail = [_normalize_word(w) for w in words[-size:]]
+            head = [_normalize_word(w) for w in next_words[:size]]
+            if tail == head:
+                overlap = size
+                break
+
+        words.extend(next_words[overlap:])
+
+    return " ".join(words)
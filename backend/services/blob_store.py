@@ -0,0 +1,342 @@
+"""Content-addressed storage for meeting media (audio and photos)"""
+from config.settings import BLOB_STORE, BLOB_STORE_DIR, MEDIA_CHUNK_SIZE, BLOB_GC_GRACE_SECONDS
+from database.connection import get_database
+from services.media_files import SpooledMedia, spool_file
+from datetime import datetime, timezone
+import threading
+import tempfile
+import shutil
+import time
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+_store = None
+_store_lock = threading.Lock()
+
+
+class LocalBlobStore:
+    """
+    Blobs stored as files under a root directory, named by their sha256
+
+    Shared by every process that mounts the same directory, so API and
+    workers on different machines need it on a shared filesystem. Blobs are
+    read in place, without a copy. Partial resumable uploads are kept
+    under uploads/ until they are finalized.
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    def exists(self, key):
+        return os.path.exists(self._path(key))
+
+    def put(self, key, fileobj):
+        """Store the content of fileobj under key (no-op if already stored)"""
+        path = self._path(key)
+        if os.path.exists(path):
+            try:
+                # Reused content counts as freshly stored for the blob sweep
+                os.utime(path)
+                return False
+            except FileNotFoundError:
+                # Swept since the check above, so store it again
+                pass
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temp file and rename so readers never see a partial blob
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp_")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                shutil.copyfileobj(fileobj, out, MEDIA_CHUNK_SIZE)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        return True
+
+    def get(self, ref):
+        """Open a stored blob as SpooledMedia (closing it leaves the blob in place)"""
+        return SpooledMedia(
+            self._path(ref["blob_key"]),
+            ref.get("filename"),
+            ref.get("content_type"),
+            ref.get("size"),
+            ref["blob_key"],
+            owned=False
+        )
+
+    def delete(self, key):
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def delete_if_stored_before(self, key, stored_before):
+        """Delete a blob unless it was stored or reused since stored_before"""
+        path = self._path(key)
+        try:
+            if os.path.getmtime(path) >= stored_before:
+                return False
+            # Move it aside first so a put that reuses it now either touches
+            # it before the move (and the check below restores it) or finds
+            # it gone and stores it again
+            trash_path = os.path.join(os.path.dirname(path), f".tmp_sweep_{key}")
+            os.replace(path, trash_path)
+        except FileNotFoundError:
+            return False
+        if os.path.getmtime(trash_path) >= stored_before:
+            os.replace(trash_path, path)
+            return False
+        os.unlink(trash_path)
+        return True
+
+    def list_blobs(self, stored_before):
+        """Keys of blobs last stored before the stored_before timestamp"""
+        if not os.path.isdir(self.root):
+            return []
+        keys = []
+        for prefix in os.listdir(self.root):
+            directory = os.path.join(self.root, prefix)
+            if prefix == "uploads" or not os.path.isdir(directory):
+                continue
+            for name in os.listdir(directory):
+                if name.startswith(".tmp_"):
+                    continue
+                try:
+                    if os.path.getmtime(os.path.join(directory, name)) < stored_before:
+                        keys.append(name)
+                except FileNotFoundError:
+                    pass
+        return keys
+
+    def _part_path(self, upload_id):
+        return os.path.join(self.root, "uploads", upload_id)
+
+    def write_part(self, upload_id, offset, data):
+        """Write data at offset of a partial upload, dropping anything after it"""
+        path = self._part_path(upload_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        with os.fdopen(fd, "r+b") as part:
+            part.truncate(offset)
+            part.seek(offset)
+            part.write(data)
+
+    def iter_part(self, upload_id, size):
+        """Read the first size bytes of a partial upload in blocks"""
+        with open(self._part_path(upload_id), "rb") as part:
+            remaining = size
+            while remaining > 0:
+                block = part.read(min(MEDIA_CHUNK_SIZE, remaining))
+                if not block:
+                    raise IOError(f"Upload {upload_id} is shorter than {size} bytes")
+                remaining -= len(block)
+                yield block
+
+    def delete_part(self, upload_id):
+        try:
+            os.unlink(self._part_path(upload_id))
+        except FileNotFoundError:
+            pass
+
+
+class GridFSBlobStore:
+    """
+    Blobs stored in a GridFS bucket with the sha256 as the file _id
+
+    Partial resumable uploads are kept as {upload_id, offset, data}
+    documents in <bucket>.upload_parts until they are finalized.
+    """
+
+    def __init__(self, bucket_name="media"):
+        self.bucket_name = bucket_name
+
+    @property
+    def bucket(self):
+        import gridfs
+        return gridfs.GridFSBucket(get_database(), bucket_name=self.bucket_name, chunk_size_bytes=MEDIA_CHUNK_SIZE)
+
+    @property
+    def files(self):
+        return get_database()[f"{self.bucket_name}.files"]
+
+    def exists(self, key):
+        return self.files.find_one({"_id": key}, {"_id": 1}) is not None
+
+    def put(self, key, fileobj):
+        """Store the content of fileobj under key (no-op if already stored)"""
+        from gridfs.errors import FileExists
+
+        # Reused content counts as freshly stored for the blob sweep
+        if self.files.update_one({"_id": key}, {"$set": {"uploadDate": datetime.utcnow()}}).matched_count:
+            return False
+        try:
+            self.bucket.upload_from_stream_with_id(key, key, fileobj)
+        except FileExists:
+            # Another request stored the same content first
+            return False
+        return True
+
+    def get(self, ref):
+        """Download a blob to a local temp file (deleted when the SpooledMedia is closed)"""
+        stream = self.bucket.open_download_stream(ref["blob_key"])
+        try:
+            return spool_file(stream, ref.get("filename"), ref.get("content_type"))
+        finally:
+            stream.close()
+
+    def delete(self, key):
+        from gridfs.errors import NoFile
+
+        try:
+            self.bucket.delete(key)
+        except NoFile:
+            pass
+
+    @staticmethod
+    def _upload_cutoff(stored_before):
+        # GridFS upload dates are naive UTC
+        return datetime.fromtimestamp(stored_before, timezone.utc).replace(tzinfo=None)
+
+    def delete_if_stored_before(self, key, stored_before):
+        """Delete a blob unless it was stored or reused since stored_before"""
+        result = self.files.delete_one({"_id": key, "uploadDate": {"$lt": self._upload_cutoff(stored_before)}})
+        if not result.deleted_count:
+            return False
+        get_database()[f"{self.bucket_name}.chunks"].delete_many({"files_id": key})
+        return True
+
+    def list_blobs(self, stored_before):
+        """Keys of blobs last stored before the stored_before timestamp"""
+        cutoff = self._upload_cutoff(stored_before)
+        return [doc["_id"] for doc in self.files.find({"uploadDate": {"$lt": cutoff}}, {"_id": 1})]
+
+    @property
+    def parts(self):
+        return get_database()[f"{self.bucket_name}.upload_parts"]
+
+    def write_part(self, upload_id, offset, data):
+        """Write data at offset of a partial upload, dropping anything after it"""
+        from bson import Binary
+
+        self.parts.delete_many({"upload_id": upload_id, "offset": {"$gte": offset}})
+        if data:
+            self.parts.insert_many([
+                {"upload_id": upload_id, "offset": offset + start, "data": Binary(data[start:start + MEDIA_CHUNK_SIZE])}
+                for start in range(0, len(data), MEDIA_CHUNK_SIZE)
+            ])
+
+    def iter_part(self, upload_id, size):
+        """Read the first size bytes of a partial upload in blocks"""
+        position = 0
+        for part in self.parts.find({"upload_id": upload_id, "offset": {"$lt": size}}).sort("offset", 1):
+            if part["offset"] != position:
+                raise IOError(f"Upload {upload_id} is missing data at offset {position}")
+            block = bytes(part["data"][:size - position])
+            position += len(block)
+            yield block
+        if position != size:
+            raise IOError(f"Upload {upload_id} is shorter than {size} bytes")
+
+    def delete_part(self, upload_id):
+        self.parts.delete_many({"upload_id": upload_id})
+
+
+def get_blob_store():
+    """Get the blob store selected by BLOB_STORE ("local" or "gridfs")"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if BLOB_STORE == "gridfs":
+                    _store = GridFSBlobStore()
+                elif BLOB_STORE == "local":
+                    _store = LocalBlobStore(BLOB_STORE_DIR)
+                else:
+                    raise ValueError(f"Unknown BLOB_STORE: {BLOB_STORE}")
+                logger.info(f"[BLOB_STORE] Using {BLOB_STORE} blob store")
+    return _store
+
+
+def store_media(media):
+    """
+    Store spooled media and get a reference that can go in task input_data
+
+    Identical content is only stored once.
+
+    Args:
+        media: SpooledMedia object
+
+    Returns:
+        dict: {blob_key, filename, content_type, size}
+    """
+    media.file.seek(0)
+    stored = get_blob_store().put(media.sha256, media.file)
+    media.file.seek(0)
+    if not stored:
+        logger.info(f"[BLOB_STORE] {media.filename} already stored as {media.sha256}")
+    return {
+        "blob_key": media.sha256,
+        "filename": media.filename,
+        "content_type": media.content_type,
+        "size": media.size
+    }
+
+
+def load_media(ref):
+    """
+    Open media stored by store_media
+
+    Args:
+        ref: Reference returned by store_media
+
+    Returns:
+        SpooledMedia: Call close() when done
+    """
+    return get_blob_store().get(ref)
+
+
+def referenced_blob_keys(db):
+    """Blob keys still needed by unfinished tasks or by uploads"""
+    active = {"status": {"$in": ["pending", "assigned"]}}
+    keys = set(db.tasks.distinct("input_data.audio.blob_key", active))
+    keys.update(db.tasks.distinct("input_data.photos.blob_key", active))
+    keys.update(db.uploads.distinct("blob.blob_key"))
+    return keys
+
+
+def sweep_unreferenced_blobs(grace_seconds=BLOB_GC_GRACE_SECONDS):
+    """
+    Delete blobs that no unfinished task or upload refers to
+
+    Blobs stored or reused within grace_seconds are kept, so media stored
+    just before its task is inserted is never swept from under it. Each
+    candidate is re-checked against the cutoff as it is deleted, so a blob
+    reused after the references were read is kept too. Finished and failed
+    tasks don't keep their media.
+
+    Returns:
+        int: Number of blobs deleted
+    """
+    store = get_blob_store()
+    stored_before = time.time() - grace_seconds
+    candidates = store.list_blobs(stored_before)
+    if not candidates:
+        return 0
+
+    # A candidate can still be reused (put again and referenced) after this
+    # read, which is why the delete itself re-checks when it was last stored
+    referenced = referenced_blob_keys(get_database())
+    deleted = 0
+    for key in candidates:
+        if key not in referenced and store.delete_if_stored_before(key, stored_before):
+            deleted += 1
+    if deleted:
+        logger.info(f"[BLOB_STORE] Deleted {deleted} unreferenced blob(s)")
+    return deleted
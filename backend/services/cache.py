@@ -0,0 +1,137 @@
+"""Two-tier cache: an in-process LRU in front of a MongoDB collection"""
+from database.connection import get_database
+from collections import OrderedDict
+from datetime import datetime
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache"""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class CacheStats:
+    """Hit/miss counters grouped by a label (e.g. the calling agent)"""
+
+    def __init__(self):
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def record(self, label, outcome):
+        with self._lock:
+            counts = self._counts.setdefault(label, {"memory_hits": 0, "store_hits": 0, "misses": 0})
+            counts[outcome] += 1
+
+    def snapshot(self):
+        with self._lock:
+            result = {}
+            for label, counts in self._counts.items():
+                total = sum(counts.values())
+                hits = counts["memory_hits"] + counts["store_hits"]
+                result[label] = {**counts, "hit_ratio": round(hits / total, 4) if total else 0.0}
+            return result
+
+
+class TieredCache:
+    """
+    In-process LRU backed by a MongoDB collection
+
+    Documents are stored as {_id: key, value, label, created_at}. Expiry is
+    handled by a TTL index on created_at (see scripts/setup_database.py),
+    and the collection is trimmed to max_documents, oldest first.
+    """
+
+    # How many writes between size checks on the Mongo collection
+    EVICTION_CHECK_INTERVAL = 100
+
+    def __init__(self, collection_name, memory_entries=1024, max_documents=50000):
+        self.collection_name = collection_name
+        self.max_documents = max_documents
+        self.memory = LRUCache(memory_entries)
+        self.stats = CacheStats()
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def collection(self):
+        return get_database()[self.collection_name]
+
+    def get(self, key, label="default"):
+        """Get a cached value, or None on a miss"""
+        value = self.memory.get(key)
+        if value is not None:
+            self.stats.record(label, "memory_hits")
+            return value
+
+        try:
+            doc = self.collection.find_one({"_id": key}, {"value": 1})
+        except Exception as e:
+            logger.warning(f"[CACHE] {self.collection_name} lookup failed: {e}")
+            doc = None
+
+        if doc is not None:
+            self.memory.set(key, doc["value"])
+            self.stats.record(label, "store_hits")
+            return doc["value"]
+
+        self.stats.record(label, "misses")
+        return None
+
+    def set(self, key, value, label="default"):
+        """Store a value in both tiers"""
+        self.memory.set(key, value)
+        try:
+            self.collection.update_one(
+                {"_id": key},
+                {"$set": {"value": value, "label": label, "created_at": datetime.now()}},
+                upsert=True
+            )
+        except Exception as e:
+            logger.warning(f"[CACHE] {self.collection_name} write failed: {e}")
+            return
+
+        with self._lock:
+            self._writes += 1
+            check = self._writes % self.EVICTION_CHECK_INTERVAL == 0
+        if check:
+            self._evict_oldest()
+
+    def _evict_oldest(self):
+        """Trim the collection back to max_documents"""
+        try:
+            excess = self.collection.estimated_document_count() - self.max_documents
+            if excess <= 0:
+                return
+            oldest = [doc["_id"] for doc in self.collection.find({}, {"_id": 1}).sort("created_at", 1).limit(excess)]
+            self.collection.delete_many({"_id": {"$in": oldest}})
+            logger.info(f"[CACHE] Evicted {len(oldest)} entries from {self.collection_name}")
+        except Exception as e:
+            logger.warning(f"[CACHE] {self.collection_name} eviction failed: {e}")
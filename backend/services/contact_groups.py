@@ -0,0 +1,343 @@
+"""Materialized read model of each user's contacts grouped by priority (contact_groups collection)"""
+from config.settings import CONTACT_TOMBSTONE_TTL_SECONDS
+from services.user_versions import reserve_change, commit_change
+from datetime import datetime, timedelta
+from pymongo import UpdateOne
+from bson import json_util
+import base64
+import logging
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_GROUPS = ["P0", "P1", "P2"]
+
+# Fields returned to the frontend for each contact
+CONTACT_FIELDS = {
+    "_id": 0,
+    "name": 1,
+    "company": 1,
+    "designation": 1,
+    "summary": 1,
+    "meeting_date": 1,
+    "meeting_timestamp": 1,
+    "meeting_id": 1
+}
+
+# Oldest meeting first, the order GET /groups has always returned
+CONTACT_SORT = [("meeting_timestamp", 1)]
+
+# Orders for paginated reads: (field, direction), with meeting_id breaking ties
+PAGE_SORTS = {
+    "date": ("meeting_timestamp", -1),
+    "score": ("score", -1)
+}
+
+# Largest page a client can ask for
+MAX_PAGE_SIZE = 100
+
+# Largest batch of changes returned by GET /groups/changes
+MAX_CHANGES = 500
+
+
+def build_contact_entry(person, meeting):
+    """
+    Build the contact_groups document for one categorized meeting
+
+    Args:
+        person: People document (name, company, job_title, categorization)
+        meeting: Meetings document (user_id, priority_group, summary, date, created_at)
+
+    Returns:
+        dict: contact_groups document
+    """
+    return {
+        "user_id": meeting.get("user_id", "default"),
+        "meeting_id": meeting["meeting_id"],
+        "person_id": person["person_id"],
+        "priority_group": meeting["priority_group"],
+        "score": (person.get("categorization") or {}).get("score") or 0,
+        "name": person.get("name"),
+        "company": person.get("company"),
+        "designation": person.get("job_title"),
+        "summary": (meeting.get("summary") or {}).get("text"),
+        "meeting_date": meeting.get("date"),
+        "meeting_timestamp": meeting.get("created_at"),
+        "updated_at": datetime.now()
+    }
+
+
+def upsert_contact_entry(db, person, meeting):
+    """
+    Write one meeting's entry after it has been categorized
+
+    The entry is stamped with the next change sequence number of its user,
+    which is what GET /groups/changes reads in order.
+
+    Args:
+        db: Database instance
+        person: People document as of categorization
+        meeting: Meetings document as of categorization
+    """
+    if meeting.get("priority_group") not in PRIORITY_GROUPS:
+        return
+    entry = build_contact_entry(person, meeting)
+    entry["seq"] = reserve_change(db, entry["user_id"], "groups")
+    try:
+        db.contact_groups.update_one(
+            {"meeting_id": entry["meeting_id"]},
+            {"$set": entry, "$unset": {"deleted": "", "deleted_at": ""}},
+            upsert=True
+        )
+    finally:
+        commit_change(db, entry["user_id"], "groups", entry["seq"])
+
+
+def tombstone_update(seq, now=None):
+    """
+    Update that turns contact entries into tombstones
+
+    Tombstones keep meeting_id, user_id and a new change sequence number
+    (from reserve_change) so delta sync can report the deletion;
+    priority_group is cleared, which keeps them out of every grouped read.
+    They expire through the TTL index on deleted_at.
+    """
+    now = now or datetime.now()
+    unset = {field: "" for field in CONTACT_FIELDS if field not in ("_id", "meeting_id")}
+    unset["score"] = ""
+    return {
+        "$set": {"priority_group": None, "deleted": True, "deleted_at": now, "updated_at": now, "seq": seq},
+        "$unset": unset
+    }
+
+
+def group_contacts(entries):
+    """Bucket contact entries by priority group, keeping their order"""
+    groups = {priority: [] for priority in PRIORITY_GROUPS}
+    for entry in entries:
+        priority = entry.pop("priority_group", None)
+        if priority in groups:
+            groups[priority].append(entry)
+    return groups
+
+
+def contact_projection(fields=None):
+    """
+    Projection for contact entries, limited to the requested fields
+
+    Args:
+        fields: Iterable of CONTACT_FIELDS names, or None for all of them
+
+    Returns:
+        dict: MongoDB projection (meeting_id is always included)
+    """
+    if not fields:
+        return dict(CONTACT_FIELDS)
+    unknown = set(fields) - set(CONTACT_FIELDS) - {"_id"}
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    projection = {"_id": 0, "meeting_id": 1}
+    projection.update({field: 1 for field in fields})
+    return projection
+
+
+def _encode_position(*values):
+    payload = json_util.dumps(list(values))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def _decode_position(token, kind="cursor"):
+    try:
+        return json_util.loads(base64.urlsafe_b64decode(token.encode()))
+    except Exception:
+        raise ValueError(f"Invalid {kind}")
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+# What a cursor's sort value may be, per sort (None for entries missing it)
+_CURSOR_VALUE_CHECKS = {
+    "date": lambda value: value is None or isinstance(value, datetime),
+    "score": lambda value: value is None or _is_number(value)
+}
+
+
+def encode_cursor(sort, entry):
+    """Opaque cursor pointing just after entry in the given sort order"""
+    field, _ = PAGE_SORTS[sort]
+    return _encode_position(sort, entry.get(field), entry["meeting_id"])
+
+
+def decode_cursor(cursor, sort="date"):
+    """
+    Inverse of encode_cursor
+
+    Raises ValueError for a malformed cursor or one issued for another sort.
+    """
+    position = _decode_position(cursor)
+    if not isinstance(position, list) or len(position) != 3:
+        raise ValueError("Invalid cursor")
+    cursor_sort, value, meeting_id = position
+    if cursor_sort != sort:
+        raise ValueError(f"Cursor was not issued for sort={sort}")
+    if not _CURSOR_VALUE_CHECKS[sort](value) or not isinstance(meeting_id, str):
+        raise ValueError("Invalid cursor")
+    return value, meeting_id
+
+
+def decode_token(token):
+    """
+    Inverse of change_token and sync_token
+
+    Returns:
+        tuple: (seq, meeting_id or None, issued_at); raises ValueError for a
+        malformed token
+    """
+    position = _decode_position(token, "token")
+    if not isinstance(position, list) or len(position) != 3:
+        raise ValueError("Invalid token")
+    seq, meeting_id, issued_at = position
+    if not isinstance(seq, int) or isinstance(seq, bool) or seq < 0:
+        raise ValueError("Invalid token")
+    if meeting_id is not None and not isinstance(meeting_id, str):
+        raise ValueError("Invalid token")
+    if not isinstance(issued_at, datetime):
+        raise ValueError("Invalid token")
+    return seq, meeting_id, issued_at
+
+
+def page_query(user_id, priority, sort="date", cursor=None):
+    """
+    Filter and sort for one page of a priority group
+
+    Keyset pagination: the cursor holds the sort (checked against sort)
+    and the sort key of the last entry returned, so each page is a bounded index scan on
+    (user_id, priority_group, <sort field>, meeting_id) however deep it is.
+
+    Returns:
+        tuple: (filter, sort)
+    """
+    field, direction = PAGE_SORTS[sort]
+    query = {"user_id": user_id, "priority_group": priority}
+    if cursor:
+        value, meeting_id = decode_cursor(cursor, sort)
+        op = "$lt" if direction < 0 else "$gt"
+        after = [{field: value, "meeting_id": {op: meeting_id}}]
+        # Entries missing the sort field sort below every value, and range
+        # operators never match them, so they are reached explicitly
+        if value is None:
+            if direction > 0:
+                after.append({field: {"$ne": None}})
+        else:
+            after.insert(0, {field: {op: value}})
+            if direction < 0:
+                after.append({field: None})
+        query["$or"] = after
+    return query, [(field, direction), ("meeting_id", direction)]
+
+
+def changes_query(user_id, since=None, committed=0, now=None):
+    """
+    Filter, sort and next-token position for GET /groups/changes
+
+    Every write to a user's entries is stamped with a sequence number from
+    reserve_change, and changes are read in (seq, meeting_id) order starting
+    after the position in the since token, up to the committed sequence
+    number (get_committed_change_async), so a write still in flight is
+    never skipped. Without a token, or with one older than the tombstone
+    retention (deletions may have been forgotten), the client has to start
+    over: the query then returns every live entry and reset is True.
+
+    Args:
+        user_id: User whose contacts to read
+        since: Token from a previous call, or None
+        committed: Sequence number every change up to which has been written
+        now: Current time (for tests)
+
+    Returns:
+        tuple: (filter, sort, reset, caught_up_token) where caught_up_token
+        is the token to hand back once every matching change has been read
+    """
+    now = now or datetime.now()
+    query = {"user_id": user_id, "seq": {"$lte": committed}}
+
+    reset = True
+    if since:
+        seq, meeting_id, issued_at = decode_token(since)
+        if issued_at >= now - timedelta(seconds=CONTACT_TOMBSTONE_TTL_SECONDS):
+            reset = False
+            if meeting_id is None:
+                query["seq"]["$gt"] = seq
+            else:
+                query["$or"] = [
+                    {"seq": {"$gt": seq}},
+                    {"seq": seq, "meeting_id": {"$gt": meeting_id}}
+                ]
+
+    if reset:
+        query["deleted"] = {"$ne": True}
+    return query, [("seq", 1), ("meeting_id", 1)], reset, sync_token(committed, now)
+
+
+def sync_token(committed, now=None):
+    """
+    Token covering every change up to the committed sequence number
+
+    Handed out with a full read, with committed read before the data, so
+    the client can continue with GET /groups/changes; a change made during
+    the read may be sent again, which is harmless since applying a change
+    twice has no effect.
+    """
+    return _encode_position(committed, None, now or datetime.now())
+
+
+def change_token(entry):
+    """Token pointing just after a change returned by GET /groups/changes"""
+    return _encode_position(entry["seq"], entry["meeting_id"], entry["updated_at"])
+
+
+def rebuild_contact_groups(db, user_id=None):
+    """
+    Rebuild contact_groups from the meetings and people collections
+
+    Used to backfill the read model; normal writes happen incrementally
+    when a meeting is categorized.
+
+    Returns:
+        int: Number of entries written
+    """
+    match = {"priority_group": {"$in": PRIORITY_GROUPS}, "status": "completed"}
+    if user_id:
+        match["user_id"] = user_id
+
+    pipeline = [
+        {"$match": match},
+        {"$lookup": {"from": "people", "localField": "person_id", "foreignField": "person_id", "as": "person"}},
+        {"$unwind": "$person"}
+    ]
+
+    entries = [build_contact_entry(meeting.pop("person"), meeting) for meeting in db.meetings.aggregate(pipeline)]
+    # One change sequence number per user for the whole batch
+    seqs = {}
+    for entry in entries:
+        if entry["user_id"] not in seqs:
+            seqs[entry["user_id"]] = reserve_change(db, entry["user_id"], "groups")
+        entry["seq"] = seqs[entry["user_id"]]
+
+    operations = [
+        UpdateOne(
+            {"meeting_id": entry["meeting_id"]},
+            {"$set": entry, "$unset": {"deleted": "", "deleted_at": ""}},
+            upsert=True
+        )
+        for entry in entries
+    ]
+    try:
+        if operations:
+            db.contact_groups.bulk_write(operations, ordered=False)
+    finally:
+        for rebuilt_user_id, seq in seqs.items():
+            commit_change(db, rebuilt_user_id, "groups", seq)
+    logger.info(f"[CONTACT_GROUPS] Rebuilt {len(operations)} entries")
+    return len(operations)
@@ -0,0 +1,84 @@
+"""Image preparation before Vision OCR (resizing needs the optional Pillow package)"""
+from config.settings import OCR_IMAGE_MAX_DIMENSION, OCR_IMAGE_JPEG_QUALITY
+import io
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def dedupe_images(image_files):
+    """
+    Drop uploads whose content is identical to an earlier one
+
+    Args:
+        image_files: List of SpooledMedia objects
+
+    Returns:
+        tuple: (unique files in upload order, {index of duplicate: filename of first copy})
+    """
+    unique = []
+    duplicates = {}
+    seen = {}
+    for index, image_file in enumerate(image_files):
+        if image_file.sha256 in seen:
+            duplicates[index] = seen[image_file.sha256]
+            logger.info(f"[IMAGE] {image_file.filename} is a duplicate of {seen[image_file.sha256]}, skipping")
+            continue
+        seen[image_file.sha256] = image_file.filename
+        unique.append(image_file)
+    return unique, duplicates
+
+
+def _read_original(image_file):
+    image_file.file.seek(0)
+    content = image_file.file.read()
+    image_file.file.seek(0)
+    return content, image_file.content_type or "image/jpeg"
+
+
+def prepare_image(image_file):
+    """
+    Downscale and recompress an image to what OCR actually needs
+
+    The longest side is limited to OCR_IMAGE_MAX_DIMENSION and the result is
+    saved as JPEG. Pillow decodes straight from the spooled file, so the
+    original bytes are only read into memory when they are sent as-is:
+    Pillow is not installed, the image can't be decoded, or the result
+    would not be smaller.
+
+    Args:
+        image_file: SpooledMedia object
+
+    Returns:
+        tuple: (image bytes, content type)
+    """
+    try:
+        from PIL import Image, ImageOps
+    except ImportError:
+        logger.warning("[IMAGE] Pillow not installed, sending original image. Install with: pip install Pillow")
+        return _read_original(image_file)
+
+    max_size = (OCR_IMAGE_MAX_DIMENSION, OCR_IMAGE_MAX_DIMENSION)
+    try:
+        image_file.file.seek(0)
+        with Image.open(image_file.file) as image:
+            # For JPEGs this decodes at a reduced scale, so the full-size
+            # bitmap of a phone photo is never held in memory
+            image.draft("RGB", max_size)
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail(max_size)
+            if image.mode != "RGB":
+                image = image.convert("RGB")
+
+            buffer = io.BytesIO()
+            image.save(buffer, format="JPEG", quality=OCR_IMAGE_JPEG_QUALITY, optimize=True)
+    except Exception as e:
+        logger.warning(f"[IMAGE] Could not preprocess image, sending original: {e}")
+        return _read_original(image_file)
+
+    prepared = buffer.getvalue()
+    if len(prepared) >= image_file.size:
+        return _read_original(image_file)
+
+    logger.info(f"[IMAGE] Image size: {image_file.size} bytes -> {len(prepared)} bytes")
+    return prepared, "image/jpeg"
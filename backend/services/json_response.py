@@ -0,0 +1,55 @@
+"""JSON encoding for API responses that handles BSON types (ObjectId, datetime) while serializing"""
+from fastapi.responses import JSONResponse
+from bson import ObjectId
+from datetime import datetime, date
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    logger.info("[JSON] orjson not installed, using the json module. Install with: pip install orjson")
+
+
+def _default(obj):
+    """Encode the types MongoDB documents contain that JSON doesn't"""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content):
+    """
+    Serialize a response body to UTF-8 JSON bytes
+
+    ObjectIds become strings and datetimes ISO 8601 strings, the same
+    output as the convert_objectid helpers this replaces, but encoded in a
+    single pass without copying the documents first.
+    """
+    if orjson is not None:
+        # orjson writes datetimes natively, in the same format as isoformat()
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content,
+        default=_default,
+        ensure_ascii=False,
+        allow_nan=False,
+        separators=(",", ":")
+    ).encode("utf-8")
+
+
+class BSONJSONResponse(JSONResponse):
+    """
+    JSONResponse that accepts MongoDB documents as they come from the driver
+
+    Return it from a route (rather than a plain dict) to skip FastAPI's
+    jsonable_encoder pass, which doesn't know about ObjectId.
+    """
+
+    def render(self, content):
+        return dumps(content)
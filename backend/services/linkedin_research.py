@@ -1,6 +1,6 @@
 """LinkedIn research service for enriching person profiles"""
 from config.settings import OPENAI_API_KEY, GOOGLE_API_KEY, GOOGLE_CSE_ID
-from openai import OpenAI
+from services.openai_client import get_openai_client
 import logging
 import json
 import requests
@@ -162,7 +162,7 @@ def search_linkedin_profile(name, company, job_title=None):
 def generate_ai_linkedin_profile(name, company, job_title=None, linkedin_url=None):
     """Generate realistic LinkedIn profile using AI (fallback method)"""
     try:
-        client = OpenAI(api_key=OPENAI_API_KEY)
+        client = get_openai_client()
         
         logger.info(f"[LINKEDIN] Generating AI profile for: {name} at {company}")
         
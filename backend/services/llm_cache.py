@@ -0,0 +1,101 @@
+"""Content-addressed cache for chat completion responses"""
+from config.settings import (
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_MEMORY_ENTRIES,
+    LLM_CACHE_MAX_DOCUMENTS
+)
+from services.cache import TieredCache
+import asyncio
+import hashlib
+import json
+
+_cache = TieredCache(
+    "llm_cache",
+    memory_entries=LLM_CACHE_MEMORY_ENTRIES,
+    max_documents=LLM_CACHE_MAX_DOCUMENTS
+)
+
+
+def cache_key(prompt_version, **request):
+    """Hash everything that determines the response of a chat completion"""
+    payload = json.dumps({"prompt_version": prompt_version, **request}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _cacheable(request):
+    """
+    Text-only requests are cached here; vision requests are not
+
+    Hashing a base64 image payload costs more than it saves, and image
+    results are cached by media content hash instead (services/media_cache.py).
+    """
+    if not LLM_CACHE_ENABLED:
+        return False
+    for message in request.get("messages", []):
+        content = message.get("content")
+        if isinstance(content, list) and any(part.get("type") == "image_url" for part in content):
+            return False
+    return True
+
+
+def cached_chat_completion(client, agent, prompt_version, **request):
+    """
+    Run a chat completion, reusing a previous answer for an identical request
+
+    Args:
+        client: OpenAI client
+        agent: Label for hit/miss counters (e.g. "extraction")
+        prompt_version: Version of the prompt file the request was rendered from
+        **request: Arguments for client.chat.completions.create
+            (model, messages, temperature, response_format, ...)
+
+    Returns:
+        str: Stripped message content of the first choice
+    """
+    if not _cacheable(request):
+        response = client.chat.completions.create(**request)
+        return response.choices[0].message.content.strip()
+
+    key = cache_key(prompt_version, **request)
+    cached = _cache.get(key, label=agent)
+    if cached is not None:
+        return cached
+
+    response = client.chat.completions.create(**request)
+    content = response.choices[0].message.content.strip()
+    _cache.set(key, content, label=agent)
+    return content
+
+
+async def cached_chat_completion_async(client, agent, prompt_version, **request):
+    """
+    Async variant of cached_chat_completion for use on the event loop
+    
+    Args:
+        client: AsyncOpenAI client
+        agent: Label for hit/miss counters
+        prompt_version: Version of the prompt file the request was rendered from
+        **request: Arguments for client.chat.completions.create
+    
+    Returns:
+        str: Stripped message content of the first choice
+    """
+    if not _cacheable(request):
+        response = await client.chat.completions.create(**request)
+        return response.choices[0].message.content.strip()
+    
+    # The Mongo tier of the cache is synchronous, so it runs in a thread
+    key = cache_key(prompt_version, **request)
+    cached = await asyncio.to_thread(_cache.get, key, agent)
+    if cached is not None:
+        return cached
+    
+    response = await client.chat.completions.create(**request)
+    content = response.choices[0].message.content.strip()
+    await asyncio.to_thread(_cache.set, key, content, agent)
+    return content
+
+
+def get_cache_stats():
+    """Get hit/miss counters per agent"""
+    return _cache.stats.snapshot()
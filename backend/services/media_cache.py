@@ -0,0 +1,47 @@
+"""Cache of OCR and transcription results keyed by the hash of the media content"""
+from config.settings import (
+    MEDIA_CACHE_ENABLED,
+    MEDIA_CACHE_MEMORY_ENTRIES,
+    MEDIA_CACHE_MAX_DOCUMENTS
+)
+from services.cache import TieredCache
+import hashlib
+
+_cache = TieredCache(
+    "media_cache",
+    memory_entries=MEDIA_CACHE_MEMORY_ENTRIES,
+    max_documents=MEDIA_CACHE_MAX_DOCUMENTS
+)
+
+
+def media_key(kind, content_hash, version):
+    """
+    Build the cache key for a piece of media
+
+    Args:
+        kind: "ocr" or "transcription"
+        content_hash: sha256 of the media bytes (SpooledMedia.sha256)
+        version: Anything else the result depends on (model, prompt version, ...)
+
+    Returns:
+        str: Hex digest
+    """
+    return hashlib.sha256(f"{kind}:{version}:{content_hash}".encode("utf-8")).hexdigest()
+
+
+def get_cached_text(key, kind):
+    """Get the text previously extracted from identical media, or None"""
+    if not MEDIA_CACHE_ENABLED:
+        return None
+    return _cache.get(key, label=kind)
+
+
+def set_cached_text(key, text, kind):
+    """Remember the text extracted from a piece of media"""
+    if MEDIA_CACHE_ENABLED and text:
+        _cache.set(key, text, label=kind)
+
+
+def get_media_cache_stats():
+    """Get hit/miss counters for OCR and transcription"""
+    return _cache.stats.snapshot()
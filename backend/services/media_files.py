@@ -0,0 +1,117 @@
+"""Upload spooling: media is copied to temp files in fixed-size blocks and read back as streams"""
+from config.settings import MEDIA_SPOOL_DIR, MEDIA_CHUNK_SIZE
+import hashlib
+import os
+import tempfile
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SpooledMedia:
+    """
+    An uploaded file spooled to disk, with its size and content hash
+
+    Exposes filename, content_type, size and an open binary .file like
+    FastAPI's UploadFile, so it can be passed wherever one was used. Keeps
+    the original extension on the temp file so APIs that sniff the format
+    from the name (Whisper, ffmpeg) still work. With owned=False the file
+    belongs to someone else (e.g. the local blob store) and is left in
+    place on close().
+    """
+
+    def __init__(self, path, filename, content_type, size, sha256, owned=True):
+        self.path = path
+        self.filename = filename
+        self.content_type = content_type
+        self.size = size
+        self.sha256 = sha256
+        self.owned = owned
+        self.file = open(path, "rb")
+
+    def iter_chunks(self, chunk_size=MEDIA_CHUNK_SIZE):
+        """Read the file from the start in blocks of chunk_size"""
+        self.file.seek(0)
+        for block in iter(lambda: self.file.read(chunk_size), b""):
+            yield block
+        self.file.seek(0)
+
+    def close(self):
+        """Close and delete the spooled file"""
+        self.file.close()
+        if not self.owned:
+            return
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def spool_blocks(blocks, filename=None, content_type=None):
+    """
+    Write an iterable of byte blocks to a temp file, hashing it on the way
+
+    Args:
+        blocks: Iterable of bytes
+        filename: Original filename
+        content_type: MIME type
+
+    Returns:
+        SpooledMedia: Spooled copy (call close() to delete it)
+    """
+    suffix = ""
+    if filename and "." in filename:
+        suffix = "." + filename.rsplit(".", 1)[1].lower()
+
+    digest = hashlib.sha256()
+    size = 0
+    fd, path = tempfile.mkstemp(suffix=suffix, prefix="media_", dir=MEDIA_SPOOL_DIR)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            for block in blocks:
+                digest.update(block)
+                size += len(block)
+                out.write(block)
+    except Exception:
+        os.unlink(path)
+        raise
+
+    logger.info(f"[MEDIA] Spooled {filename}: {size} bytes")
+    return SpooledMedia(path, filename, content_type, size, digest.hexdigest())
+
+
+def spool_file(fileobj, filename=None, content_type=None):
+    """
+    Copy a file-like object to a temp file, hashing it on the way
+
+    At most MEDIA_CHUNK_SIZE bytes are held in memory at a time.
+
+    Args:
+        fileobj: Readable binary file-like object
+        filename: Original filename
+        content_type: MIME type
+
+    Returns:
+        SpooledMedia: Spooled copy (call close() to delete it)
+    """
+    return spool_blocks(iter(lambda: fileobj.read(MEDIA_CHUNK_SIZE), b""), filename, content_type)
+
+
+def spool_upload(upload_file):
+    """
+    Spool a FastAPI UploadFile to disk
+
+    Args:
+        upload_file: FastAPI UploadFile object
+
+    Returns:
+        SpooledMedia: Spooled copy (call close() to delete it)
+    """
+    upload_file.file.seek(0)
+    return spool_file(upload_file.file, upload_file.filename, upload_file.content_type)
@@ -1,18 +1,29 @@
 """OCR service for extracting text from images using OpenAI Vision API"""
-from config.settings import OPENAI_API_KEY
-from services.prompt_loader import load_prompt
-from openai import OpenAI
+from config.settings import (
+    OPENAI_API_KEY,
+    OCR_MAX_CONCURRENCY,
+    OCR_IMAGE_MAX_DIMENSION,
+    OCR_IMAGE_JPEG_QUALITY
+)
+from services.prompt_loader import load_prompt, prompt_version
+from services.openai_client import get_openai_client
+from services.image_processing import prepare_image
+from services.media_cache import media_key, get_cached_text, set_cached_text
+from concurrent.futures import ThreadPoolExecutor
 import base64
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Shared across requests so the limit holds for the whole process
+_ocr_executor = ThreadPoolExecutor(max_workers=OCR_MAX_CONCURRENCY, thread_name_prefix="ocr")
+
 def extract_text_from_image(image_file):
     """
     Extract text from image using OpenAI Vision API
     
     Args:
-        image_file: FastAPI UploadFile object
+        image_file: SpooledMedia object (see services/media_files.py)
         
     Returns:
         str: Extracted text or None if extraction fails
@@ -22,24 +33,33 @@ def extract_text_from_image(image_file):
         return None
     
     try:
-        client = OpenAI(api_key=OPENAI_API_KEY)
+        client = get_openai_client()
         
-        # Read image content
-        image_content = image_file.file.read()
-        image_file.file.seek(0)  # Reset for potential reuse
+        # The same photo may have been read before (re-uploads, retried submissions).
+        # OCR is cached here by the photo's content hash only; the request itself
+        # (a large base64 payload) is not worth hashing into the LLM cache too.
+        prompt_config = load_prompt("ocr.yaml")
+        cache_key = media_key(
+            "ocr",
+            image_file.sha256,
+            f"{prompt_version('ocr.yaml')}:{prompt_config['model']}:{OCR_IMAGE_MAX_DIMENSION}:{OCR_IMAGE_JPEG_QUALITY}"
+        )
+        cached_text = get_cached_text(cache_key, "ocr")
+        if cached_text is not None:
+            logger.info(f"[OCR] Reusing text for previously seen image: {image_file.filename}")
+            return cached_text
+        
+        # Downscale and recompress straight from the spooled file; only the
+        # smaller copy is ever held in memory
+        image_content, content_type = prepare_image(image_file)
         
         # Encode image to base64
         base64_image = base64.b64encode(image_content).decode('utf-8')
-        
-        # Determine image format
-        content_type = image_file.content_type or "image/jpeg"
+        del image_content
         
         # Use Vision API to extract text
         logger.info(f"[OCR] Processing image: {image_file.filename}")
         
-        # Load prompt from YAML
-        prompt_config = load_prompt("ocr.yaml")
-        
         response = client.chat.completions.create(
             model=prompt_config["model"],
             messages=[
@@ -61,13 +81,28 @@ def extract_text_from_image(image_file):
             ],
             max_tokens=prompt_config["max_tokens"]
         )
-        
         extracted_text = response.choices[0].message.content.strip()
+        
         logger.info(f"[OCR] Successfully extracted text: {len(extracted_text)} characters")
         logger.info(f"[OCR] Extracted text preview: {extracted_text[:100]}...")
         
+        set_cached_text(cache_key, extracted_text, "ocr")
         return extracted_text
     
     except Exception as e:
         logger.error(f"[OCR] Error extracting text from image {image_file.filename}: {str(e)}")
         return None
+
+def extract_text_from_images(image_files):
+    """
+    Extract text from several images in parallel
+    
+    At most OCR_MAX_CONCURRENCY Vision API calls run at once per process.
+    
+    Args:
+        image_files: List of SpooledMedia objects
+        
+    Returns:
+        list: Extracted text (or None) for each image, in upload order
+    """
+    return list(_ocr_executor.map(extract_text_from_image, image_files))
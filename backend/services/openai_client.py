@@ -0,0 +1,250 @@
+"""Shared OpenAI clients backed by a pooled keep-alive HTTP connection pool"""
+from config.settings import (
+    OPENAI_API_KEY,
+    OPENAI_MAX_CONNECTIONS,
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+    OPENAI_KEEPALIVE_EXPIRY,
+    OPENAI_TIMEOUT,
+    OPENAI_POOL_TIMEOUT
+)
+from openai import OpenAI, AsyncOpenAI
+import asyncio
+import threading
+import logging
+import time
+import httpx
+
+logger = logging.getLogger(__name__)
+
+_client = None
+_client_lock = threading.Lock()
+
+# Async clients (and their semaphores and connections) belong to the event
+# loop they were created on
+_async_client = None
+_async_client_loop = None
+
+
+class PoolMetrics:
+    """Counters for connection usage and time spent waiting for a free connection"""
+
+    def __init__(self, max_connections):
+        self.max_connections = max_connections
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.requests = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.transports = []
+        self._lock = threading.Lock()
+
+    def acquired(self, wait):
+        with self._lock:
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            self.requests += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def released(self):
+        with self._lock:
+            self.in_use -= 1
+
+    def open_connections(self):
+        """Count connections currently held open by the underlying pools"""
+        total = 0
+        for transport in self.transports:
+            pool = getattr(transport, "_pool", None)
+            total += len(getattr(pool, "connections", []))
+        return total
+
+    def snapshot(self):
+        with self._lock:
+            open_connections = self.open_connections()
+            return {
+                "max_connections": self.max_connections,
+                "in_use": self.in_use,
+                "idle": max(0, open_connections - self.in_use),
+                "peak_in_use": self.peak_in_use,
+                "requests": self.requests,
+                "avg_wait_ms": round(self.total_wait / self.requests * 1000, 2) if self.requests else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 2)
+            }
+
+
+class _MeteredStream(httpx.SyncByteStream):
+    """Response body wrapper that frees the connection slot once the body is closed"""
+
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._release = release
+
+    def __iter__(self):
+        yield from self._stream
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            self._release()
+
+
+class _AsyncMeteredStream(httpx.AsyncByteStream):
+    def __init__(self, stream, release):
+        self._stream = stream
+        self._release = release
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            self._release()
+
+
+def _once(func):
+    """Wrap func so that only the first call runs it"""
+    lock = threading.Lock()
+    called = []
+
+    def wrapper():
+        with lock:
+            if called:
+                return
+            called.append(True)
+        func()
+    return wrapper
+
+
+class MeteredTransport(httpx.HTTPTransport):
+    """HTTP transport that records pool usage and connection wait time"""
+
+    def __init__(self, metrics, **kwargs):
+        super().__init__(**kwargs)
+        self.metrics = metrics
+        self._slots = threading.BoundedSemaphore(metrics.max_connections)
+        metrics.transports.append(self)
+
+    def handle_request(self, request):
+        start = time.perf_counter()
+        if not self._slots.acquire(timeout=OPENAI_POOL_TIMEOUT):
+            raise httpx.PoolTimeout(f"No free OpenAI connection after {OPENAI_POOL_TIMEOUT}s", request=request)
+        self.metrics.acquired(time.perf_counter() - start)
+
+        def release():
+            self.metrics.released()
+            self._slots.release()
+
+        try:
+            response = super().handle_request(request)
+        except Exception:
+            release()
+            raise
+        response.stream = _MeteredStream(response.stream, _once(release))
+        return response
+
+
+class AsyncMeteredTransport(httpx.AsyncHTTPTransport):
+    """Async variant of MeteredTransport (only usable on the event loop it was created on)"""
+
+    def __init__(self, metrics, **kwargs):
+        super().__init__(**kwargs)
+        self.metrics = metrics
+        self._slots = asyncio.BoundedSemaphore(metrics.max_connections)
+        metrics.transports.append(self)
+
+    async def handle_async_request(self, request):
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=OPENAI_POOL_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise httpx.PoolTimeout(f"No free OpenAI connection after {OPENAI_POOL_TIMEOUT}s", request=request)
+        self.metrics.acquired(time.perf_counter() - start)
+
+        def release():
+            self.metrics.released()
+            self._slots.release()
+
+        try:
+            response = await super().handle_async_request(request)
+        except Exception:
+            release()
+            raise
+        response.stream = _AsyncMeteredStream(response.stream, _once(release))
+        return response
+
+
+pool_metrics = PoolMetrics(OPENAI_MAX_CONNECTIONS)
+async_pool_metrics = PoolMetrics(OPENAI_MAX_CONNECTIONS)
+
+
+def _limits():
+    return httpx.Limits(
+        max_connections=OPENAI_MAX_CONNECTIONS,
+        max_keepalive_connections=OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY
+    )
+
+
+def get_openai_client():
+    """
+    Get the process-wide OpenAI client
+
+    Every agent and service shares one keep-alive connection pool, so calls
+    reuse warm TLS connections instead of paying connection setup each time.
+
+    Returns:
+        OpenAI: Shared client, or None if OPENAI_API_KEY is not set
+    """
+    global _client
+    if not OPENAI_API_KEY:
+        return None
+
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                http_client = httpx.Client(
+                    transport=MeteredTransport(pool_metrics, limits=_limits()),
+                    timeout=OPENAI_TIMEOUT
+                )
+                _client = OpenAI(api_key=OPENAI_API_KEY, http_client=http_client)
+                logger.info(f"[OPENAI] Created shared client (max_connections={OPENAI_MAX_CONNECTIONS})")
+    return _client
+
+
+def get_async_openai_client():
+    """
+    Get the AsyncOpenAI client for the running event loop (call from a coroutine)
+
+    Its connection pool and slot semaphore are bound to the loop, so a new
+    client is made if the loop changes (e.g. between tests).
+
+    Returns:
+        AsyncOpenAI: Shared async client, or None if OPENAI_API_KEY is not set
+    """
+    global _async_client, _async_client_loop
+    if not OPENAI_API_KEY:
+        return None
+
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client_loop is not loop:
+        transport = AsyncMeteredTransport(async_pool_metrics, limits=_limits())
+        with async_pool_metrics._lock:
+            # Connections of a previous loop's client can't be reused or closed from here
+            async_pool_metrics.transports = [transport]
+        http_client = httpx.AsyncClient(transport=transport, timeout=OPENAI_TIMEOUT)
+        _async_client = AsyncOpenAI(api_key=OPENAI_API_KEY, http_client=http_client)
+        _async_client_loop = loop
+        logger.info(f"[OPENAI] Created shared async client (max_connections={OPENAI_MAX_CONNECTIONS})")
+    return _async_client
+
+
+def get_pool_metrics():
+    """Get connection pool metrics for the sync and async clients"""
+    return {
+        "sync": pool_metrics.snapshot(),
+        "async": async_pool_metrics.snapshot()
+    }
@@ -1,10 +1,42 @@
 """Preference analysis service for extracting insights from user comments"""
 from config.settings import OPENAI_API_KEY
-from services.prompt_loader import load_prompt, format_prompt
-from openai import OpenAI
+from services.prompt_loader import load_prompt, format_prompt, prompt_version
+from services.llm_cache import cached_chat_completion, cached_chat_completion_async
+from services.openai_client import get_openai_client, get_async_openai_client
 import json
 import re
 
+def _build_request(comments):
+    """Build the chat completion arguments for analyzing comments"""
+    prompt_config = load_prompt("preference_analysis.yaml")
+    
+    # Format prompt with comments
+    user_prompt = format_prompt(
+        prompt_config["user_prompt_template"],
+        comments=comments
+    )
+    
+    return {
+        "model": prompt_config["model"],
+        "messages": [
+            {"role": "system", "content": prompt_config["system_message"]},
+            {"role": "user", "content": user_prompt}
+        ],
+        "temperature": prompt_config["temperature"]
+    }
+
+def _parse_result(result_text, comments):
+    """Parse the model's JSON answer, falling back to keyword extraction"""
+    try:
+        # Remove markdown code blocks if present
+        result_text = re.sub(r'```json\s*', '', result_text)
+        result_text = re.sub(r'```\s*', '', result_text)
+        extracted = json.loads(result_text)
+        return extracted
+    except:
+        # If JSON parsing fails, use simple extraction
+        return _simple_extract(comments)
+
 def analyze_comments(comments):
     """
     Analyze user comments to extract implicit preferences
@@ -23,38 +55,38 @@ def analyze_comments(comments):
         return _simple_extract(comments)
     
     try:
-        client = OpenAI(api_key=OPENAI_API_KEY)
-        
-        # Load prompts from YAML
-        prompt_config = load_prompt("preference_analysis.yaml")
+        client = get_openai_client()
         
-        # Format prompt with comments
-        user_prompt = format_prompt(
-            prompt_config["user_prompt_template"],
-            comments=comments
+        result_text = cached_chat_completion(
+            client,
+            agent="preference_analysis",
+            prompt_version=prompt_version("preference_analysis.yaml"),
+            **_build_request(comments)
         )
+        return _parse_result(result_text, comments)
+    
+    except Exception as e:
+        print(f"Error analyzing comments: {e}")
+        return _simple_extract(comments)
 
-        response = client.chat.completions.create(
-            model=prompt_config["model"],
-            messages=[
-                {"role": "system", "content": prompt_config["system_message"]},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=prompt_config["temperature"]
-        )
-        
-        result_text = response.choices[0].message.content.strip()
+async def analyze_comments_async(comments):
+    """Async variant of analyze_comments for use on the event loop"""
+    if not comments or not comments.strip():
+        return {}
+    
+    if not OPENAI_API_KEY:
+        return _simple_extract(comments)
+    
+    try:
+        client = get_async_openai_client()
         
-        # Try to parse JSON
-        try:
-            # Remove markdown code blocks if present
-            result_text = re.sub(r'```json\s*', '', result_text)
-            result_text = re.sub(r'```\s*', '', result_text)
-            extracted = json.loads(result_text)
-            return extracted
-        except:
-            # If JSON parsing fails, use simple extraction
-            return _simple_extract(comments)
+        result_text = await cached_chat_completion_async(
+            client,
+            agent="preference_analysis",
+            prompt_version=prompt_version("preference_analysis.yaml"),
+            **_build_request(comments)
+        )
+        return _parse_result(result_text, comments)
     
     except Exception as e:
         print(f"Error analyzing comments: {e}")
@@ -1,6 +1,8 @@
 """Prompt loader utility for loading prompts from YAML files"""
 import yaml
 import os
+import hashlib
+from functools import lru_cache
 from pathlib import Path
 
 # Get the prompts directory path
@@ -26,6 +28,20 @@ def load_prompt(prompt_file):
     
     return prompt_config
 
+@lru_cache(maxsize=None)
+def prompt_version(prompt_file):
+    """
+    Get a version identifier for a prompt file
+    
+    Args:
+        prompt_file: Name of the YAML file (e.g., "extraction.yaml")
+        
+    Returns:
+        str: Short hash of the file contents, changes whenever the prompt is edited
+    """
+    prompt_path = PROMPTS_DIR / prompt_file
+    return hashlib.sha256(prompt_path.read_bytes()).hexdigest()[:16]
+
 def format_prompt(template, **kwargs):
     """
     Format a prompt template with provided variables
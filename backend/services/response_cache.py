@@ -0,0 +1,84 @@
+"""ETag-validated reads with an in-process cache of serialized responses"""
+from config.settings import RESPONSE_CACHE_ENTRIES
+from database.connection import get_async_database
+from services.cache import LRUCache
+from services.user_versions import get_version_async
+from services.json_response import dumps
+from fastapi import Request, Response
+from urllib.parse import urlencode
+import threading
+import hashlib
+
+# Serialized bodies keyed by (user_id, resource, version, variant); entries
+# for old versions are never read again and age out of the LRU
+_responses = LRUCache(RESPONSE_CACHE_ENTRIES)
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _record(resource, outcome):
+    with _stats_lock:
+        counts = _stats.setdefault(resource, {"not_modified": 0, "hits": 0, "misses": 0})
+        counts[outcome] += 1
+
+
+def get_response_cache_stats():
+    """Counts of 304s, cached and rebuilt responses per resource"""
+    with _stats_lock:
+        stats = {resource: dict(counts) for resource, counts in _stats.items()}
+    return {"entries": len(_responses), "resources": stats}
+
+
+def make_etag(user_id, resource, version, variant=""):
+    """ETag for one representation (path and query) of a user's data at a version"""
+    digest = hashlib.sha1(f"{user_id}|{variant}".encode("utf-8")).hexdigest()[:12]
+    return f'"{resource}-{version}-{digest}"'
+
+
+def _etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    # If-None-Match uses weak comparison
+    return "*" in candidates or etag in [tag[2:] if tag.startswith("W/") else tag for tag in candidates]
+
+
+async def versioned_response(request: Request, user_id, resource, build):
+    """
+    Serve a read that only changes when the user's version counter does
+
+    Answers If-None-Match with 304 when the client's copy is current, and
+    otherwise reuses the serialized body cached for this version, calling
+    build() only on a miss. The version is read before build() runs, so a
+    cached body is never older than the version it is stored under.
+
+    Args:
+        request: Incoming request (for If-None-Match and the query string)
+        user_id: Owner of the data
+        resource: Version counter that covers the data ("groups" or "onboarding")
+        build: Async callable returning the response content (may contain
+            ObjectId and datetime values)
+
+    Returns:
+        Response: 200 with the JSON body, or 304, with an ETag either way
+    """
+    version = await get_version_async(get_async_database(), user_id, resource)
+    variant = request.url.path + "?" + urlencode(sorted(request.query_params.multi_items()))
+    etag = make_etag(user_id, resource, version, variant)
+    # no-cache: browsers may keep the body but must revalidate every time
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        _record(resource, "not_modified")
+        return Response(status_code=304, headers=headers)
+
+    key = (user_id, resource, version, variant)
+    body = _responses.get(key)
+    if body is None:
+        _record(resource, "misses")
+        body = dumps(await build())
+        _responses.set(key, body)
+    else:
+        _record(resource, "hits")
+    return Response(content=body, media_type="application/json", headers=headers)
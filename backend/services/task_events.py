@@ -0,0 +1,116 @@
+"""Task completion notifications for workflow stages"""
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from database.connection import get_database
+from pymongo.errors import PyMongoError
+import threading
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ["completed", "failed"]
+POLL_INTERVAL = 0.5  # seconds, only used when change streams are unavailable
+
+# In-process futures for tasks being run by this process
+_futures = {}
+_lock = threading.Lock()
+
+
+def _get_future(task_id):
+    with _lock:
+        future = _futures.get(task_id)
+        if future is None:
+            future = Future()
+            _futures[task_id] = future
+        return future
+
+
+def expect_task(task_id):
+    """Register that this process will run a task so waiters can use a local future"""
+    return _get_future(task_id)
+
+
+def notify_task(task_id, status, output_data=None):
+    """Resolve the local future for a task when it reaches a terminal status"""
+    if status not in TERMINAL_STATUSES:
+        return
+    with _lock:
+        future = _futures.pop(task_id, None)
+    if future is not None and not future.done():
+        future.set_result({"task_id": task_id, "status": status, "output_data": output_data or {}})
+
+
+def wait_for_tasks(task_ids, timeout=30):
+    """
+    Block until every task reaches a terminal status
+
+    Tasks run in this process resolve through in-process futures. Tasks run
+    by another worker are followed through a change stream on the tasks
+    collection, with polling as a fallback when change streams are not
+    supported (e.g. standalone mongod).
+
+    Args:
+        task_ids: Task IDs to wait for
+        timeout: Maximum seconds to wait
+
+    Returns:
+        dict: Task documents (task_id, status, output_data) keyed by task_id
+    """
+    deadline = time.monotonic() + timeout
+    results = {}
+
+    with _lock:
+        local = {task_id: _futures[task_id] for task_id in task_ids if task_id in _futures}
+
+    for task_id, future in local.items():
+        try:
+            results[task_id] = future.result(timeout=max(0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            raise TimeoutError(f"Timed out waiting for task {task_id}")
+
+    remote = [task_id for task_id in task_ids if task_id not in results]
+    if remote:
+        results.update(_wait_for_remote_tasks(remote, deadline))
+
+    return results
+
+
+def _wait_for_remote_tasks(task_ids, deadline):
+    db = get_database()
+    pending = set(task_ids)
+    results = {}
+    projection = {"_id": 0, "task_id": 1, "status": 1, "output_data": 1}
+
+    def collect(docs):
+        for doc in docs:
+            if doc["task_id"] in pending and doc.get("status") in TERMINAL_STATUSES:
+                results[doc["task_id"]] = doc
+                pending.discard(doc["task_id"])
+
+    pipeline = [{
+        "$match": {
+            "operationType": {"$in": ["update", "replace"]},
+            "fullDocument.task_id": {"$in": list(pending)},
+            "fullDocument.status": {"$in": TERMINAL_STATUSES}
+        }
+    }]
+
+    try:
+        # Open the stream before reading current state so no completion is missed
+        with db.tasks.watch(pipeline, full_document="updateLookup", max_await_time_ms=500) as stream:
+            collect(db.tasks.find({"task_id": {"$in": list(pending)}}, projection))
+            while pending and time.monotonic() < deadline:
+                change = stream.try_next()
+                if change and change.get("fullDocument"):
+                    collect([change["fullDocument"]])
+    except (PyMongoError, NotImplementedError) as e:
+        logger.info(f"[TASK_EVENTS] Change streams unavailable, falling back to polling: {e}")
+        while pending and time.monotonic() < deadline:
+            collect(db.tasks.find({"task_id": {"$in": list(pending)}}, projection))
+            if pending:
+                time.sleep(POLL_INTERVAL)
+
+    if pending:
+        raise TimeoutError(f"Timed out waiting for tasks: {sorted(pending)}")
+
+    return results
@@ -0,0 +1,149 @@
+"""Lease management for claimed tasks so crashed workers don't orphan work"""
+from database.connection import get_database
+from config.settings import TASK_LEASE_SECONDS, TASK_MAX_ATTEMPTS
+from datetime import datetime, timedelta
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def lease_expiry():
+    """Get the lease_until timestamp for a task claimed now"""
+    return datetime.now() + timedelta(seconds=TASK_LEASE_SECONDS)
+
+
+class LeaseHeartbeat:
+    """Extends a task's lease in the background while the owning agent works on it"""
+
+    def __init__(self, task_id, lease_token, interval=None):
+        self.task_id = task_id
+        self.lease_token = lease_token
+        # Renew well before expiry so one slow heartbeat doesn't lose the lease
+        self.interval = interval or max(1, TASK_LEASE_SECONDS / 3)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        db = get_database()
+        while not self._stop.wait(self.interval):
+            try:
+                result = db.tasks.update_one(
+                    {
+                        "task_id": self.task_id,
+                        "lease_token": self.lease_token,
+                        "status": "assigned"
+                    },
+                    {"$set": {"lease_until": lease_expiry()}}
+                )
+                if result.matched_count == 0:
+                    # Task finished or was reclaimed after our lease expired
+                    return
+            except Exception as e:
+                logger.warning(f"[LEASE] Heartbeat failed for task {self.task_id}: {e}")
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._run, name=f"lease-{self.task_id}", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+
+def fail_dependents(db, task_ids):
+    """
+    Fail the pending tasks that depend, directly or transitively, on failed tasks
+
+    They could never become runnable, and would otherwise stay pending forever.
+
+    Returns:
+        int: Number of dependent tasks failed
+    """
+    now = datetime.now()
+    total = 0
+    failed_ids = list(task_ids)
+    while failed_ids:
+        dependents = [
+            task["task_id"] for task in db.tasks.find(
+                {"depends_on": {"$in": failed_ids}, "status": "pending"},
+                {"task_id": 1}
+            )
+        ]
+        if not dependents:
+            break
+        db.tasks.update_many(
+            {"task_id": {"$in": dependents}, "status": "pending"},
+            {"$set": {
+                "status": "failed",
+                "output_data": {"error": "A task it depends on failed"},
+                "updated_at": now
+            }}
+        )
+        total += len(dependents)
+        failed_ids = dependents
+    return total
+
+
+def reap_expired_tasks():
+    """
+    Return tasks whose lease expired to the queue
+
+    Tasks that have already been reclaimed TASK_MAX_ATTEMPTS times are
+    marked as failed instead so a poison task can't loop forever, along
+    with the tasks waiting on them. Either way the lease token is cleared,
+    so the worker that lost the lease can no longer write to the task.
+
+    Returns:
+        dict: Number of tasks requeued and failed
+    """
+    db = get_database()
+    now = datetime.now()
+    expired = {"status": "assigned", "lease_until": {"$lt": now}}
+
+    poison = {**expired, "attempts": {"$gte": TASK_MAX_ATTEMPTS - 1}}
+    poison_ids = [task["task_id"] for task in db.tasks.find(poison, {"task_id": 1})]
+    failed = 0
+    if poison_ids:
+        failed = db.tasks.update_many(
+            {**poison, "task_id": {"$in": poison_ids}},
+            {
+                "$set": {
+                    "status": "failed",
+                    "lease_until": None,
+                    "lease_token": None,
+                    "output_data": {"error": "Task lease expired too many times"},
+                    "updated_at": now
+                },
+                "$inc": {"attempts": 1}
+            }
+        ).modified_count
+        # Only the ones this pass actually failed (another reaper may have raced us)
+        failed_ids = [
+            task["task_id"] for task in db.tasks.find(
+                {"task_id": {"$in": poison_ids}, "status": "failed"},
+                {"task_id": 1}
+            )
+        ]
+        failed += fail_dependents(db, failed_ids)
+
+    requeued = db.tasks.update_many(
+        expired,
+        {
+            "$set": {
+                "status": "pending",
+                "assigned_agent_id": None,
+                "lease_until": None,
+                "lease_token": None,
+                "updated_at": now
+            },
+            "$inc": {"attempts": 1}
+        }
+    ).modified_count
+
+    if requeued or failed:
+        logger.warning(f"[LEASE] Reaped expired tasks: {requeued} requeued, {failed} failed")
+
+    return {"requeued": requeued, "failed": failed}
@@ -1,19 +1,125 @@
 """Audio transcription service using OpenAI Whisper API"""
-from config.settings import OPENAI_API_KEY
-from openai import OpenAI
-import io
+from config.settings import (
+    OPENAI_API_KEY,
+    TRANSCRIPTION_MAX_CONCURRENCY,
+    TRANSCRIPTION_CHUNK_SECONDS,
+    TRANSCRIPTION_CHUNK_OVERLAP_SECONDS,
+    TRANSCRIPTION_CHUNK_RETRIES,
+    TRANSCRIPTION_AUDIO_FORMAT,
+    TRANSCRIPTION_AUDIO_BITRATE
+)
+from services.openai_client import get_openai_client
+from services.media_cache import media_key, get_cached_text, set_cached_text
+from services.audio_processing import (
+    decode_audio,
+    trim_silence,
+    iter_chunks,
+    export_audio,
+    stitch_transcripts
+)
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 import logging
+import time
 from datetime import datetime
 
+WHISPER_MODEL = "whisper-1"
+WHISPER_LANGUAGE = "en"
+
 # Set up logger
 logger = logging.getLogger(__name__)
 
+# Shared across requests so the limit holds for the whole process
+_transcription_executor = ThreadPoolExecutor(
+    max_workers=TRANSCRIPTION_MAX_CONCURRENCY,
+    thread_name_prefix="transcription"
+)
+
+# Separate pool for chunks: whole-file jobs above wait on these, so sharing
+# one pool could deadlock once every worker is waiting on its own chunks
+_chunk_executor = ThreadPoolExecutor(
+    max_workers=TRANSCRIPTION_MAX_CONCURRENCY,
+    thread_name_prefix="transcription-chunk"
+)
+
+def _transcribe_file(client, audio_file_obj):
+    """Send one file-like object to Whisper"""
+    transcript = client.audio.transcriptions.create(
+        model=WHISPER_MODEL,
+        file=audio_file_obj,
+        language=WHISPER_LANGUAGE  # Optional: specify language
+    )
+    return transcript.text
+
+def _transcribe_chunk(client, chunk, index, filename):
+    """Transcribe one chunk, retrying it on its own if the request fails"""
+    chunk_file = export_audio(chunk, TRANSCRIPTION_AUDIO_FORMAT, TRANSCRIPTION_AUDIO_BITRATE, name=f"chunk_{index}")
+    logger.info(f"[TRANSCRIPTION] Chunk {index} of {filename}: {len(chunk) / 1000:.1f}s, {chunk_file.getbuffer().nbytes} bytes")
+    
+    for attempt in range(TRANSCRIPTION_CHUNK_RETRIES + 1):
+        try:
+            chunk_file.seek(0)
+            return _transcribe_file(client, chunk_file)
+        except Exception as e:
+            if attempt == TRANSCRIPTION_CHUNK_RETRIES:
+                logger.error(f"[TRANSCRIPTION] Chunk {index} of {filename} failed after {attempt + 1} attempts: {e}")
+                return None
+            logger.warning(f"[TRANSCRIPTION] Chunk {index} of {filename} failed (attempt {attempt + 1}), retrying: {e}")
+            time.sleep(2 ** attempt)
+
+def _transcribe_chunked(client, decoded, filename):
+    """
+    Split long decoded audio and transcribe the chunks concurrently
+    
+    Chunks are read from disk and silence-trimmed one at a time, and only
+    TRANSCRIPTION_MAX_CONCURRENCY of them are in flight at once, so memory
+    use doesn't grow with the length of the recording.
+    
+    Args:
+        client: OpenAI client
+        decoded: DecodedAudio from decode_audio
+        filename: Original filename (for logging)
+    
+    Returns:
+        str: Stitched transcript, or None if any chunk failed (a transcript
+        with a hole in it would be analyzed and cached as if complete)
+    """
+    futures = []
+    overlaps = []
+    pending = set()
+    failed = False
+    voiced_ms = 0
+    chunks = iter_chunks(decoded.read, len(decoded), TRANSCRIPTION_CHUNK_SECONDS, TRANSCRIPTION_CHUNK_OVERLAP_SECONDS)
+    for index, (chunk, overlapped) in enumerate(chunks):
+        if len(pending) >= TRANSCRIPTION_MAX_CONCURRENCY:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            if any(future.result() is None for future in done):
+                failed = True
+                break
+        chunk = trim_silence(chunk)
+        voiced_ms += len(chunk)
+        future = _chunk_executor.submit(_transcribe_chunk, client, chunk, index, filename)
+        futures.append(future)
+        overlaps.append(overlapped)
+        pending.add(future)
+    
+    texts = [future.result() for future in futures]
+    missing = sum(1 for text in texts if text is None)
+    if failed or missing:
+        logger.error(f"[TRANSCRIPTION] {missing} chunk(s) of {filename} could not be transcribed")
+        return None
+    
+    logger.info(
+        f"[TRANSCRIPTION] Transcribed {filename} ({len(decoded) / 1000:.1f}s) in {len(texts)} chunks, "
+        f"{voiced_ms / 1000:.1f}s after trimming silence"
+    )
+    return stitch_transcripts(texts, overlaps)
+
 def transcribe_audio(audio_file):
     """
     Transcribe audio file using OpenAI Whisper API
     
     Args:
-        audio_file: FastAPI UploadFile object
+        audio_file: SpooledMedia object (see services/media_files.py)
         
     Returns:
         str: Transcribed text or None if transcription fails
@@ -29,30 +135,54 @@ def transcribe_audio(audio_file):
     
     try:
         logger.info(f"[TRANSCRIPTION] Initializing OpenAI client for file: {filename}")
-        client = OpenAI(api_key=OPENAI_API_KEY)
+        client = get_openai_client()
         
-        # Read audio file content
-        logger.info(f"[TRANSCRIPTION] Reading audio file content: {filename}")
-        audio_content = audio_file.file.read()
-        file_size = len(audio_content)
+        file_size = audio_file.size
         logger.info(f"[TRANSCRIPTION] Audio file size: {file_size} bytes ({file_size/1024:.2f} KB)")
         
-        # Reset file pointer for potential reuse
-        audio_file.file.seek(0)
+        # Retried uploads send the same bytes again; reuse the earlier transcript
+        cache_key = media_key("transcription", audio_file.sha256, f"{WHISPER_MODEL}:{WHISPER_LANGUAGE}")
+        cached_text = get_cached_text(cache_key, "transcription")
+        if cached_text is not None:
+            logger.info(f"[TRANSCRIPTION] Reusing transcript for previously seen audio: {filename}")
+            return cached_text
         
-        # Create a file-like object for OpenAI API
-        audio_file_obj = io.BytesIO(audio_content)
-        audio_file_obj.name = filename
-        
-        # Transcribe using Whisper API
-        logger.info(f"[TRANSCRIPTION] Sending audio to Whisper API: {filename}")
-        transcript = client.audio.transcriptions.create(
-            model="whisper-1",
-            file=audio_file_obj,
-            language="en"  # Optional: specify language
-        )
-        
-        transcribed_text = transcript.text
+        # Decode to mono 16 kHz on disk, then trim silence so less audio goes over the wire
+        decoded = decode_audio(audio_file.path, filename) if file_size > 0 else None
+        try:
+            # Long recordings are split and transcribed in parallel chunks
+            if decoded is not None and len(decoded) > TRANSCRIPTION_CHUNK_SECONDS * 1000:
+                transcribed_text = _transcribe_chunked(client, decoded, filename)
+                if transcribed_text is None:
+                    raise Exception("Some audio chunks failed to transcribe")
+            else:
+                audio_file_obj = None
+                if decoded is not None:
+                    # Short enough to hold in memory: at most one chunk of samples
+                    audio = decoded.read(0, len(decoded))
+                    original_seconds = len(audio) / 1000
+                    audio = trim_silence(audio)
+                    logger.info(f"[TRANSCRIPTION] Trimmed silence: {original_seconds:.1f}s -> {len(audio) / 1000:.1f}s of audio")
+                    # Re-encode as compact mono speech-rate audio
+                    audio_file_obj = export_audio(audio, TRANSCRIPTION_AUDIO_FORMAT, TRANSCRIPTION_AUDIO_BITRATE, name=filename.rsplit(".", 1)[0])
+                    compact_size = audio_file_obj.getbuffer().nbytes
+                    logger.info(f"[TRANSCRIPTION] Upload size: {file_size} bytes -> {compact_size} bytes ({compact_size / max(file_size, 1):.0%})")
+                    if compact_size >= file_size:
+                        # Re-encoding didn't help, send the original
+                        audio_file_obj = None
+                
+                if audio_file_obj is None:
+                    # Stream the spooled file under its original name so Whisper
+                    # can tell the format from the extension
+                    audio_file.file.seek(0)
+                    audio_file_obj = (filename, audio_file.file)
+                
+                # Transcribe using Whisper API
+                logger.info(f"[TRANSCRIPTION] Sending audio to Whisper API: {filename}")
+                transcribed_text = _transcribe_file(client, audio_file_obj)
+        finally:
+            if decoded is not None:
+                decoded.close()
         duration = (datetime.now() - start_time).total_seconds()
         
         logger.info(f"[TRANSCRIPTION] Successfully transcribed: {filename}")
@@ -60,6 +190,7 @@ def transcribe_audio(audio_file):
         logger.info(f"[TRANSCRIPTION] Transcription time: {duration:.2f} seconds")
         logger.info(f"[TRANSCRIPTION] Transcribed text preview: {transcribed_text[:100]}...")
         
+        set_cached_text(cache_key, transcribed_text, "transcription")
         return transcribed_text
     
     except Exception as e:
@@ -67,3 +198,15 @@ def transcribe_audio(audio_file):
         logger.error(f"[TRANSCRIPTION] Error transcribing audio file {filename}: {str(e)}")
         logger.error(f"[TRANSCRIPTION] Transcription failed after {duration:.2f} seconds")
         return None
+
+def submit_transcription(audio_file):
+    """
+    Start transcribing an audio file in the background
+    
+    Args:
+        audio_file: SpooledMedia object
+        
+    Returns:
+        Future: Resolves to the transcribed text or None
+    """
+    return _transcription_executor.submit(transcribe_audio, audio_file)
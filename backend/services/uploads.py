@@ -0,0 +1,228 @@
+"""Resumable uploads: media sent in chunks, stored as a blob once finalized"""
+from config.settings import UPLOAD_CHUNK_SIZE, UPLOAD_MAX_BYTES, UPLOAD_EXPIRY_SECONDS
+from database.connection import get_database
+from services.blob_store import get_blob_store, store_media
+from services.media_files import spool_blocks
+from datetime import datetime, timedelta
+import threading
+import logging
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Expired uploads are cleaned up at most this often (seconds)
+PURGE_INTERVAL = 300
+
+_last_purge = 0.0
+_purge_lock = threading.Lock()
+
+
+class UploadError(Exception):
+    """An upload request that can't be applied (maps to an HTTP status)"""
+
+    def __init__(self, message, status_code=400, received=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.received = received
+
+
+def create_upload(filename, content_type=None, size=None, user_id="default"):
+    """
+    Start a resumable upload
+
+    Args:
+        filename: Original filename
+        content_type: MIME type
+        size: Total size in bytes, if known up front
+        user_id: Owner of the upload
+
+    Returns:
+        dict: Upload document
+    """
+    if size is not None and size > UPLOAD_MAX_BYTES:
+        raise UploadError(f"Upload exceeds the {UPLOAD_MAX_BYTES} byte limit", status_code=413)
+
+    _maybe_purge_expired()
+
+    now = datetime.now()
+    upload = {
+        "upload_id": str(uuid.uuid4()),
+        "user_id": user_id,
+        "filename": filename,
+        "content_type": content_type,
+        "size": size,
+        "received": 0,
+        "status": "uploading",
+        "blob": None,
+        "created_at": now,
+        "updated_at": now,
+        "expires_at": now + timedelta(seconds=UPLOAD_EXPIRY_SECONDS)
+    }
+    get_database().uploads.insert_one(upload)
+    upload.pop("_id", None)
+    logger.info(f"[UPLOADS] Started upload {upload['upload_id']} for {filename} ({size} bytes)")
+    return upload
+
+
+def get_upload(upload_id, user_id="default"):
+    """Get an upload document owned by user_id, or raise UploadError(404)"""
+    upload = get_database().uploads.find_one({"upload_id": upload_id}, {"_id": 0})
+    # Someone else's upload is reported as missing, not forbidden, so upload
+    # ids can't be probed
+    if not upload or upload.get("user_id") != user_id:
+        raise UploadError(f"Upload {upload_id} not found", status_code=404)
+    return upload
+
+
+def append_chunk(upload_id, offset, data, user_id="default"):
+    """
+    Write one chunk of an upload
+
+    Chunks must be sent in order. A chunk whose offset doesn't match the
+    bytes received so far is rejected with the current offset, so the client
+    can resume from there; resending the last chunk after a lost response is
+    therefore harmless.
+
+    Args:
+        upload_id: Upload ID from create_upload
+        offset: Position of the chunk in the file
+        data: Chunk bytes (at most UPLOAD_CHUNK_SIZE)
+        user_id: Owner of the upload
+
+    Returns:
+        dict: Updated upload document
+    """
+    upload = get_upload(upload_id, user_id)
+    if upload["status"] != "uploading":
+        raise UploadError(f"Upload {upload_id} is already {upload['status']}", status_code=409, received=upload["received"])
+    if offset != upload["received"]:
+        raise UploadError(
+            f"Expected offset {upload['received']}, got {offset}",
+            status_code=409,
+            received=upload["received"]
+        )
+    if len(data) > UPLOAD_CHUNK_SIZE:
+        raise UploadError(f"Chunks are limited to {UPLOAD_CHUNK_SIZE} bytes", status_code=413)
+    limit = upload["size"] if upload["size"] is not None else UPLOAD_MAX_BYTES
+    if offset + len(data) > limit:
+        raise UploadError(f"Upload would exceed {limit} bytes", status_code=413)
+
+    get_blob_store().write_part(upload_id, offset, data)
+
+    # Only advance if nobody else moved the offset while we were writing
+    now = datetime.now()
+    result = get_database().uploads.update_one(
+        {"upload_id": upload_id, "status": "uploading", "received": offset},
+        {"$set": {
+            "received": offset + len(data),
+            "updated_at": now,
+            "expires_at": now + timedelta(seconds=UPLOAD_EXPIRY_SECONDS)
+        }}
+    )
+    if result.modified_count == 0:
+        current = get_upload(upload_id, user_id)
+        raise UploadError("Upload changed while writing the chunk", status_code=409, received=current["received"])
+
+    return {**upload, "received": offset + len(data), "updated_at": now}
+
+
+def finalize_upload(upload_id, user_id="default"):
+    """
+    Move a completed upload into the blob store
+
+    Calling it again for a finalized upload returns the same result.
+
+    Args:
+        upload_id: Upload ID from create_upload
+        user_id: Owner of the upload
+
+    Returns:
+        dict: Updated upload document, with the blob reference in "blob"
+    """
+    upload = get_upload(upload_id, user_id)
+    if upload["status"] == "complete":
+        return upload
+    if upload["size"] is not None and upload["received"] != upload["size"]:
+        raise UploadError(
+            f"Upload is incomplete: {upload['received']} of {upload['size']} bytes received",
+            status_code=409,
+            received=upload["received"]
+        )
+
+    store = get_blob_store()
+    with spool_blocks(
+        store.iter_part(upload_id, upload["received"]),
+        upload["filename"],
+        upload["content_type"]
+    ) as media:
+        blob = store_media(media)
+
+    now = datetime.now()
+    get_database().uploads.update_one(
+        {"upload_id": upload_id},
+        {"$set": {
+            "status": "complete",
+            "blob": blob,
+            "size": upload["received"],
+            "updated_at": now,
+            "expires_at": now + timedelta(seconds=UPLOAD_EXPIRY_SECONDS)
+        }}
+    )
+    store.delete_part(upload_id)
+    logger.info(f"[UPLOADS] Finalized upload {upload_id}: {upload['received']} bytes as {blob['blob_key']}")
+    return {**upload, "status": "complete", "blob": blob, "size": upload["received"], "updated_at": now}
+
+
+def get_upload_ref(upload_id, user_id="default"):
+    """
+    Get the blob reference of a finalized upload, for use in a meeting
+
+    Args:
+        upload_id: Upload ID from create_upload
+        user_id: User submitting the meeting (must own the upload)
+
+    Returns:
+        dict: {blob_key, filename, content_type, size}
+    """
+    upload = get_upload(upload_id, user_id)
+    if upload["status"] != "complete":
+        raise UploadError(f"Upload {upload_id} has not been finalized", status_code=409, received=upload["received"])
+    return upload["blob"]
+
+
+def purge_expired_uploads():
+    """
+    Delete uploads that were abandoned before being finalized
+
+    Finalized uploads expire through the TTL index on expires_at; their
+    blobs stay, since other meetings may share the same content.
+
+    Returns:
+        int: Number of uploads removed
+    """
+    db = get_database()
+    store = get_blob_store()
+    expired = list(db.uploads.find(
+        {"status": "uploading", "expires_at": {"$lt": datetime.now()}},
+        {"_id": 0, "upload_id": 1}
+    ))
+    for upload in expired:
+        store.delete_part(upload["upload_id"])
+        db.uploads.delete_one({"upload_id": upload["upload_id"], "status": "uploading"})
+    if expired:
+        logger.info(f"[UPLOADS] Purged {len(expired)} abandoned upload(s)")
+    return len(expired)
+
+
+def _maybe_purge_expired():
+    """Run purge_expired_uploads at most once every PURGE_INTERVAL seconds"""
+    global _last_purge
+    with _purge_lock:
+        if time.monotonic() - _last_purge < PURGE_INTERVAL:
+            return
+        _last_purge = time.monotonic()
+    try:
+        purge_expired_uploads()
+    except Exception as e:
+        logger.warning(f"[UPLOADS] Failed to purge expired uploads: {e}")
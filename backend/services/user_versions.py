@@ -0,0 +1,203 @@
+"""Per-user version counters, bumped whenever a user's groups or onboarding data changes"""
+from config.settings import USER_VERSION_CACHE_SECONDS
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from datetime import datetime
+import threading
+import time
+
+# Counters kept in each user_versions document ({_id: user_id, groups, onboarding}).
+# Resources read through delta sync also keep change sequence numbers:
+# <resource>_seq (last reserved) and <resource>_pending, a
+# [{seq, reserved_at}] entry per change reserved but not yet committed.
+RESOURCES = ("groups", "onboarding")
+
+# A change that was reserved but never committed (its process died) stops
+# holding back delta sync this many seconds after it was reserved
+STALE_CHANGE_SECONDS = 60
+
+# This process's view of the counters: (user_id, resource) -> (version, read_at)
+_versions = {}
+_lock = threading.Lock()
+
+
+def _remember(user_id, doc):
+    now = time.monotonic()
+    with _lock:
+        for resource in RESOURCES:
+            _versions[(user_id, resource)] = ((doc or {}).get(resource, 0), now)
+
+
+def bump_version(db, user_id, resource):
+    """
+    Record that a user's data changed
+
+    Args:
+        db: Database instance
+        user_id: User whose data changed
+        resource: "groups" or "onboarding"
+
+    Returns:
+        int: New version
+    """
+    doc = db.user_versions.find_one_and_update(
+        {"_id": user_id},
+        {"$inc": {resource: 1}, "$set": {"updated_at": datetime.now()}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    _remember(user_id, doc)
+    return doc[resource]
+
+
+async def bump_version_async(db, user_id, resource):
+    """bump_version for Motor databases"""
+    doc = await db.user_versions.find_one_and_update(
+        {"_id": user_id},
+        {"$inc": {resource: 1}, "$set": {"updated_at": datetime.now()}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    _remember(user_id, doc)
+    return doc[resource]
+
+
+def _reserve_attempt(doc, resource, now):
+    """
+    Filter, update and sequence number reserving the next change after doc
+
+    The filter matches only if the sequence number and pending list are
+    still as read in doc, so concurrent reservations and commits make the
+    attempt miss (or, for a new user, raise DuplicateKeyError) and it is
+    retried. Pending entries older than STALE_CHANGE_SECONDS are dropped.
+    """
+    doc = doc or {}
+    seq_field, pending_field = f"{resource}_seq", f"{resource}_pending"
+    pending = doc.get(pending_field)
+    live = [
+        entry for entry in (pending if isinstance(pending, list) else [])
+        if (now - entry["reserved_at"]).total_seconds() <= STALE_CHANGE_SECONDS
+    ]
+    seq = (doc.get(seq_field) or 0) + 1
+    return (
+        {"_id": doc.get("_id"), seq_field: doc.get(seq_field), pending_field: pending},
+        {"$set": {seq_field: seq, pending_field: live + [{"seq": seq, "reserved_at": now}]}},
+        seq
+    )
+
+
+def _commit_update(resource, seq):
+    return {
+        "$inc": {resource: 1},
+        "$pull": {f"{resource}_pending": {"seq": seq}},
+        "$set": {"updated_at": datetime.now()}
+    }
+
+
+def committed_change(doc, resource, now=None):
+    """
+    Highest change sequence number up to which every change has been written
+
+    That is just below the oldest pending reservation, ignoring any reserved
+    more than STALE_CHANGE_SECONDS ago (abandoned by a writer that died),
+    or the last reserved number if nothing is pending.
+    """
+    now = now or datetime.now()
+    doc = doc or {}
+    pending = doc.get(f"{resource}_pending")
+    live = [
+        entry["seq"] for entry in (pending if isinstance(pending, list) else [])
+        if (now - entry["reserved_at"]).total_seconds() <= STALE_CHANGE_SECONDS
+    ]
+    if live:
+        return min(live) - 1
+    return doc.get(f"{resource}_seq", 0)
+
+
+def reserve_change(db, user_id, resource):
+    """
+    Reserve the next change sequence number for a write to a user's data
+
+    Sequence numbers go up by one per reservation. Stamp the number on the
+    documents written, then call commit_change with it (also if the write
+    failed): until then delta readers don't hand out a position past it,
+    so a write that lands late is never skipped.
+
+    Returns:
+        int: Sequence number for the write
+    """
+    while True:
+        doc = db.user_versions.find_one({"_id": user_id}) or {"_id": user_id}
+        query, update, seq = _reserve_attempt(doc, resource, datetime.now())
+        try:
+            result = db.user_versions.update_one(query, update, upsert=True)
+        except DuplicateKeyError:
+            continue
+        if result.matched_count or result.upserted_id is not None:
+            return seq
+
+
+def commit_change(db, user_id, resource, seq):
+    """
+    Finish a write started with reserve_change and bump the resource version
+
+    Returns:
+        int: New version
+    """
+    doc = db.user_versions.find_one_and_update(
+        {"_id": user_id},
+        _commit_update(resource, seq),
+        return_document=ReturnDocument.AFTER
+    )
+    _remember(user_id, doc)
+    return doc[resource]
+
+
+async def reserve_change_async(db, user_id, resource):
+    """reserve_change for Motor databases"""
+    while True:
+        doc = await db.user_versions.find_one({"_id": user_id}) or {"_id": user_id}
+        query, update, seq = _reserve_attempt(doc, resource, datetime.now())
+        try:
+            result = await db.user_versions.update_one(query, update, upsert=True)
+        except DuplicateKeyError:
+            continue
+        if result.matched_count or result.upserted_id is not None:
+            return seq
+
+
+async def commit_change_async(db, user_id, resource, seq):
+    """commit_change for Motor databases"""
+    doc = await db.user_versions.find_one_and_update(
+        {"_id": user_id},
+        _commit_update(resource, seq),
+        return_document=ReturnDocument.AFTER
+    )
+    _remember(user_id, doc)
+    return doc[resource]
+
+
+async def get_committed_change_async(db, user_id, resource):
+    """
+    committed_change for a user, always read from the database (not the
+    version cache), so delta sync sees a commit as soon as it lands
+    """
+    return committed_change(await db.user_versions.find_one({"_id": user_id}), resource)
+
+
+async def get_version_async(db, user_id, resource):
+    """
+    Current version of a user's data
+
+    Bumps made by this process are seen immediately. Bumps made by other
+    processes are seen within USER_VERSION_CACHE_SECONDS, so repeated
+    reads in between cost no database round trip.
+    """
+    with _lock:
+        cached = _versions.get((user_id, resource))
+    if cached is not None and time.monotonic() - cached[1] < USER_VERSION_CACHE_SECONDS:
+        return cached[0]
+
+    doc = await db.user_versions.find_one({"_id": user_id})
+    _remember(user_id, doc)
+    return (doc or {}).get(resource, 0)
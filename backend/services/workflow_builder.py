@@ -0,0 +1,85 @@
+"""Workflow builder for creating a whole task DAG in one round trip"""
+from database.connection import get_database
+from datetime import datetime
+import uuid
+
+
+class WorkflowBuilder:
+    """Collects the tasks of a workflow so they can be inserted together"""
+
+    def __init__(self, workflow_id=None):
+        self.workflow_id = workflow_id or str(uuid.uuid4())
+        self.tasks = []
+
+    def add_task(self, task_type, input_data, depends_on=None, input_refs=None, context_refs=None, priority=0):
+        """
+        Add a task node to the workflow
+
+        Args:
+            task_type: Type of task (e.g. "extraction")
+            input_data: Input known when the workflow is built
+            depends_on: Task IDs (from this builder) that must complete first
+            input_refs: Inputs filled from upstream outputs when the task runs,
+                as {input_key: (task_id, output_field)}
+            context_refs: Optional context references
+            priority: Higher runs first
+
+        Returns:
+            str: The new task ID
+        """
+        task_id = str(uuid.uuid4())
+        depends_on = list(depends_on or [])
+
+        # Any task we read output from is an implicit dependency
+        for ref_task_id, _ in (input_refs or {}).values():
+            if ref_task_id not in depends_on:
+                depends_on.append(ref_task_id)
+
+        self.tasks.append({
+            "task_id": task_id,
+            "task_type": task_type,
+            "assigned_agent_id": None,
+            "status": "pending",
+            "input_data": {**input_data, "workflow_id": self.workflow_id},
+            "input_refs": {
+                key: {"task_id": ref_task_id, "field": field}
+                for key, (ref_task_id, field) in (input_refs or {}).items()
+            },
+            "output_data": {},
+            "context_refs": context_refs or [],
+            "depends_on": depends_on,
+            "pending_deps": len(depends_on),
+            "satisfied_deps": [],
+            "lease_until": None,
+            "lease_token": None,
+            "attempts": 0,
+            "priority": priority
+        })
+        return task_id
+
+    def build(self, now=None):
+        """Get the task documents, stamped with a single timestamp"""
+        now = now or datetime.now()
+        known = {task["task_id"] for task in self.tasks}
+        for task in self.tasks:
+            missing = [dep for dep in task["depends_on"] if dep not in known]
+            if missing:
+                raise ValueError(f"Task {task['task_id']} depends on tasks outside the workflow: {missing}")
+        return [{**task, "created_at": now, "updated_at": now} for task in self.tasks]
+
+
+def insert_workflows(builders):
+    """
+    Insert the tasks of one or more workflows with a single insert_many
+
+    Args:
+        builders: WorkflowBuilder instances
+
+    Returns:
+        list: Inserted task documents
+    """
+    now = datetime.now()
+    tasks = [task for builder in builders for task in builder.build(now)]
+    if tasks:
+        get_database().tasks.insert_many(tasks)
+    return tasks
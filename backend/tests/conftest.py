@@ -0,0 +1,36 @@
+"""Shared fixtures: the backend on sys.path and in-memory MongoDB (mongomock)"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database.connection as connection
+
+
+def _patch_everywhere(monkeypatch, name, original, replacement):
+    """Replace a function in every loaded module that imported it by name"""
+    for module in list(sys.modules.values()):
+        if module is not None and getattr(module, name, None) is original:
+            monkeypatch.setattr(module, name, replacement)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    """A fresh mongomock database returned by every get_database()"""
+    import mongomock
+
+    database = mongomock.MongoClient().test
+    _patch_everywhere(monkeypatch, "get_database", connection.get_database, lambda: database)
+    return database
+
+
+@pytest.fixture
+def async_db(monkeypatch):
+    """A fresh mongomock-motor database returned by every get_async_database()"""
+    import mongomock_motor
+
+    database = mongomock_motor.AsyncMongoMockClient().test
+    _patch_everywhere(monkeypatch, "get_async_database", connection.get_async_database, lambda: database)
+    return database
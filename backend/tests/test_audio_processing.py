@@ -0,0 +1,103 @@
+"""Tests for splitting long recordings and stitching chunk transcripts"""
+import os
+
+import pytest
+
+from services.audio_processing import stitch_transcripts
+
+
+def test_overlapped_seam_drops_repeated_words():
+    texts = ["we agreed to ship the beta next week", "the beta next week and then review"]
+    assert stitch_transcripts(texts, [False, True]) == "we agreed to ship the beta next week and then review"
+
+
+def test_overlap_matching_ignores_case_and_punctuation():
+    texts = ["Let's meet on Friday.", "on friday, at noon"]
+    assert stitch_transcripts(texts, [False, True]) == "Let's meet on Friday. at noon"
+
+
+def test_silence_cut_keeps_genuinely_repeated_words():
+    # Cut in a pause: the speaker really said "thank you" twice
+    texts = ["that's all from me thank you", "thank you everyone for coming"]
+    assert stitch_transcripts(texts, [False, False]) == "that's all from me thank you thank you everyone for coming"
+
+
+def test_without_overlap_flags_nothing_is_deduplicated():
+    assert stitch_transcripts(["a b c", "b c d"]) == "a b c b c d"
+
+
+def test_single_repeated_word_is_not_treated_as_overlap():
+    assert stitch_transcripts(["we said no", "no way"], [False, True]) == "we said no no way"
+
+
+def test_mixed_seams_only_dedupe_where_audio_overlaps():
+    texts = ["one two three", "two three four", "two three five"]
+    # Seam 1 is a hard cut with overlap, seam 2 a silence cut
+    assert stitch_transcripts(texts, [False, True, False]) == "one two three four two three five"
+
+
+def test_empty_chunks_are_skipped():
+    assert stitch_transcripts(["hello there", "", "general kenobi"], [False, True, False]) == "hello there general kenobi"
+
+
+def _tone(seconds):
+    pytest.importorskip("pydub")
+    from pydub.generators import Sine
+
+    return Sine(440).to_audio_segment(duration=int(seconds * 1000))
+
+
+def test_hard_cuts_overlap_and_cover_the_whole_recording():
+    from services.audio_processing import split_audio
+
+    audio = _tone(25)
+    chunks = split_audio(audio, 10, 2)
+    assert [overlapped for _, overlapped in chunks] == [False, True, True]
+    # Each chunk after the first starts overlap seconds before the previous one ended
+    assert sum(len(chunk) for chunk, _ in chunks) - 2 * 2000 == len(audio)
+
+
+def test_silence_cuts_do_not_overlap():
+    from pydub import AudioSegment
+    from services.audio_processing import split_audio
+
+    audio = _tone(9) + AudioSegment.silent(1000) + _tone(9)
+    chunks = split_audio(audio, 10, 2)
+    assert [overlapped for _, overlapped in chunks] == [False, False]
+    assert sum(len(chunk) for chunk, _ in chunks) == len(audio)
+
+
+@pytest.mark.parametrize("overlap", [10, 12])
+def test_overlap_not_shorter_than_a_chunk_is_rejected(overlap):
+    from services.audio_processing import split_audio
+
+    with pytest.raises(ValueError):
+        split_audio(_tone(25), 10, overlap)
+
+
+def test_decode_audio_streams_wav_to_mono_16k(tmp_path):
+    pytest.importorskip("pydub")
+    from pydub import AudioSegment
+    from services.audio_processing import decode_audio
+
+    stereo = _tone(3).set_frame_rate(44100).set_channels(2)
+    path = tmp_path / "meeting.wav"
+    stereo.export(str(path), format="wav")
+
+    with decode_audio(str(path), "meeting.wav") as decoded:
+        assert abs(len(decoded) - 3000) <= 10
+        window = decoded.read(1000, 500)
+        assert (window.frame_rate, window.channels, len(window)) == (16000, 1, 500)
+        # Reading past the end returns what is left
+        assert len(decoded.read(2900, 1000)) <= 100
+        temp_path = decoded.path
+    assert not os.path.exists(temp_path)
+
+
+def test_decode_audio_returns_none_for_undecodable_input(tmp_path):
+    pytest.importorskip("pydub")
+    from services.audio_processing import decode_audio
+
+    path = tmp_path / "noise.wav"
+    path.write_bytes(os.urandom(4096))
+    assert decode_audio(str(path), "noise.wav") is None
@@ -0,0 +1,107 @@
+"""Tests for the unreferenced blob sweep"""
+import io
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from services import blob_store
+from services.blob_store import GridFSBlobStore, LocalBlobStore, sweep_unreferenced_blobs
+
+
+class MongomockBucket:
+    """Just enough of GridFSBucket to store a blob (mongomock has no GridFS for pymongo 4)"""
+
+    def __init__(self, db, bucket_name):
+        self.files = db[f"{bucket_name}.files"]
+        self.chunks = db[f"{bucket_name}.chunks"]
+
+    def upload_from_stream_with_id(self, file_id, filename, source):
+        from gridfs.errors import FileExists
+
+        if self.files.find_one({"_id": file_id}):
+            raise FileExists(file_id)
+        data = source.read()
+        self.chunks.insert_one({"files_id": file_id, "n": 0, "data": data})
+        self.files.insert_one({"_id": file_id, "filename": filename, "length": len(data), "uploadDate": datetime.utcnow()})
+
+
+@pytest.fixture
+def local_store(tmp_path, db, monkeypatch):
+    store = LocalBlobStore(str(tmp_path))
+    monkeypatch.setattr(blob_store, "get_blob_store", lambda: store)
+    return store
+
+
+@pytest.fixture
+def gridfs_store(db, monkeypatch):
+    store = GridFSBlobStore()
+    monkeypatch.setattr(GridFSBlobStore, "bucket", property(lambda self: MongomockBucket(db, self.bucket_name)))
+    monkeypatch.setattr(blob_store, "get_blob_store", lambda: store)
+    return store
+
+
+def _age_local(store, key, seconds):
+    stored_at = time.time() - seconds
+    os.utime(store._path(key), (stored_at, stored_at))
+
+
+def _age_gridfs(store, key, seconds):
+    store.files.update_one({"_id": key}, {"$set": {"uploadDate": datetime.utcnow() - timedelta(seconds=seconds)}})
+
+
+def _reuse_after_listing(monkeypatch, store, key):
+    """Have the sweep's reference read race with a put that reuses key"""
+    def referenced(db):
+        store.put(key, io.BytesIO(b"reused"))
+        return set()
+
+    monkeypatch.setattr(blob_store, "referenced_blob_keys", referenced)
+
+
+@pytest.mark.parametrize("store_fixture, age", [("local_store", _age_local), ("gridfs_store", _age_gridfs)])
+def test_sweep_keeps_blob_reused_between_listing_and_delete(request, monkeypatch, store_fixture, age):
+    store = request.getfixturevalue(store_fixture)
+    for key in ("aa11", "bb22"):
+        store.put(key, io.BytesIO(key.encode()))
+        age(store, key, 7200)
+    _reuse_after_listing(monkeypatch, store, "aa11")
+
+    assert sweep_unreferenced_blobs(grace_seconds=3600) == 1
+
+    assert store.exists("aa11")
+    assert not store.exists("bb22")
+
+
+def test_sweep_keeps_referenced_and_recent_blobs(local_store, db):
+    for key in ("aa11", "bb22", "cc33"):
+        local_store.put(key, io.BytesIO(key.encode()))
+    _age_local(local_store, "aa11", 7200)
+    _age_local(local_store, "bb22", 7200)
+    db.tasks.insert_one({"status": "pending", "input_data": {"audio": {"blob_key": "aa11"}}})
+
+    assert sweep_unreferenced_blobs(grace_seconds=3600) == 1
+
+    assert local_store.exists("aa11")
+    assert not local_store.exists("bb22")
+    assert local_store.exists("cc33")
+
+
+def test_put_stores_again_after_blob_is_swept(gridfs_store):
+    gridfs_store.put("aa11", io.BytesIO(b"first"))
+    _age_gridfs(gridfs_store, "aa11", 7200)
+    assert gridfs_store.delete_if_stored_before("aa11", time.time() - 3600)
+
+    assert gridfs_store.put("aa11", io.BytesIO(b"first")) is True
+    assert gridfs_store.exists("aa11")
+
+
+def test_gridfs_delete_removes_chunks_only_with_the_file(gridfs_store, db):
+    gridfs_store.put("aa11", io.BytesIO(b"kept"))
+    assert not gridfs_store.delete_if_stored_before("aa11", time.time() - 3600)
+    assert db["media.chunks"].count_documents({"files_id": "aa11"}) == 1
+
+    _age_gridfs(gridfs_store, "aa11", 7200)
+    assert gridfs_store.delete_if_stored_before("aa11", time.time() - 3600)
+    assert db["media.chunks"].count_documents({"files_id": "aa11"}) == 0
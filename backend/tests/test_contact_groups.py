@@ -0,0 +1,90 @@
+"""Tests for keyset pagination of contact groups"""
+import asyncio
+from datetime import datetime
+
+import pytest
+
+from api.routes.groups import _fetch_page
+from services.contact_groups import CONTACT_FIELDS, decode_cursor, encode_cursor, page_query
+
+MONDAY = datetime(2024, 3, 4, 9, 0)
+TUESDAY = datetime(2024, 3, 5, 9, 0)
+
+
+def _entry(meeting_id, timestamp, score):
+    entry = {"user_id": "u1", "priority_group": "P0", "meeting_id": meeting_id, "name": meeting_id, "score": score}
+    if timestamp is not None:
+        entry["meeting_timestamp"] = timestamp
+    return entry
+
+
+@pytest.fixture
+def entries(async_db):
+    docs = [
+        _entry("m1", TUESDAY, 80),
+        _entry("m2", MONDAY, 80),
+        _entry("m3", TUESDAY, 80),
+        _entry("m4", MONDAY, 50),
+        _entry("m5", None, 50),
+        _entry("m6", None, 90),
+        _entry("m7", TUESDAY, None),
+    ]
+    asyncio.run(async_db.contact_groups.insert_many([dict(doc) for doc in docs]))
+    return docs
+
+
+def _read_all(db, sort, limit):
+    """Follow next cursors to the end, returning meeting_ids in page order"""
+    seen, cursor = [], None
+    while True:
+        page, cursor = asyncio.run(_fetch_page(db, "u1", "P0", sort, cursor, limit, dict(CONTACT_FIELDS)))
+        seen.extend(entry["meeting_id"] for entry in page)
+        if cursor is None:
+            return seen
+
+
+@pytest.mark.parametrize("cursor_entry, sort", [
+    ({"meeting_id": "m1", "meeting_timestamp": TUESDAY}, "date"),
+    ({"meeting_id": "m1", "score": 72.5}, "score"),
+    ({"meeting_id": "m1"}, "date"),
+    ({"meeting_id": "m1"}, "score"),
+])
+def test_cursor_round_trips(cursor_entry, sort):
+    field = "meeting_timestamp" if sort == "date" else "score"
+    assert decode_cursor(encode_cursor(sort, cursor_entry), sort) == (cursor_entry.get(field), "m1")
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3])
+def test_date_pages_break_ties_by_meeting_id_and_end_with_missing_dates(async_db, entries, limit):
+    # Newest first, meeting_id descending on equal dates, entries without a date last
+    assert _read_all(async_db, "date", limit) == ["m7", "m3", "m1", "m4", "m2", "m6", "m5"]
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3])
+def test_score_pages_break_ties_by_meeting_id_and_end_with_missing_scores(async_db, entries, limit):
+    assert _read_all(async_db, "score", limit) == ["m6", "m3", "m2", "m1", "m5", "m4", "m7"]
+
+
+def test_cursor_from_entry_without_sort_value_continues_among_them(async_db, entries):
+    cursor = encode_cursor("date", {"meeting_id": "m6"})
+    page, next_cursor = asyncio.run(_fetch_page(async_db, "u1", "P0", "date", cursor, 10, dict(CONTACT_FIELDS)))
+    assert [entry["meeting_id"] for entry in page] == ["m5"]
+    assert next_cursor is None
+
+
+@pytest.mark.parametrize("issued_for, used_for", [("date", "score"), ("score", "date")])
+def test_cursor_for_another_sort_is_rejected(issued_for, used_for):
+    cursor = encode_cursor(issued_for, {"meeting_id": "m1", "meeting_timestamp": TUESDAY, "score": 80})
+    with pytest.raises(ValueError, match=f"sort={used_for}"):
+        page_query("u1", "P0", used_for, cursor)
+
+
+@pytest.mark.parametrize("cursor, sort", [
+    ("not base64!", "date"),
+    ("W10=", "date"),
+    (encode_cursor("date", {"meeting_id": 17, "meeting_timestamp": TUESDAY}), "date"),
+    (encode_cursor("score", {"meeting_id": "m1", "score": "80"}), "score"),
+])
+def test_malformed_cursor_is_rejected(cursor, sort):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor, sort)
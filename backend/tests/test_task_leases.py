@@ -0,0 +1,134 @@
+"""Tests for task claiming, leases, reaping and dependency release/failure"""
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from agents.base_agent import BaseAgent
+from config.settings import TASK_MAX_ATTEMPTS
+from services.task_leases import LeaseHeartbeat, reap_expired_tasks
+
+
+@pytest.fixture
+def agents(db):
+    return BaseAgent("worker-a", "test", [], []), BaseAgent("worker-b", "test", [], [])
+
+
+def _status(db, task_id):
+    return db.tasks.find_one({"task_id": task_id})["status"]
+
+
+def _expire_lease(db, task_id):
+    db.tasks.update_one({"task_id": task_id}, {"$set": {"lease_until": datetime.now() - timedelta(seconds=1)}})
+
+
+def test_claim_takes_only_runnable_tasks_once(db, agents):
+    first, second = agents
+    upstream = first.create_task("extract", {})
+    downstream = first.create_task("extract", {}, depends_on=[upstream])
+
+    task = first.claim_next_task("extract")
+    assert task["task_id"] == upstream
+    assert task["lease_token"]
+    # The other task still waits on its dependency, and the claimed one is taken
+    assert second.claim_next_task("extract") is None
+    assert _status(db, downstream) == "pending"
+
+
+def test_completion_releases_dependents_exactly_once(db, agents):
+    agent, _ = agents
+    upstream = agent.create_task("extract", {})
+    downstream = agent.create_task("summarize", {}, depends_on=[upstream])
+
+    agent.claim_next_task("extract")
+    assert agent.update_task(upstream, "completed", {"ok": True})
+    # A repeated completion (e.g. a retried write) must not release it twice
+    agent._release_dependents(upstream)
+
+    task = db.tasks.find_one({"task_id": downstream})
+    assert task["pending_deps"] == 0
+    assert task["satisfied_deps"] == [upstream]
+    assert agent.claim_next_task("summarize")["task_id"] == downstream
+
+
+def test_task_created_after_its_dependency_completed_is_runnable(db, agents):
+    agent, _ = agents
+    upstream = agent.create_task("extract", {})
+    agent.claim_next_task("extract")
+    agent.update_task(upstream, "completed", {"ok": True})
+
+    downstream = agent.create_task("summarize", {}, depends_on=[upstream])
+    assert db.tasks.find_one({"task_id": downstream})["pending_deps"] == 0
+
+
+def test_write_from_worker_that_lost_its_lease_is_dropped(db, agents):
+    first, second = agents
+    task_id = first.create_task("extract", {})
+    first.claim_next_task("extract")
+
+    _expire_lease(db, task_id)
+    assert reap_expired_tasks() == {"requeued": 1, "failed": 0}
+    assert second.claim_next_task("extract")["task_id"] == task_id
+
+    # The first worker comes back late with its result
+    assert first.update_task(task_id, "completed", {"from": "first"}) is False
+    task = db.tasks.find_one({"task_id": task_id})
+    assert task["status"] == "assigned"
+    assert task["assigned_agent_id"] == "worker-b"
+
+    assert second.update_task(task_id, "completed", {"from": "second"}) is True
+    assert db.tasks.find_one({"task_id": task_id})["output_data"] == {"from": "second"}
+
+
+def test_reaper_leaves_live_leases_alone(db, agents):
+    agent, _ = agents
+    task_id = agent.create_task("extract", {})
+    agent.claim_next_task("extract")
+
+    assert reap_expired_tasks() == {"requeued": 0, "failed": 0}
+    assert _status(db, task_id) == "assigned"
+
+
+def test_poison_task_fails_with_its_dependents(db, agents):
+    agent, _ = agents
+    poison = agent.create_task("extract", {})
+    child = agent.create_task("summarize", {}, depends_on=[poison])
+    grandchild = agent.create_task("categorize", {}, depends_on=[child])
+    unrelated = agent.create_task("extract", {})
+
+    agent.claim_task(poison)
+    db.tasks.update_one({"task_id": poison}, {"$set": {"attempts": TASK_MAX_ATTEMPTS - 1}})
+    _expire_lease(db, poison)
+
+    assert reap_expired_tasks() == {"requeued": 0, "failed": 3}
+    assert [_status(db, t) for t in (poison, child, grandchild, unrelated)] == ["failed", "failed", "failed", "pending"]
+    # The worker that held the poison task can no longer write to it
+    assert agent.update_task(poison, "completed", {}) is False
+
+
+def test_failed_task_fails_pending_dependents_transitively(db, agents):
+    agent, _ = agents
+    upstream = agent.create_task("extract", {})
+    child = agent.create_task("summarize", {}, depends_on=[upstream])
+    grandchild = agent.create_task("categorize", {}, depends_on=[child])
+
+    agent.claim_next_task("extract")
+    assert agent.update_task(upstream, "failed", {"error": "boom"})
+    assert _status(db, child) == "failed"
+    assert _status(db, grandchild) == "failed"
+
+
+def test_heartbeat_only_extends_its_own_lease(db, agents):
+    agent, _ = agents
+    task_id = agent.create_task("extract", {})
+    agent.claim_next_task("extract")
+    token = agent._lease_tokens[task_id]
+    _expire_lease(db, task_id)
+
+    with LeaseHeartbeat(task_id, "someone-else", interval=0.05):
+        time.sleep(0.2)
+    assert db.tasks.find_one({"task_id": task_id})["lease_until"] < datetime.now()
+
+    with LeaseHeartbeat(task_id, token, interval=0.05):
+        time.sleep(0.2)
+    assert db.tasks.find_one({"task_id": task_id})["lease_until"] > datetime.now()
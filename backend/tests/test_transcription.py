@@ -0,0 +1,64 @@
+"""Tests for chunked transcription of long recordings"""
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("pydub")
+
+from pydub.generators import Sine
+
+from config.settings import TRANSCRIPTION_CHUNK_SECONDS, TRANSCRIPTION_MAX_CONCURRENCY
+from services import transcription
+
+
+class InMemoryAudio:
+    """Stands in for DecodedAudio, counting how much is read at once"""
+
+    def __init__(self, seconds):
+        self.audio = Sine(300).to_audio_segment(duration=int(seconds * 1000)).set_frame_rate(16000)
+        self.largest_read = 0
+
+    def __len__(self):
+        return len(self.audio)
+
+    def read(self, start, length):
+        self.largest_read = max(self.largest_read, length)
+        return self.audio[start:start + length]
+
+
+@pytest.fixture
+def fake_chunks(monkeypatch):
+    """Replace the Whisper call for chunks, tracking how many run at once"""
+    state = {"running": 0, "peak": 0, "fail": set()}
+    lock = threading.Lock()
+
+    def transcribe_chunk(client, chunk, index, filename):
+        with lock:
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+        time.sleep(0.02)
+        with lock:
+            state["running"] -= 1
+        return None if index in state["fail"] else f"chunk{index}"
+
+    monkeypatch.setattr(transcription, "_transcribe_chunk", transcribe_chunk)
+    return state
+
+
+def test_long_recording_is_read_and_transcribed_a_chunk_at_a_time(fake_chunks):
+    audio = InMemoryAudio(TRANSCRIPTION_CHUNK_SECONDS * 6.5)
+
+    text = transcription._transcribe_chunked(None, audio, "long.wav")
+
+    assert text.split()[0] == "chunk0"
+    assert len(text.split()) >= 7
+    assert audio.largest_read <= TRANSCRIPTION_CHUNK_SECONDS * 1000
+    assert fake_chunks["peak"] <= TRANSCRIPTION_MAX_CONCURRENCY
+
+
+def test_failed_chunk_fails_the_transcription(fake_chunks):
+    fake_chunks["fail"].add(1)
+    audio = InMemoryAudio(TRANSCRIPTION_CHUNK_SECONDS * 3.5)
+
+    assert transcription._transcribe_chunked(None, audio, "long.wav") is None
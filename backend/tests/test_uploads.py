@@ -0,0 +1,53 @@
+"""Tests for the resumable upload routes"""
+import asyncio
+import json
+
+import pytest
+from fastapi import FastAPI
+
+from api.routes import uploads
+
+
+def _put(app, path, query, body, headers):
+    """Send one request straight to the ASGI app, with headers exactly as given"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "PUT",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+        "query_string": query.encode(), "server": ("test", 80), "client": ("test", 1),
+        "headers": [(name.encode(), value.encode()) for name, value in headers.items()],
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    status = next(m["status"] for m in sent if m["type"] == "http.response.start")
+    body = b"".join(m.get("body", b"") for m in sent if m["type"] == "http.response.body")
+    return status, json.loads(body)
+
+
+@pytest.fixture
+def app(db):
+    app = FastAPI()
+    app.include_router(uploads.router, prefix="/api")
+    return app
+
+
+@pytest.mark.parametrize("content_length", ["abc", "12x", "1.5"])
+def test_malformed_content_length_is_rejected(app, content_length):
+    status, body = _put(app, "/api/uploads/some-upload", "offset=0", b"data", {"content-length": content_length})
+
+    assert status == 400
+    assert body["detail"]["message"] == "Invalid Content-Length header"
+
+
+def test_oversized_content_length_is_rejected(app):
+    too_big = str(uploads.UPLOAD_CHUNK_SIZE + 1)
+    status, body = _put(app, "/api/uploads/some-upload", "offset=0", b"data", {"content-length": too_big})
+
+    assert status == 413
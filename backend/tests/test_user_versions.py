@@ -0,0 +1,162 @@
+"""Tests for change sequence numbers and the committed watermark used by delta sync"""
+import asyncio
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from api.routes.groups import get_group_changes
+from services.user_versions import (
+    STALE_CHANGE_SECONDS,
+    commit_change,
+    commit_change_async,
+    committed_change,
+    reserve_change,
+    reserve_change_async,
+)
+
+
+def _committed(db, user_id="u1"):
+    return committed_change(db.user_versions.find_one({"_id": user_id}), "groups")
+
+
+def _abandon(db, seq, user_id="u1"):
+    """Backdate a reservation as if its writer died long ago"""
+    db.user_versions.update_one(
+        {"_id": user_id, "groups_pending.seq": seq},
+        {"$set": {"groups_pending.$.reserved_at": datetime.now() - timedelta(seconds=STALE_CHANGE_SECONDS + 60)}}
+    )
+
+
+class RacingCollection:
+    """user_versions that lets another writer in right after the next read"""
+
+    def __init__(self, collection, race):
+        self.collection = collection
+        self.race = race
+
+    def find_one(self, *args, **kwargs):
+        doc = self.collection.find_one(*args, **kwargs)
+        race, self.race = self.race, None
+        if race:
+            race()
+        return doc
+
+    def __getattr__(self, name):
+        return getattr(self.collection, name)
+
+
+class RacingDatabase:
+    def __init__(self, db, race):
+        self.user_versions = RacingCollection(db.user_versions, race)
+
+
+def test_commit_out_of_order_holds_watermark_below_oldest_pending(db):
+    a = reserve_change(db, "u1", "groups")
+    b = reserve_change(db, "u1", "groups")
+    assert _committed(db) == 0
+
+    commit_change(db, "u1", "groups", b)
+    assert _committed(db) == 0
+
+    commit_change(db, "u1", "groups", a)
+    assert _committed(db) == b
+
+
+def test_commit_in_order_advances_past_each_change(db):
+    a = reserve_change(db, "u1", "groups")
+    b = reserve_change(db, "u1", "groups")
+
+    commit_change(db, "u1", "groups", a)
+    assert _committed(db) == a
+
+    c = reserve_change(db, "u1", "groups")
+    commit_change(db, "u1", "groups", b)
+    assert _committed(db) == b
+
+    commit_change(db, "u1", "groups", c)
+    assert _committed(db) == c
+
+
+def test_abandoned_reservation_expires_while_other_writes_continue(db):
+    abandoned = reserve_change(db, "u1", "groups")
+    later = reserve_change(db, "u1", "groups")
+    _abandon(db, abandoned)
+
+    # Fresh reservations keep their own age; only the abandoned one expires
+    assert _committed(db) == later - 1
+    commit_change(db, "u1", "groups", later)
+    assert _committed(db) == later
+
+    newest = reserve_change(db, "u1", "groups")
+    assert _committed(db) == newest - 1
+    # Expired entries are dropped from the document as it is updated
+    assert [entry["seq"] for entry in db.user_versions.find_one({"_id": "u1"})["groups_pending"]] == [newest]
+
+
+def test_reservation_racing_another_reservation_gets_the_next_number(db):
+    first = reserve_change(db, "u1", "groups")
+    raced = []
+    racing_db = RacingDatabase(db, lambda: raced.append(reserve_change(db, "u1", "groups")))
+
+    mine = reserve_change(racing_db, "u1", "groups")
+
+    assert (first, raced[0], mine) == (1, 2, 3)
+    pending = db.user_versions.find_one({"_id": "u1"})["groups_pending"]
+    assert [entry["seq"] for entry in pending] == [1, 2, 3]
+
+
+def test_reservation_racing_a_commit_keeps_the_commit(db):
+    first = reserve_change(db, "u1", "groups")
+    racing_db = RacingDatabase(db, lambda: commit_change(db, "u1", "groups", first))
+
+    mine = reserve_change(racing_db, "u1", "groups")
+
+    # The commit isn't undone by the reservation rewriting the pending list
+    assert _committed(db) == mine - 1 == first
+
+
+def test_first_reservations_for_a_new_user_race_safely(db):
+    raced = []
+    racing_db = RacingDatabase(db, lambda: raced.append(reserve_change(db, "new", "groups")))
+
+    mine = reserve_change(racing_db, "new", "groups")
+
+    assert (raced[0], mine) == (1, 2)
+
+
+def test_legacy_pending_counter_is_replaced(db):
+    db.user_versions.insert_one({"_id": "u1", "groups": 4, "groups_seq": 4, "groups_pending": 1})
+
+    seq = reserve_change(db, "u1", "groups")
+    assert seq == 5
+    assert _committed(db) == 4
+    commit_change(db, "u1", "groups", seq)
+    assert _committed(db) == 5
+
+
+def _changes(since=None):
+    response = asyncio.run(get_group_changes(user_id="u1", since=since, limit=500))
+    return json.loads(response.body)
+
+
+def test_changes_are_held_back_until_earlier_writes_commit(async_db):
+    async def write(meeting_id):
+        seq = await reserve_change_async(async_db, "u1", "groups")
+        await async_db.contact_groups.insert_one({
+            "user_id": "u1", "meeting_id": meeting_id, "priority_group": "P0",
+            "seq": seq, "updated_at": datetime.now()
+        })
+        return seq
+
+    slow = asyncio.run(write("m1"))
+    fast = asyncio.run(write("m2"))
+    asyncio.run(commit_change_async(async_db, "u1", "groups", fast))
+
+    first = _changes()
+    assert first["changes"] == []
+
+    asyncio.run(commit_change_async(async_db, "u1", "groups", slow))
+    second = _changes(first["token"])
+    assert [change["meeting_id"] for change in second["changes"]] == ["m1", "m2"]
+    assert _changes(second["token"])["changes"] == []
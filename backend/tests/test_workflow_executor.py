@@ -0,0 +1,79 @@
+"""Tests for the DAG executor behind inline meeting workflows"""
+import threading
+import time
+
+import pytest
+
+from config.settings import MEETING_PIPELINE_CONCURRENCY, WORKFLOW_MAX_PARALLEL_STAGES, WORKFLOW_STAGE_WORKERS
+from services.workflow_executor import execute_dag
+
+
+def _task(task_id, task_type, depends_on=()):
+    return {"task_id": task_id, "task_type": task_type, "depends_on": list(depends_on)}
+
+
+def test_pool_fits_every_pipeline_at_its_widest_step():
+    assert WORKFLOW_STAGE_WORKERS >= MEETING_PIPELINE_CONCURRENCY * WORKFLOW_MAX_PARALLEL_STAGES
+
+
+def test_independent_stages_run_concurrently_after_their_dependency():
+    order = []
+    both_running = threading.Barrier(2, timeout=5)
+
+    def parallel(task_id):
+        order.append(task_id)
+        both_running.wait()  # Fails with BrokenBarrierError if run one after the other
+        return task_id
+
+    results = execute_dag(
+        [
+            _task("dc", "data_collection"),
+            _task("ex", "extraction", ["dc"]),
+            _task("su", "summarization", ["dc"]),
+            _task("ca", "categorization", ["ex", "su"]),
+        ],
+        {
+            "data_collection": lambda task_id: order.append(task_id) or task_id,
+            "extraction": parallel,
+            "summarization": parallel,
+            "categorization": lambda task_id: order.append(task_id) or task_id,
+        },
+    )
+
+    assert results == {"dc": "dc", "ex": "ex", "su": "su", "ca": "ca"}
+    assert order[0] == "dc" and order[-1] == "ca"
+
+
+def test_missing_handler_waits_for_running_stages():
+    finished = threading.Event()
+
+    def slow(task_id):
+        time.sleep(0.2)
+        finished.set()
+
+    with pytest.raises(ValueError, match="No handler"):
+        execute_dag(
+            [_task("a", "fast"), _task("b", "slow"), _task("c", "unknown", ["a"])],
+            {"fast": lambda task_id: None, "slow": slow},
+        )
+    assert finished.is_set()
+
+
+def test_failed_stage_waits_for_running_stages_and_skips_dependents():
+    finished = threading.Event()
+    ran = []
+
+    def slow(task_id):
+        time.sleep(0.2)
+        finished.set()
+
+    def fail(task_id):
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        execute_dag(
+            [_task("a", "fail"), _task("b", "slow"), _task("c", "after", ["a"])],
+            {"fail": fail, "slow": slow, "after": ran.append},
+        )
+    assert finished.is_set()
+    assert ran == []
@@ -0,0 +1 @@
+# Agent worker processes package
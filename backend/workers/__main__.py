@@ -0,0 +1,88 @@
+"""
+Run standalone agent worker processes
+
+Usage (from the backend directory):
+    python -m workers                                  # 1 process per agent type
+    python -m workers --processes 4                    # 4 processes per agent type
+    python -m workers --agents extraction=4 categorization=1
+"""
+import argparse
+import logging
+import multiprocessing
+import signal
+import sys
+
+from workers.runner import get_agent_classes, run_worker
+
+
+def parse_agents(values, default_processes):
+    """Parse agent=count pairs into a dict of process counts per task type"""
+    task_types = list(get_agent_classes())
+    if not values:
+        return {task_type: default_processes for task_type in task_types}
+    
+    counts = {}
+    for value in values:
+        task_type, _, count = value.partition("=")
+        if task_type not in task_types:
+            raise SystemExit(f"Unknown agent type: {task_type} (choose from {', '.join(task_types)})")
+        counts[task_type] = int(count) if count else default_processes
+    return counts
+
+
+def _worker_main(task_type, poll_interval, stop_event):
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(processName)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    # The parent handles Ctrl+C and signals shutdown through stop_event
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    run_worker(task_type, poll_interval=poll_interval, stop_event=stop_event)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run agent worker processes")
+    parser.add_argument("--agents", nargs="*", metavar="TYPE[=N]",
+                        help="Agent types to run, optionally with a process count each")
+    parser.add_argument("--processes", type=int, default=1,
+                        help="Processes per agent type when no count is given")
+    parser.add_argument("--poll-interval", type=float, default=1.0,
+                        help="Seconds to wait before polling an empty queue again")
+    args = parser.parse_args(argv)
+    
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    logger = logging.getLogger("workers")
+    
+    stop_event = multiprocessing.Event()
+    processes = []
+    for task_type, count in parse_agents(args.agents, args.processes).items():
+        for i in range(count):
+            process = multiprocessing.Process(
+                target=_worker_main,
+                args=(task_type, args.poll_interval, stop_event),
+                name=f"{task_type}-{i + 1}"
+            )
+            process.start()
+            processes.append(process)
+            logger.info(f"[WORKERS] Started {process.name} (pid {process.pid})")
+    
+    def shutdown(signum, frame):
+        logger.info("[WORKERS] Shutting down, waiting for in-flight tasks to finish...")
+        stop_event.set()
+    
+    signal.signal(signal.SIGINT, shutdown)
+    signal.signal(signal.SIGTERM, shutdown)
+    
+    for process in processes:
+        process.join()
+    logger.info("[WORKERS] All workers stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,91 @@
+"""Worker loop that pulls tasks of one agent type from the tasks queue"""
+from services.agent_registry import register_agent, flush_agent_statuses
+from services.task_leases import reap_expired_tasks
+from services.blob_store import sweep_unreferenced_blobs
+from config.settings import TASK_REAPER_INTERVAL, BLOB_GC_INTERVAL
+import logging
+import os
+import socket
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def get_agent_classes():
+    """Map task types to the agent classes that process them"""
+    # Imported lazily so each worker process only loads what it runs
+    from agents.data_collection.agent import DataCollectionAgent
+    from agents.extraction.agent import ExtractionAgent
+    from agents.summarization.agent import SummarizationAgent
+    from agents.categorization.agent import CategorizationAgent
+    from agents.analysis.agent import AnalysisAgent
+    
+    return {
+        "data_collection": DataCollectionAgent,
+        "extraction": ExtractionAgent,
+        "summarization": SummarizationAgent,
+        "categorization": CategorizationAgent,
+        "analysis": AnalysisAgent
+    }
+
+
+def run_worker(task_type, poll_interval=1.0, max_poll_interval=5.0, stop_event=None):
+    """
+    Claim and process tasks of a single type until stopped
+    
+    Args:
+        task_type: Task type this worker handles (e.g. "extraction")
+        poll_interval: Initial seconds to sleep when the queue is empty
+        max_poll_interval: Upper bound for the idle backoff
+        stop_event: Optional multiprocessing/threading Event to stop the loop
+    """
+    agent = get_agent_classes()[task_type]()
+    
+    # Give every worker process its own identity in the agents collection
+    agent.agent_id = f"{agent.agent_id}@{socket.gethostname()}:{os.getpid()}"
+    register_agent(agent.agent_id, agent.agent_type, agent.skills, agent.capabilities)
+    logger.info(f"[WORKER] {agent.agent_id} started")
+    
+    idle_sleep = poll_interval
+    next_reap = 0
+    next_blob_sweep = time.monotonic() + BLOB_GC_INTERVAL
+    while not (stop_event and stop_event.is_set()):
+        # Any worker can put tasks with expired leases back on the queue
+        if time.monotonic() >= next_reap:
+            try:
+                reap_expired_tasks()
+            except Exception as e:
+                logger.error(f"[WORKER] {agent.agent_id} failed to reap expired tasks: {e}")
+            next_reap = time.monotonic() + TASK_REAPER_INTERVAL
+        
+        # Media of finished workflows is only deleted once nothing refers to it
+        if time.monotonic() >= next_blob_sweep:
+            try:
+                sweep_unreferenced_blobs()
+            except Exception as e:
+                logger.error(f"[WORKER] {agent.agent_id} failed to sweep unreferenced blobs: {e}")
+            next_blob_sweep = time.monotonic() + BLOB_GC_INTERVAL
+        
+        try:
+            task = agent.claim_next_task(task_type)
+        except Exception as e:
+            logger.error(f"[WORKER] {agent.agent_id} failed to claim task: {e}")
+            task = None
+        
+        if not task:
+            time.sleep(idle_sleep)
+            idle_sleep = min(idle_sleep * 2, max_poll_interval)
+            continue
+        
+        idle_sleep = poll_interval
+        logger.info(f"[WORKER] {agent.agent_id} claimed {task_type} task {task['task_id']}")
+        try:
+            agent.run_task(task["task_id"])
+        except Exception as e:
+            # process_task already marked the task as failed
+            logger.error(f"[WORKER] {agent.agent_id} failed task {task['task_id']}: {e}")
+    
+    agent.update_status("offline")
+    # Worker processes exit without running atexit hooks
+    flush_agent_statuses()
+    logger.info(f"[WORKER] {agent.agent_id} stopped")
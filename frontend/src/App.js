@@ -115,7 +115,7 @@ function App() {
           <MeetingInput onMeetingSubmitted={handleMeetingSubmitted} />
           <ClearDataButton onDataCleared={handleDataCleared} />
         </div>
-        <GroupsView key={refreshKey} userId="default" />
+        <GroupsView refreshKey={refreshKey} userId="default" />
       </main>
 
       <footer style={styles.footer}>
@@ -1,21 +1,63 @@
-import React, { useState, useEffect } from 'react';
-import { getGroups } from '../services/api';
+import React, { useState, useEffect, useRef } from 'react';
+import { getGroups, getGroupPage, getGroupChanges } from '../services/api';
 import PersonCard from './PersonCard';
 
+// Meetings loaded per group at a time (newest first)
+const PAGE_SIZE = 20;
+
+const EMPTY_CURSORS = { P0: null, P1: null, P2: null };
+
+/**
+ * Apply changes from GET /api/groups/changes to the loaded groups
+ * Meetings that sort after the last loaded one of a group that has more
+ * pages are left for "Load more" to fetch
+ */
+const applyChanges = (groups, cursors, changes) => {
+  const next = { ...groups };
+  changes.forEach((change) => {
+    Object.keys(next).forEach((priority) => {
+      next[priority] = next[priority].filter((m) => m.meeting_id !== change.meeting_id);
+    });
+    if (change.deleted || !next[change.priority_group]) {
+      return;
+    }
+    const { priority_group: priority, ...meeting } = change;
+    const list = next[priority];
+    const last = list[list.length - 1];
+    if (cursors[priority] && last && meeting.meeting_timestamp < last.meeting_timestamp) {
+      return;
+    }
+    // Newest first, the order the first page was loaded in
+    const index = list.findIndex((m) => m.meeting_timestamp < meeting.meeting_timestamp);
+    next[priority] = index === -1 ? [...list, meeting] : [...list.slice(0, index), meeting, ...list.slice(index)];
+  });
+  return next;
+};
+
 /**
  * Component for displaying meetings grouped by priority (P0, P1, P2)
+ * After the first load, refreshes only fetch what changed
  */
-const GroupsView = ({ userId = 'default' }) => {
+const GroupsView = ({ userId = 'default', refreshKey = 0 }) => {
   const [groups, setGroups] = useState({ P0: [], P1: [], P2: [] });
+  const [cursors, setCursors] = useState(EMPTY_CURSORS);
+  const [syncToken, setSyncToken] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
+  const firstRender = useRef(true);
 
   const fetchGroups = async () => {
     setLoading(true);
     setError('');
     try {
-      const data = await getGroups(userId);
+      const {
+        next_cursors: nextCursors,
+        sync_token: token,
+        ...data
+      } = await getGroups(userId, { limit: PAGE_SIZE });
       setGroups(data);
+      setCursors(nextCursors || EMPTY_CURSORS);
+      setSyncToken(token);
     } catch (err) {
       setError('Error loading groups. Please try again.');
       console.error(err);
@@ -24,10 +66,71 @@ const GroupsView = ({ userId = 'default' }) => {
     }
   };
 
+  const loadMore = async (priority) => {
+    try {
+      const page = await getGroupPage(priority, cursors[priority], userId, { limit: PAGE_SIZE });
+      setGroups((prev) => ({ ...prev, [priority]: [...prev[priority], ...page.meetings] }));
+      setCursors((prev) => ({ ...prev, [priority]: page.next_cursor }));
+    } catch (err) {
+      setError('Error loading more meetings. Please try again.');
+      console.error(err);
+    }
+  };
+
+  const renderLoadMore = (priority) =>
+    cursors[priority] && (
+      <button onClick={() => loadMore(priority)} style={styles.loadMoreButton}>
+        Load more
+      </button>
+    );
+
+  const syncChanges = async () => {
+    if (!syncToken) {
+      fetchGroups();
+      return;
+    }
+    setError('');
+    try {
+      let token = syncToken;
+      let changes = [];
+      let page;
+      do {
+        page = await getGroupChanges(token, userId);
+        if (page.reset) {
+          // Token too old to patch from; start over
+          fetchGroups();
+          return;
+        }
+        changes = changes.concat(page.changes);
+        token = page.token;
+      } while (page.has_more);
+      if (changes.length > 0) {
+        setGroups((prev) => applyChanges(prev, cursors, changes));
+      }
+      setSyncToken(token);
+    } catch (err) {
+      if (err.response?.status === 400) {
+        // Token the server no longer accepts (e.g. after an upgrade); start over
+        fetchGroups();
+        return;
+      }
+      setError('Error refreshing groups. Please try again.');
+      console.error(err);
+    }
+  };
+
   useEffect(() => {
     fetchGroups();
   }, [userId]);
 
+  useEffect(() => {
+    if (firstRender.current) {
+      firstRender.current = false;
+      return;
+    }
+    syncChanges();
+  }, [refreshKey]);
+
   if (loading) {
     return (
       <div style={styles.container}>
@@ -53,7 +156,7 @@ const GroupsView = ({ userId = 'default' }) => {
     <div style={styles.container}>
       <div style={styles.header}>
         <h2 style={styles.title}>Priority Groups</h2>
-        <button onClick={fetchGroups} style={styles.refreshButton}>
+        <button onClick={syncChanges} style={styles.refreshButton}>
           Refresh
         </button>
       </div>
@@ -65,7 +168,7 @@ const GroupsView = ({ userId = 'default' }) => {
           {/* P0 Group */}
           <div style={styles.group}>
             <h3 style={styles.groupTitle}>
-              P0 - Highest Priority ({groups.P0.length})
+              P0 - Highest Priority ({groups.P0.length}{cursors.P0 ? '+' : ''})
             </h3>
             {groups.P0.length === 0 ? (
               <p style={styles.emptyGroup}>No P0 meetings</p>
@@ -74,12 +177,13 @@ const GroupsView = ({ userId = 'default' }) => {
                 <PersonCard key={index} person={person} />
               ))
             )}
+            {renderLoadMore('P0')}
           </div>
 
           {/* P1 Group */}
           <div style={styles.group}>
             <h3 style={styles.groupTitle}>
-              P1 - Medium Priority ({groups.P1.length})
+              P1 - Medium Priority ({groups.P1.length}{cursors.P1 ? '+' : ''})
             </h3>
             {groups.P1.length === 0 ? (
               <p style={styles.emptyGroup}>No P1 meetings</p>
@@ -88,12 +192,13 @@ const GroupsView = ({ userId = 'default' }) => {
                 <PersonCard key={index} person={person} />
               ))
             )}
+            {renderLoadMore('P1')}
           </div>
 
           {/* P2 Group */}
           <div style={styles.group}>
             <h3 style={styles.groupTitle}>
-              P2 - Lower Priority ({groups.P2.length})
+              P2 - Lower Priority ({groups.P2.length}{cursors.P2 ? '+' : ''})
             </h3>
             {groups.P2.length === 0 ? (
               <p style={styles.emptyGroup}>No P2 meetings</p>
@@ -102,6 +207,7 @@ const GroupsView = ({ userId = 'default' }) => {
                 <PersonCard key={index} person={person} />
               ))
             )}
+            {renderLoadMore('P2')}
           </div>
         </>
       )}
@@ -160,6 +266,17 @@ const styles = {
     color: '#d32f2f',
     marginBottom: '10px',
   },
+  loadMoreButton: {
+    display: 'block',
+    margin: '10px auto 0',
+    padding: '8px 16px',
+    backgroundColor: '#fff',
+    color: '#000',
+    border: '1px solid #000',
+    borderRadius: '4px',
+    cursor: 'pointer',
+    fontSize: '14px',
+  },
   retryButton: {
     padding: '8px 16px',
     backgroundColor: '#000',
@@ -182,7 +182,11 @@ const MeetingInput = ({ onMeetingSubmitted }) => {
         });
       }
       
-      setMessage(`Meeting processed! Priority: ${result.priority_group}`);
+      if (result.status === 'queued') {
+        setMessage('Meeting received! It will appear in your groups once processing finishes.');
+      } else {
+        setMessage(`Meeting processed! Priority: ${result.priority_group}`);
+      }
       
       // Clear form after a delay to show parsed inputs
       setTimeout(() => {
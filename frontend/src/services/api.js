@@ -32,6 +32,69 @@ const api = axios.create({
   // Don't set Content-Type for multipart/form-data - let browser set it with boundary
 });
 
+// Recordings larger than this go through the resumable upload API, so a
+// dropped connection only costs the current chunk instead of the whole file
+const RESUMABLE_UPLOAD_THRESHOLD = 1024 * 1024;
+const UPLOAD_MAX_RETRIES = 5;
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+/**
+ * Upload a file in chunks, resuming after network errors
+ * Returns the upload_id to pass to /api/meetings
+ */
+export const uploadResumable = async (blob, filename, userId = 'default') => {
+  const { data: upload } = await api.post('/api/uploads', {
+    filename,
+    content_type: blob.type || null,
+    size: blob.size,
+    user_id: userId,
+  });
+  console.log(`[API] Started resumable upload ${upload.upload_id} (${blob.size} bytes)`);
+  
+  let offset = upload.received;
+  let failures = 0;
+  while (offset < blob.size) {
+    const chunk = blob.slice(offset, offset + upload.chunk_size);
+    try {
+      const { data } = await api.put(`/api/uploads/${upload.upload_id}`, chunk, {
+        params: { offset, user_id: userId },
+        headers: { 'Content-Type': 'application/octet-stream' },
+      });
+      offset = data.received;
+      failures = 0;
+    } catch (error) {
+      const received = error.response?.data?.detail?.received;
+      if (error.response?.status === 409 && received !== undefined) {
+        // The server has a different offset (e.g. our last response was lost)
+        offset = received;
+        continue;
+      }
+      failures += 1;
+      if (error.response || failures > UPLOAD_MAX_RETRIES) {
+        throw error;
+      }
+      console.warn(`[API] Chunk at ${offset} failed (attempt ${failures}), retrying`);
+      await sleep(1000 * 2 ** (failures - 1));
+      try {
+        // Ask the server how much it has before resending
+        const { data } = await api.get(`/api/uploads/${upload.upload_id}`, {
+          params: { user_id: userId },
+        });
+        offset = data.received;
+      } catch (statusError) {
+        // Still offline - retry from the same offset
+      }
+    }
+  }
+  
+  await api.post(`/api/uploads/${upload.upload_id}/finalize`, null, {
+    params: { user_id: userId },
+  });
+  console.log(`[API] Finished resumable upload ${upload.upload_id}`);
+  return upload.upload_id;
+};
+
 /**
  * Submit a new meeting for processing
  */
@@ -53,7 +116,11 @@ export const submitMeeting = async (text, location = null, audioBlob = null, pho
     }
     
     // Add audio file if recorded
-    if (audioBlob) {
+    if (audioBlob && audioBlob.size > RESUMABLE_UPLOAD_THRESHOLD) {
+      const uploadId = await uploadResumable(audioBlob, 'recording.webm');
+      formData.append('audio_upload_id', uploadId);
+      console.log('[API] Added audio upload ID to FormData:', uploadId);
+    } else if (audioBlob) {
       formData.append('audio', audioBlob, 'recording.webm');
       console.log('[API] Added audio file to FormData:', audioBlob.size, 'bytes');
     }
@@ -132,11 +199,14 @@ export const submitMeeting = async (text, location = null, audioBlob = null, pho
 };
 
 /**
- * Get all meetings grouped by priority (P0, P1, P2)
+ * Get meetings grouped by priority (P0, P1, P2)
+ * Pass { limit } to get only the first page of each group, with next_cursors
  */
-export const getGroups = async (userId = 'default') => {
+export const getGroups = async (userId = 'default', options = {}) => {
   try {
-    const response = await api.get(`/api/groups?user_id=${userId}`);
+    const response = await api.get('/api/groups', {
+      params: { user_id: userId, ...options },
+    });
     return response.data;
   } catch (error) {
     console.error('Error fetching groups:', error);
@@ -144,6 +214,36 @@ export const getGroups = async (userId = 'default') => {
   }
 };
 
+/**
+ * Get the next page of one priority group, starting after cursor
+ */
+export const getGroupPage = async (priority, cursor, userId = 'default', options = {}) => {
+  try {
+    const response = await api.get(`/api/groups/${priority}`, {
+      params: { user_id: userId, cursor, ...options },
+    });
+    return response.data;
+  } catch (error) {
+    console.error(`Error fetching ${priority} page:`, error);
+    throw error;
+  }
+};
+
+/**
+ * Get meetings added, re-categorized or deleted since a sync token
+ */
+export const getGroupChanges = async (since, userId = 'default') => {
+  try {
+    const response = await api.get('/api/groups/changes', {
+      params: { user_id: userId, since },
+    });
+    return response.data;
+  } catch (error) {
+    console.error('Error fetching group changes:', error);
+    throw error;
+  }
+};
+
 /**
  * Clear all data from the database
  */